@@ -13,7 +13,7 @@ from app.core.config import settings
 from app.core.database import Base
 
 # Importa todos los modelos para que Alembic los detecte
-from app.models import staff, participant, event, event_registration, attendance
+from app.models import staff, participant, event, event_registration, attendance, email_outbox, attendance_scan, refresh_token, device_key
 
 # === Configuración Alembic ===
 config = context.config
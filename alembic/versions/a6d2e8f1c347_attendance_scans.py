@@ -0,0 +1,37 @@
+"""attendance scans
+
+Revision ID: a6d2e8f1c347
+Revises: f5a0c3b9e714
+Create Date: 2026-10-18 14:05:12.508314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e8f1c347'
+down_revision: Union[str, Sequence[str], None] = 'f5a0c3b9e714'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('attendance_scans',
+    sa.Column('idempotency_key', sa.String(length=64), nullable=False),
+    sa.Column('registration_id', sa.Integer(), nullable=True),
+    sa.Column('result', sa.String(length=20), nullable=False),
+    sa.Column('detail', sa.String(length=255), nullable=True),
+    sa.Column('scanned_at', sa.DateTime(), nullable=False),
+    sa.Column('received_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['registration_id'], ['event_registrations.id'], ),
+    sa.PrimaryKeyConstraint('idempotency_key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('attendance_scans')
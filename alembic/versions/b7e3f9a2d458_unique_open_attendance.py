@@ -0,0 +1,50 @@
+"""unique open attendance per registration
+
+Revision ID: b7e3f9a2d458
+Revises: a6d2e8f1c347
+Create Date: 2026-10-18 15:22:40.117905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3f9a2d458'
+down_revision: Union[str, Sequence[str], None] = 'a6d2e8f1c347'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Entradas abiertas duplicadas (carreras anteriores): se cierran todas menos la más reciente
+    op.execute(
+        """
+        UPDATE attendance a
+        JOIN (
+            SELECT registration_id, MAX(id) AS keep_id
+            FROM attendance
+            WHERE status = 'CHECKED_IN' AND check_out_time IS NULL
+            GROUP BY registration_id
+            HAVING COUNT(*) > 1
+        ) d ON a.registration_id = d.registration_id
+        SET a.status = 'CHECKED_OUT', a.check_out_time = a.check_in_time
+        WHERE a.status = 'CHECKED_IN' AND a.check_out_time IS NULL AND a.id < d.keep_id
+        """
+    )
+    op.add_column('attendance', sa.Column(
+        'open_registration_id',
+        sa.Integer(),
+        sa.Computed("CASE WHEN status = 'CHECKED_IN' AND check_out_time IS NULL THEN registration_id END", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('uq_attendance_open_registration_id', 'attendance', ['open_registration_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_attendance_open_registration_id', table_name='attendance')
+    op.drop_column('attendance', 'open_registration_id')
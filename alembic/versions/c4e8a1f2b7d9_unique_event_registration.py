@@ -0,0 +1,76 @@
+"""unique event registration
+
+Los duplicados de (event_id, participant_document_id) se fusionan en la
+inscripción más antigua: conserva is_paid / qr_code_sent si alguna copia los
+tenía y el qr_sent_at más reciente; la asistencia pasa a esa inscripción.
+
+Revision ID: c4e8a1f2b7d9
+Revises: 3cb5d7b3d54f
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e8a1f2b7d9'
+down_revision: Union[str, Sequence[str], None] = '3cb5d7b3d54f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Antes de crear el índice único se conserva la inscripción más antigua de
+    # cada par (event_id, participant_document_id): primero recibe el pago y el
+    # envío del QR de sus duplicados, luego la asistencia de estos se reasigna.
+    op.execute(
+        """
+        UPDATE event_registrations r
+        JOIN (
+            SELECT event_id, participant_document_id, MIN(id) AS keep_id,
+                   MAX(is_paid) AS p, MAX(qr_code_sent) AS s, MAX(qr_sent_at) AS t
+            FROM event_registrations
+            GROUP BY event_id, participant_document_id
+            HAVING COUNT(*) > 1
+        ) k ON k.keep_id = r.id
+        SET r.is_paid = k.p, r.qr_code_sent = k.s, r.qr_sent_at = k.t
+        """
+    )
+    op.execute(
+        """
+        UPDATE attendance a
+        JOIN event_registrations r ON r.id = a.registration_id
+        JOIN (
+            SELECT event_id, participant_document_id, MIN(id) AS keep_id
+            FROM event_registrations
+            GROUP BY event_id, participant_document_id
+        ) k ON k.event_id = r.event_id AND k.participant_document_id = r.participant_document_id
+        SET a.registration_id = k.keep_id
+        WHERE r.id <> k.keep_id
+        """
+    )
+    op.execute(
+        """
+        DELETE r FROM event_registrations r
+        JOIN (
+            SELECT event_id, participant_document_id, MIN(id) AS keep_id
+            FROM event_registrations
+            GROUP BY event_id, participant_document_id
+        ) k ON k.event_id = r.event_id AND k.participant_document_id = r.participant_document_id
+        WHERE r.id <> k.keep_id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_event_registrations_event_participant',
+        'event_registrations',
+        ['event_id', 'participant_document_id'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_event_registrations_event_participant', 'event_registrations', type_='unique')
@@ -0,0 +1,51 @@
+"""hot path indexes
+
+Revision ID: d71b3e5a9c20
+Revises: c4e8a1f2b7d9
+Create Date: 2026-10-18 10:03:17.552871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd71b3e5a9c20'
+down_revision: Union[str, Sequence[str], None] = 'c4e8a1f2b7d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Valores fuera del catálogo pasan a NONE antes de convertir la columna a ENUM
+    op.execute(
+        "UPDATE attendance SET status = 'NONE' "
+        "WHERE status IS NULL OR status NOT IN ('NONE', 'CHECKED_IN', 'CHECKED_OUT')"
+    )
+    op.alter_column('attendance', 'status',
+               existing_type=mysql.VARCHAR(length=20),
+               type_=sa.Enum('NONE', 'CHECKED_IN', 'CHECKED_OUT', name='attendancestatus'),
+               existing_nullable=True)
+
+    # WHERE registration_id = ? ORDER BY id DESC LIMIT 1 (check-in / check-out)
+    op.create_index('ix_attendance_registration_id_id', 'attendance', ['registration_id', 'id'], unique=False)
+    # Conteos por evento y estado
+    op.create_index('ix_attendance_event_id_status', 'attendance', ['event_id', 'status'], unique=False)
+    # WHERE event_id = ? AND is_paid = 1 (envío masivo de QR)
+    op.create_index('ix_event_registrations_event_id_is_paid', 'event_registrations', ['event_id', 'is_paid'], unique=False)
+    op.create_index('ix_participants_email', 'participants', ['email'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_participants_email', table_name='participants')
+    op.drop_index('ix_event_registrations_event_id_is_paid', table_name='event_registrations')
+    op.drop_index('ix_attendance_event_id_status', table_name='attendance')
+    op.drop_index('ix_attendance_registration_id_id', table_name='attendance')
+    op.alter_column('attendance', 'status',
+               existing_type=sa.Enum('NONE', 'CHECKED_IN', 'CHECKED_OUT', name='attendancestatus'),
+               type_=mysql.VARCHAR(length=20),
+               existing_nullable=True)
@@ -0,0 +1,28 @@
+"""Add qr_version to event_registrations
+
+Revision ID: e2f94c6d18ab
+Revises: d71b3e5a9c20
+Create Date: 2026-10-18 11:26:05.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f94c6d18ab'
+down_revision: Union[str, Sequence[str], None] = 'd71b3e5a9c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('event_registrations', sa.Column('qr_version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('event_registrations', 'qr_version')
@@ -1,10 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from app.core.database import SessionLocal, get_async_db
+from app.core.export_utils import FORMATS
+from app.core.replica import read_sessionmaker
+from app.schemas.attendance_schema import ScanBatch, ScanBatchOut
 from app.services.attendance_service import AttendanceService
+from app.services.export_service import ExportService
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 service = AttendanceService()
+export_service = ExportService()
 
 
 # 🔹 Dependencia de sesión
@@ -17,15 +25,36 @@ def get_db():
 
 
 @router.post("/record")
-def record_attendance(data: dict, db: Session = Depends(get_db)):
+async def record_attendance(data: dict, db: AsyncSession = Depends(get_async_db)):
     """
     Endpoint que recibe el contenido del QR (JSON) y registra automáticamente
     la entrada o salida del participante.
     """
     try:
-        result = service.check_in_or_out(db, data)
+        result = await service.check_in_or_out_async(db, data)
         return result
     except HTTPException as e:
         raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/record-batch", response_model=ScanBatchOut)
+def record_attendance_batch(batch: ScanBatch, db: Session = Depends(get_db)):
+    """
+    Carga de escaneos hechos sin conexión. Cada escaneo trae el contenido del
+    QR, la hora del dispositivo y una llave de idempotencia; se aplican en
+    orden de hora y se devuelve el resultado de cada uno. Reenviar el mismo
+    lote es seguro.
+    """
+    return service.record_batch(db, batch.items)
+
+
+@router.get("/export")
+def export_attendance(request: Request, format: Literal["csv", "ndjson"] = "csv", event_id: Optional[int] = None):
+    """Exporta los registros de asistencia en streaming (CSV o NDJSON)."""
+    return StreamingResponse(
+        export_service.export_attendance(format, event_id=event_id, session_factory=read_sessionmaker(request)),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="attendance.{format}"'},
+    )
@@ -1,7 +1,17 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.schemas.auth_schema import LoginRequest, TokenResponse
+from app.core.database import SessionLocal, get_async_db
+from app.core.dependencies import StaffPrincipal, device_cache, get_current_admin, get_current_user, staff_cache
+from app.core.jwt import token_cache
+from app.schemas.auth_schema import (
+    DeviceKeyCreate,
+    DeviceKeyCreated,
+    DeviceKeyOut,
+    LoginRequest,
+    RefreshRequest,
+    TokenResponse,
+)
 from app.services.auth_service import AuthService
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -15,5 +25,40 @@ def get_db():
         db.close()
 
 @router.post("/login", response_model=TokenResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
-    return service.login(db, request.username, request.password)
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    return await service.login(db, request.username, request.password)
+
+@router.post("/refresh", response_model=TokenResponse)
+def refresh(request: RefreshRequest, db: Session = Depends(get_db)):
+    """Renueva el access token con el refresh token (sin contraseña ni bcrypt)."""
+    return service.refresh(db, request.refresh_token)
+
+@router.post("/logout")
+def logout(request: RefreshRequest, db: Session = Depends(get_db)):
+    return service.logout(db, request.refresh_token)
+
+# 📟 Llaves de los escáneres: se envían en el encabezado X-Device-Key
+@router.post("/devices", response_model=DeviceKeyCreated)
+def create_device_key(
+    data: DeviceKeyCreate,
+    db: Session = Depends(get_db),
+    current_user: StaffPrincipal = Depends(get_current_user),
+):
+    return service.create_device_key(db, current_user.id, data.name)
+
+@router.get("/devices", response_model=list[DeviceKeyOut])
+def list_device_keys(db: Session = Depends(get_db), current_user: StaffPrincipal = Depends(get_current_user)):
+    return service.list_device_keys(db, current_user.id)
+
+@router.delete("/devices/{device_id}", response_model=DeviceKeyOut)
+def revoke_device_key(
+    device_id: int,
+    db: Session = Depends(get_db),
+    current_user: StaffPrincipal = Depends(get_current_user),
+):
+    return service.revoke_device_key(db, current_user.id, device_id)
+
+@router.get("/cache-stats")
+def cache_stats(current_user: StaffPrincipal = Depends(get_current_admin)):
+    """Aciertos y fallos de las cachés de autenticación."""
+    return {"tokens": token_cache.stats(), "staff": staff_cache.stats(), "devices": device_cache.stats()}
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.schemas.event_schema import EventCreate, EventOut
+from app.core.export_utils import content_disposition
+from app.core.replica import get_async_read_db, get_read_db
+from app.schemas.event_schema import EventCreate, EventOut, EventPage, EventStatus
 from app.services.event_service import EventService
+from app.services.qr_batch_service import QRBatchService
 from app.core.dependencies import get_current_user
 
 router = APIRouter(prefix="/events", tags=["Events"])
 service = EventService()
+qr_batch_service = QRBatchService()
 
 def get_db():
     db = SessionLocal()
@@ -20,6 +28,33 @@ def get_db():
 def create_event(data: EventCreate, db: Session = Depends(get_db)):
     return service.create_event(db, data)
 
-@router.get("/", response_model=list[EventOut])
-def list_events(db: Session = Depends(get_db)):
-    return service.list_events(db)
+@router.get("/", response_model=EventPage)
+async def list_events(
+    limit: int = Query(settings.DEFAULT_PAGE_LIMIT, ge=1, le=settings.MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    sort: Literal["id", "name", "start_date", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    status: Optional[EventStatus] = None,
+    faculty_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    page = await service.list_events_async(
+        db, limit, after, sort, order,
+        status=status.value if status else None,
+        faculty_id=faculty_id,
+    )
+    return ORJSONResponse(page)
+
+@router.get("/{event_id}/qrs.zip")
+def download_event_qrs(event_id: int, paid_only: bool = False, db: Session = Depends(get_read_db)):
+    """
+    Descarga un ZIP con el QR de cada inscripción del evento.
+    Los QR se dibujan en paralelo (un proceso por núcleo) y se agregan al ZIP a
+    medida que terminan; los que ya estaban en caché no se vuelven a dibujar.
+    """
+    event, stream = qr_batch_service.event_qrs_zip(db, event_id, paid_only)
+    return StreamingResponse(
+        stream,
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(f"qrs_{event.name.replace(' ', '_')}.zip")},
+    )
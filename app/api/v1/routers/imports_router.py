@@ -0,0 +1,33 @@
+from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from app.services.import_job_service import import_job_service as service
+
+router = APIRouter(prefix="/imports", tags=["Imports"])
+
+
+@router.post("/participants", status_code=status.HTTP_202_ACCEPTED)
+def import_participants(file: UploadFile = File(...)):
+    """
+    Encola la importación de participantes (.xlsx o .csv) y retorna el id del trabajo.
+    El avance se consulta en GET /imports/{job_id}.
+    """
+    job = service.submit("participants", file)
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.post("/registrations", status_code=status.HTTP_202_ACCEPTED)
+def import_registrations(file: UploadFile = File(...), update_existing: bool = False):
+    """
+    Encola la importación de inscripciones (.xlsx o .csv) y retorna el id del trabajo.
+    Con update_existing=true las inscripciones repetidas actualizan is_paid / qr_code_sent.
+    """
+    job = service.submit("registrations", file, update_existing=update_existing)
+    return {"job_id": job.id, "status": job.status}
+
+
+@router.get("/{job_id}")
+def get_import_job(job_id: str):
+    """Estado del trabajo: filas procesadas, insertadas, omitidas, fallidas y filas/segundo."""
+    job = service.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
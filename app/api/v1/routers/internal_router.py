@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from app.core import database
+from app.core.database import async_engine, engine
+from app.core.dependencies import get_current_admin
+from app.core.pool_metrics import pool_stats
+from app.core.replica import replica_state
+
+# Métricas de operación: solo para el rol de administración
+router = APIRouter(prefix="/internal", tags=["Internal"], dependencies=[Depends(get_current_admin)])
+
+@router.get("/db-pool")
+def db_pool_stats():
+    """Conexiones en uso, overflow e histograma de espera de cada pool, y el estado de la réplica."""
+    stats = {
+        "sync": pool_stats(engine.pool),
+        "async": pool_stats(async_engine.sync_engine.pool),
+    }
+    if database.replica_engine is not None:
+        stats["replica_sync"] = pool_stats(database.replica_engine.pool)
+        stats["replica_async"] = pool_stats(database.async_replica_engine.sync_engine.pool)
+    stats["replica"] = replica_state.snapshot()
+    return stats
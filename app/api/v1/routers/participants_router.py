@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, UploadFile, File
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, UploadFile, File, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.schemas.participant_schema import ParticipantCreate, ParticipantOut
+from app.core.replica import get_async_read_db, read_sessionmaker
+from app.core.export_utils import FORMATS
+from app.schemas.participant_schema import ParticipantCreate, ParticipantOut, ParticipantPage, DocumentType
 from app.services.participant_service import ParticipantService
+from app.services.export_service import ExportService
+from app.services.import_job_service import import_job_service
 
 router = APIRouter(prefix="/participants", tags=["Participants"])
 service = ParticipantService()
+export_service = ExportService()
 
 def get_db():
     db = SessionLocal()
@@ -19,20 +28,49 @@ def create_participant(data: ParticipantCreate, db: Session = Depends(get_db)):
     """Crea un nuevo participante individualmente desde JSON."""
     return service.create_participant(db, data)
 
-@router.get("/", response_model=list[ParticipantOut])
-def list_participants(db: Session = Depends(get_db)):
-    """Lista todos los participantes registrados en la base de datos."""
-    return service.list_participants(db)
+@router.get("/", response_model=ParticipantPage)
+async def list_participants(
+    limit: int = Query(settings.DEFAULT_PAGE_LIMIT, ge=1, le=settings.MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    sort: Literal["document_id", "last_name", "created_at"] = "document_id",
+    order: Literal["asc", "desc"] = "asc",
+    career: Optional[str] = None,
+    document_type: Optional[DocumentType] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    """
+    Lista los participantes por páginas.
+    Para la siguiente página se envía el `next_cursor` recibido en el parámetro `after`.
+    """
+    page = await service.list_participants_async(
+        db, limit, after, sort, order,
+        career=career,
+        document_type=document_type.value if document_type else None,
+    )
+    # Filas ya proyectadas: se envían con orjson sin revalidarlas contra el response_model
+    return ORJSONResponse(page)
 
-# 👇 NUEVO ENDPOINT PARA IMPORTAR EXCEL
-@router.post("/import-excel")
-def import_participants_from_excel(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+@router.get("/export")
+def export_participants(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    career: Optional[str] = None,
 ):
+    """Exporta todos los participantes en streaming (CSV o NDJSON) sin cargar la tabla en memoria."""
+    return StreamingResponse(
+        export_service.export_participants(format, career=career, session_factory=read_sessionmaker(request)),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="participants.{format}"'},
+    )
+
+# 👇 NUEVO ENDPOINT PARA IMPORTAR EXCEL
+@router.post("/import-excel", status_code=status.HTTP_202_ACCEPTED)
+def import_participants_from_excel(file: UploadFile = File(...)):
     """
-    Importa múltiples participantes desde un archivo Excel (.xlsx).
+    Encola la importación de participantes desde Excel (.xlsx) o CSV; igual que POST /imports/participants.
     El archivo debe contener las columnas:
     document_id, document_type, first_name, last_name, email, phone_number, career, idnumber.
+    El avance se consulta en GET /imports/{job_id}.
     """
-    return service.import_from_excel(db, file)
+    job = import_job_service.submit("participants", file)
+    return {"job_id": job.id, "status": job.status}
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.schemas.registration_schema import EventRegistrationCreate, EventRegistrationOut
+from app.core.replica import get_async_read_db, get_read_db, read_sessionmaker
+from app.core.export_utils import FORMATS
+from app.schemas.registration_schema import EventRegistrationCreate, EventRegistrationOut, EventRegistrationPage
 from app.services.registration_service import EventRegistrationService
+from app.services.export_service import ExportService
+from app.services.import_job_service import import_job_service
+from app.services.outbox_service import OutboxService
 
 router = APIRouter(prefix="/registrations", tags=["Registrations"])
 service = EventRegistrationService()
+export_service = ExportService()
+outbox_service = OutboxService()
 
 def get_db():
     db = SessionLocal()
@@ -21,12 +32,45 @@ def get_db():
 def create_registration(data: EventRegistrationCreate, db: Session = Depends(get_db)):
     return service.create_registration(db, data)
 
-@router.get("/", response_model=list[EventRegistrationOut])
-def list_registrations(db: Session = Depends(get_db)):
-    return service.list_registrations(db)
+@router.get("/", response_model=EventRegistrationPage)
+async def list_registrations(
+    limit: int = Query(settings.DEFAULT_PAGE_LIMIT, ge=1, le=settings.MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    sort: Literal["id", "registration_date", "participant_document_id"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    event_id: Optional[int] = None,
+    is_paid: Optional[bool] = None,
+    qr_code_sent: Optional[bool] = None,
+    participant_document_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    page = await service.list_registrations_async(
+        db, limit, after, sort, order,
+        event_id=event_id,
+        is_paid=is_paid,
+        qr_code_sent=qr_code_sent,
+        participant_document_id=participant_document_id,
+    )
+    return ORJSONResponse(page)
+
+@router.get("/export")
+def export_registrations(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    event_id: Optional[int] = None,
+    is_paid: Optional[bool] = None,
+):
+    """Exporta las inscripciones en streaming (CSV o NDJSON) sin cargar la tabla en memoria."""
+    return StreamingResponse(
+        export_service.export_registrations(
+            format, event_id=event_id, is_paid=is_paid, session_factory=read_sessionmaker(request)
+        ),
+        media_type=FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="registrations.{format}"'},
+    )
 
 @router.get("/{registration_id}", response_model=EventRegistrationOut)
-def get_registration(registration_id: int, db: Session = Depends(get_db)):
+def get_registration(registration_id: int, db: Session = Depends(get_read_db)):
     reg = service.get_registration(db, registration_id)
     if not reg:
         raise HTTPException(status_code=404, detail="Registration not found")
@@ -42,16 +86,21 @@ def mark_as_unpaid(registration_id: int, db: Session = Depends(get_db)):
     """Revierte una inscripción a estado no pagado."""
     return service.mark_as_unpaid(db, registration_id)
 
-@router.post("/import-excel")
-def import_event_registrations(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    """Importa múltiples registros desde Excel."""
-    return service.import_from_excel(db, file)
+@router.post("/import-excel", status_code=status.HTTP_202_ACCEPTED)
+def import_event_registrations(file: UploadFile = File(...), update_existing: bool = False):
+    """
+    Encola la importación de inscripciones desde Excel (.xlsx) o CSV; igual que POST /imports/registrations.
+    Con update_existing=true las inscripciones repetidas actualizan is_paid / qr_code_sent.
+    El avance y las filas inválidas se consultan en GET /imports/{job_id}.
+    """
+    job = import_job_service.submit("registrations", file, update_existing=update_existing)
+    return {"job_id": job.id, "status": job.status}
 
 # ======================================================
 # 🎫 GENERAR CÓDIGO QR
 # ======================================================
 @router.get("/{registration_id}/generate-qr")
-def generate_qr(registration_id: int, db: Session = Depends(get_db)):
+def generate_qr(registration_id: int, db: Session = Depends(get_read_db)):
     """
     Genera un código QR seguro (PNG en base64) con firma HMAC.
     Contiene los datos del evento y participante.
@@ -61,13 +110,28 @@ def generate_qr(registration_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Registration not found")
     return result
 
-@router.post("/{event_id}/send-qrs-paid")
-async def send_qrs_paid(event_id: int, db: Session = Depends(get_db)):
+@router.post("/{registration_id}/revoke-qr", response_model=EventRegistrationOut)
+def revoke_qr(registration_id: int, db: Session = Depends(get_db)):
     """
-    Genera y envía por correo todos los QR de los participantes pagados en el evento,
-    usando plantilla personalizada con botón de verificación.
+    Revoca los QR emitidos para la inscripción (sube su versión).
+    El siguiente QR generado o enviado tendrá una firma nueva.
     """
-    return await service.generate_and_send_all_qrs_paid(db, event_id)
+    return service.revoke_qr(db, registration_id)
+
+@router.post("/{event_id}/send-qrs-paid", status_code=202)
+def send_qrs_paid(event_id: int, resend: bool = False, db: Session = Depends(get_db)):
+    """
+    Encola el envío por correo del QR de cada participante pagado del evento.
+    El despachador en segundo plano los envía con reintentos; el avance se
+    consulta en GET /registrations/{event_id}/send-qrs-paid/status.
+    Con resend=true también se encolan quienes ya recibieron su QR.
+    """
+    return outbox_service.enqueue_event_qrs(db, event_id, resend=resend)
+
+@router.get("/{event_id}/send-qrs-paid/status")
+def send_qrs_paid_status(event_id: int, db: Session = Depends(get_read_db)):
+    """Progreso del envío de QR del evento: pendientes, enviados y fallidos definitivos."""
+    return outbox_service.event_status(db, event_id)
 
 @router.post("/{registration_id}/send-single-qr")
 async def send_single_qr(registration_id: int, db: Session = Depends(get_db)):
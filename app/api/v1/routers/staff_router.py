@@ -1,23 +1,40 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
-from app.schemas.staff_schema import StaffCreate, StaffOut
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.dependencies import StaffPrincipal, get_current_admin
+from app.core.replica import get_async_read_db
+from app.schemas.staff_schema import StaffCreate, StaffOut, StaffPage, StaffUpdate
 from app.services.staff_service import StaffService
 
 router = APIRouter(prefix="/staff", tags=["Staff"])
 service = StaffService()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=StaffOut)
-def create_staff(data: StaffCreate, db: Session = Depends(get_db)):
-    return service.create_staff(db, data)
+async def create_staff(data: StaffCreate, db: AsyncSession = Depends(get_async_db)):
+    return await service.create_staff_async(db, data)
+
+@router.patch("/{staff_id}", response_model=StaffOut)
+async def update_staff(
+    staff_id: int,
+    data: StaffUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: StaffPrincipal = Depends(get_current_admin),
+):
+    return await service.update_staff_async(db, staff_id, data)
+
+@router.get("/", response_model=StaffPage)
+async def list_staff(
+    limit: int = Query(settings.DEFAULT_PAGE_LIMIT, ge=1, le=settings.MAX_PAGE_LIMIT),
+    after: Optional[str] = None,
+    sort: Literal["id", "username", "created_at"] = "id",
+    order: Literal["asc", "desc"] = "asc",
+    role: Optional[str] = None,
+    is_active: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_read_db),
+):
+    page = await service.list_staff_async(db, limit, after, sort, order, role=role, is_active=is_active)
+    return ORJSONResponse(page)
 
-@router.get("/", response_model=list[StaffOut])
-def list_staff(db: Session = Depends(get_db)):
-    return service.list_staff(db)
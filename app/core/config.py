@@ -1,3 +1,5 @@
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -5,13 +7,107 @@ class Settings(BaseSettings):
     MYSQL_PASSWORD: str = "12345"
     MYSQL_HOST: str = "localhost"
     MYSQL_DB: str = "events_db"
+    # Otra base en lugar de MySQL (p. ej. sqlite:///./dev.db para las pruebas locales)
+    DATABASE_URL_OVERRIDE: Optional[str] = None
+    # Motor async: por defecto la misma base con aiomysql (p. ej. sqlite+aiosqlite:///./dev.db para pruebas locales)
+    ASYNC_DATABASE_URL_OVERRIDE: Optional[str] = None
+
+    # Réplica de lectura (opcional): mismo usuario; MYSQL_REPLICA_DB permite probar con dos bases locales
+    MYSQL_REPLICA_HOST: Optional[str] = None
+    MYSQL_REPLICA_DB: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: int = 5  # más atraso → las lecturas vuelven al primario
+    REPLICA_LAG_CHECK_SECONDS: int = 5
+
+    # Pool de conexiones (por motor: sync y async)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # segundos esperando una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # renovar antes del wait_timeout de MySQL
+    # Ping en cada checkout: evita conexiones muertas a costa de un round trip.
+    # Con DB_POOL_RECYCLE por debajo del wait_timeout se puede desactivar.
+    DB_POOL_PRE_PING: bool = True
     
     SECRET_KEY: str = "secret-key-demo-123"  # 🔸 cámbialo por algo más fuerte en producción
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 14
+    TOKEN_CACHE_SIZE: int = 4096  # JWT ya verificados que se recuerdan
+    ADMIN_ROLE: str = "admin"  # rol del staff que puede administrar staff y ver métricas internas
+
+    # bcrypt: costo y pool propio (cola acotada; lleno → 503)
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_WORKERS: int = 2
+    BCRYPT_QUEUE_SIZE: int = 16
+
+    # Caché del staff autenticado (get_current_user)
+    STAFF_CACHE_SIZE: int = 1024
+    STAFF_CACHE_TTL_SECONDS: int = 60
+
+    # Firma de los QR y caché de imágenes
+    QR_SECRET_KEY: str = "ucc-seminario-secret-key"
+    QR_CACHE_DIR: str = "app/static/qrs/cache"
+    QR_CACHE_SIZE: int = 1024
+    QR_RENDER_WORKERS: int = 0  # 0 = un proceso por núcleo
+
+    # Envío de correos (pool SMTP)
+    MAIL_POOL_SIZE: int = 4
+    MAIL_MAX_MESSAGES_PER_CONNECTION: int = 50
+    MAIL_RATE_PER_SECOND: float = 5.0
+
+    # Bandeja de salida (outbox) de correos
+    OUTBOX_DISPATCHER_ENABLED: bool = True
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_POLL_SECONDS: float = 2.0
+    OUTBOX_MAX_ATTEMPTS: int = 5
+    OUTBOX_BACKOFF_SECONDS: int = 30
+    OUTBOX_MAX_BACKOFF_SECONDS: int = 3600
+    OUTBOX_STALE_SECONDS: int = 600
+
+    # Índice en memoria para el check-in
+    REGISTRATION_INDEX_ENABLED: bool = True
+    REGISTRATION_INDEX_REFRESH_SECONDS: int = 60
+
+    # Escritura de asistencias: "sync" (commit por escaneo) o "batched" (diario local + volcado por lotes)
+    ATTENDANCE_WRITE_MODE: Literal["sync", "batched"] = "sync"
+    ATTENDANCE_JOURNAL_DIR: str = "app/static/attendance_journal"
+    ATTENDANCE_FLUSH_INTERVAL_MS: int = 200
+    ATTENDANCE_FLUSH_MAX_ROWS: int = 500
+    ATTENDANCE_BATCH_MAX_ITEMS: int = 2000
+
+    # Paginación de listados
+    DEFAULT_PAGE_LIMIT: int = 50
+    MAX_PAGE_LIMIT: int = 500
+
+    # Exportaciones (filas traídas por lote desde el cursor del servidor)
+    EXPORT_YIELD_PER: int = 1000
+
+    # Importaciones masivas (filas por lote / por commit)
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_WORKERS: int = 2
+    IMPORT_JOBS_KEPT: int = 100
 
     @property
     def DATABASE_URL(self):
+        if self.DATABASE_URL_OVERRIDE:
+            return self.DATABASE_URL_OVERRIDE
         return f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_HOST}/{self.MYSQL_DB}"
 
+    @property
+    def ASYNC_DATABASE_URL(self):
+        if self.ASYNC_DATABASE_URL_OVERRIDE:
+            return self.ASYNC_DATABASE_URL_OVERRIDE
+        return f"mysql+aiomysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{self.MYSQL_HOST}/{self.MYSQL_DB}"
+
+    @property
+    def REPLICA_DATABASE_URL(self):
+        if not (self.MYSQL_REPLICA_HOST or self.MYSQL_REPLICA_DB):
+            return None
+        host = self.MYSQL_REPLICA_HOST or self.MYSQL_HOST
+        return f"mysql+pymysql://{self.MYSQL_USER}:{self.MYSQL_PASSWORD}@{host}/{self.MYSQL_REPLICA_DB or self.MYSQL_DB}"
+
+    @property
+    def ASYNC_REPLICA_DATABASE_URL(self):
+        url = self.REPLICA_DATABASE_URL
+        return url.replace("mysql+pymysql://", "mysql+aiomysql://", 1) if url else None
+
 settings = Settings()
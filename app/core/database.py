@@ -1,7 +1,43 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
+from app.core.pool_metrics import timed_pool_class
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+# Cada motor tiene su propio pool con estos límites (ver DB_POOL_* en Settings)
+pool_options = dict(
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+)
+
+engine = create_engine(settings.DATABASE_URL, poolclass=timed_pool_class(QueuePool), **pool_options)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
+
+# ⚡ Motor async para las rutas calientes (check-in, listados, login):
+# las consultas no ocupan un hilo del threadpool mientras esperan a la base.
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL, poolclass=timed_pool_class(AsyncAdaptedQueuePool), **pool_options
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+# 📖 Réplica de lectura opcional (listados, exportaciones, QR); ver app/core/replica.py
+replica_engine = None
+ReplicaSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+if settings.REPLICA_DATABASE_URL:
+    replica_engine = create_engine(settings.REPLICA_DATABASE_URL, poolclass=timed_pool_class(QueuePool), **pool_options)
+    ReplicaSessionLocal = sessionmaker(bind=replica_engine, autocommit=False, autoflush=False)
+    async_replica_engine = create_async_engine(
+        settings.ASYNC_REPLICA_DATABASE_URL, poolclass=timed_pool_class(AsyncAdaptedQueuePool), **pool_options
+    )
+    AsyncReplicaSessionLocal = async_sessionmaker(bind=async_replica_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,11 +1,35 @@
+from datetime import datetime
+from typing import NamedTuple
+
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from app.core.config import settings
-from app.models.staff import Staff
+from app.core.jwt import verify_token
+from app.core.security import token_digest
+from app.core.ttl_cache import TTLCache
+from app.repositories.device_key_repository import DeviceKeyRepository
+from app.repositories.staff_repository import StaffRepository
 from app.core.database import SessionLocal
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+# Escáneres: llave de dispositivo de larga duración en lugar de login
+device_key_header = APIKeyHeader(name="X-Device-Key", auto_error=False)
+staff_repo = StaffRepository()
+device_repo = DeviceKeyRepository()
+
+
+class StaffPrincipal(NamedTuple):
+    """Lo que necesita la autorización del usuario autenticado."""
+    id: int
+    username: str
+    role: str | None
+    is_active: bool
+
+
+# 🔐 Staff autenticado por id; se invalida al modificar el staff (ver StaffService)
+staff_cache = TTLCache(settings.STAFF_CACHE_SIZE, settings.STAFF_CACHE_TTL_SECONDS)
+# 📟 HMAC de la llave de dispositivo → id del staff; se invalida al revocarla (ver AuthService)
+device_cache = TTLCache(settings.STAFF_CACHE_SIZE, settings.STAFF_CACHE_TTL_SECONDS)
 
 def get_db():
     db = SessionLocal()
@@ -14,21 +38,74 @@ def get_db():
     finally:
         db.close()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db=Depends(get_db)):
+def load_principal(staff_id: int) -> StaffPrincipal | None:
+    """Busca el staff en la caché y solo abre sesión con la base si no está."""
+    principal = staff_cache.get(staff_id)
+    if principal is not None:
+        return principal
+
+    db = SessionLocal()
+    try:
+        row = staff_repo.get_principal(db, staff_id)
+    finally:
+        db.close()
+    if row is None:
+        return None
+    principal = StaffPrincipal(row.id, row.username, row.role, bool(row.is_active))
+    staff_cache.set(staff_id, principal)
+    return principal
+
+def load_device_staff_id(device_key: str) -> int | None:
+    """Resuelve una llave de dispositivo con una búsqueda por HMAC (caché primero)."""
+    digest = token_digest(device_key)
+    staff_id = device_cache.get(digest)
+    if staff_id is not None:
+        return staff_id
+
+    db = SessionLocal()
+    try:
+        row = device_repo.get_active_by_hash(db, digest)
+        if row is not None:
+            # Último uso aproximado: solo se escribe cuando la llave no estaba en caché
+            device_repo.touch(db, row.id, datetime.utcnow())
+            db.commit()
+    finally:
+        db.close()
+    if row is None:
+        return None
+    device_cache.set(digest, row.staff_id)
+    return row.staff_id
+
+def get_current_user(
+    token: str | None = Depends(oauth2_scheme),
+    device_key: str | None = Depends(device_key_header),
+) -> StaffPrincipal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        staff_id: str = payload.get("sub")
+    if token:
+        payload = verify_token(token)
+        staff_id: str = payload.get("sub") if payload else None
+        if staff_id is None:
+            raise credentials_exception
+    elif device_key:
+        staff_id = load_device_staff_id(device_key)
         if staff_id is None:
             raise credentials_exception
-    except JWTError:
+    else:
         raise credentials_exception
 
-    user = db.query(Staff).filter(Staff.id == int(staff_id)).first()
+    user = load_principal(int(staff_id))
     if user is None:
         raise credentials_exception
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return user
+
+def get_current_admin(user: StaffPrincipal = Depends(get_current_user)) -> StaffPrincipal:
+    """Staff autenticado con el rol de administración (ADMIN_ROLE)."""
+    if user.role != settings.ADMIN_ROLE:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
     return user
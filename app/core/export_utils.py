@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from urllib.parse import quote
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def content_disposition(filename: str) -> str:
+    """
+    Encabezado de descarga para un nombre arbitrario: `filename` con una versión
+    ASCII segura (sin comillas ni ';') y `filename*` (RFC 5987) con el nombre original.
+    """
+    fallback = re.sub(r"[^A-Za-z0-9._-]", "_", filename)
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+def _to_primitive(value):
+    """Convierte fechas y enums a tipos serializables."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "value"):  # Enum
+        return value.value
+    return value
+
+
+def iter_csv(columns: list[str], rows, chunk_rows: int = 500):
+    """Genera el CSV por bloques de texto; la cabecera sale de inmediato."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_to_primitive(v) for v in row])
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if pending:
+        yield buf.getvalue()
+
+
+def iter_ndjson(columns: list[str], rows, chunk_rows: int = 500):
+    """Genera un objeto JSON por línea, agrupando varias líneas por bloque."""
+    lines = []
+    first = True
+    for row in rows:
+        record = {col: _to_primitive(v) for col, v in zip(columns, row)}
+        lines.append(json.dumps(record, ensure_ascii=False))
+        # El primer registro se envía solo para que el primer byte salga enseguida
+        if first or len(lines) >= chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+            first = False
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+class _ZipBuffer(io.RawIOBase):
+    """Destino sin seek para ZipFile: acumula lo escrito hasta que se entrega."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries):
+    """
+    Genera un ZIP en streaming a partir de pares (nombre, bytes). Cada archivo
+    sale en cuanto se agrega; se usa ZIP_STORED porque los PNG ya vienen comprimidos.
+    """
+    buf = _ZipBuffer()
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+            yield buf.drain()
+    yield buf.drain()
@@ -0,0 +1,74 @@
+import csv
+import io
+from itertools import islice
+
+from openpyxl import load_workbook
+
+
+def chunked(iterable, size: int):
+    """Divide un iterable en listas de `size` elementos sin materializarlo completo."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def cell_to_str(value):
+    """Normaliza una celda a texto: vacías → None y números enteros sin '.0'."""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return None
+        if value.is_integer():
+            return str(int(value))
+    value = str(value).strip()
+    return value or None
+
+
+def parse_bool(value) -> bool:
+    """Interpreta valores booleanos comunes en hojas de cálculo (1, true, sí...)."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        return value.strip().lower() in ["true", "1", "yes", "si", "sí"]
+    return False
+
+
+def open_spreadsheet(file, filename: str | None = None, required_columns=()):
+    """
+    Abre un .xlsx (openpyxl en modo read_only) o un .csv y retorna un
+    generador de filas como diccionarios. Las filas se leen de forma perezosa,
+    así la hoja completa nunca queda en memoria.
+    Lanza ValueError si faltan columnas requeridas.
+    """
+    if filename and filename.lower().endswith(".csv"):
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+        reader = csv.reader(text)
+        header = [str(c).strip() for c in next(reader, [])]
+        values_iter = reader
+        close = text.detach
+    else:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        values_iter = workbook.active.iter_rows(values_only=True)
+        header = [str(c).strip() if c is not None else "" for c in next(values_iter, ())]
+        close = workbook.close
+
+    missing = [c for c in required_columns if c not in header]
+    if missing:
+        close()
+        raise ValueError(f"Faltan columnas: {', '.join(missing)}")
+
+    def rows():
+        try:
+            for values in values_iter:
+                if any(v not in (None, "") for v in values):
+                    yield dict(zip(header, values))
+        finally:
+            close()
+
+    return rows()
@@ -1,6 +1,12 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
 from app.core.config import settings
+from app.core.ttl_cache import TTLCache
+
+# ✅ Tokens ya verificados (digest → payload), cada uno hasta su exp
+token_cache = TTLCache(settings.TOKEN_CACHE_SIZE, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
@@ -10,8 +16,23 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     return encoded_jwt
 
 def verify_token(token: str):
+    """
+    Verifica el JWT (firma y exp) y retorna su payload, o None si no es válido.
+    Un token ya verificado se resuelve desde la caché sin volver a decodificarlo
+    hasta que vence; los inválidos no se guardan.
+    """
+    digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         return None
+
+    exp = payload.get("exp")
+    ttl = exp - time.time() if exp is not None else None
+    if ttl is None or ttl > 0:
+        token_cache.set(digest, payload, ttl)
+    return payload
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from email.message import EmailMessage
+
+import aiosmtplib
+
+from app.core.config import settings
+from app.core.mail_config import conf
+
+
+class RateLimiter:
+    """Token bucket asíncrono: como máximo `rate` mensajes por segundo (con ráfaga `burst`)."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+
+
+class SMTPPool:
+    """
+    Pool de conexiones SMTP autenticadas y reutilizables.
+    - `size` limita las conexiones abiertas (y por tanto los envíos en paralelo).
+    - Cada conexión se cierra tras `max_messages` mensajes.
+    - `rate` limita los mensajes por segundo de todo el pool.
+    """
+
+    def __init__(self, host: str, port: int, username: str | None, password: str | None,
+                 start_tls: bool = True, use_tls: bool = False, size: int = 4,
+                 max_messages: int = 50, rate: float = 0, timeout: float = 60):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.use_tls = use_tls
+        self.size = size
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate, burst=size)
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[_PooledConnection] = []
+        self.stats = {"connections_opened": 0, "messages_sent": 0, "errors": 0}
+
+    async def _connect(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            use_tls=self.use_tls,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        await smtp.connect()
+        if self.username and self.password:
+            await smtp.login(self.username, self.password)
+        self.stats["connections_opened"] += 1
+        return _PooledConnection(smtp)
+
+    async def _close(self, conn: _PooledConnection):
+        try:
+            await conn.smtp.quit()
+        except Exception:
+            conn.smtp.close()
+
+    async def send(self, message: EmailMessage):
+        """Envía un mensaje por una conexión del pool; reintenta una vez si el servidor la cerró."""
+        await self.limiter.acquire()
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            for attempt in range(2):
+                if conn is None or not conn.smtp.is_connected:
+                    conn = await self._connect()
+                try:
+                    await conn.smtp.send_message(message)
+                    break
+                except aiosmtplib.SMTPServerDisconnected:
+                    conn = None
+                    if attempt:
+                        self.stats["errors"] += 1
+                        raise
+                except Exception:
+                    self.stats["errors"] += 1
+                    await self._close(conn)
+                    raise
+
+            conn.sent += 1
+            self.stats["messages_sent"] += 1
+            if conn.sent >= self.max_messages:
+                await self._close(conn)
+            else:
+                self._idle.append(conn)
+
+    async def close(self):
+        while self._idle:
+            await self._close(self._idle.pop())
+
+
+_pool: SMTPPool | None = None
+
+
+def _secret(value):
+    return value.get_secret_value() if hasattr(value, "get_secret_value") else value
+
+
+def get_mail_pool() -> SMTPPool:
+    """Pool compartido del proceso, configurado con las credenciales de mail_config."""
+    global _pool
+    if _pool is None:
+        _pool = SMTPPool(
+            host=conf.MAIL_SERVER,
+            port=conf.MAIL_PORT,
+            username=conf.MAIL_USERNAME if conf.USE_CREDENTIALS else None,
+            password=_secret(conf.MAIL_PASSWORD) if conf.USE_CREDENTIALS else None,
+            start_tls=conf.MAIL_STARTTLS,
+            use_tls=conf.MAIL_SSL_TLS,
+            size=settings.MAIL_POOL_SIZE,
+            max_messages=settings.MAIL_MAX_MESSAGES_PER_CONNECTION,
+            rate=settings.MAIL_RATE_PER_SECOND,
+        )
+    return _pool
+
+
+def build_message(to: str, subject: str, html: str, attachments: list[tuple[str, bytes, str]] = ()) -> EmailMessage:
+    """Arma un correo HTML; attachments son tuplas (nombre, bytes, subtipo de imagen)."""
+    message = EmailMessage()
+    message["From"] = conf.MAIL_FROM
+    message["To"] = to
+    message["Subject"] = subject
+    message.set_content("Este mensaje requiere un cliente de correo compatible con HTML.")
+    message.add_alternative(html, subtype="html")
+    for filename, data, subtype in attachments:
+        message.add_attachment(data, maintype="image", subtype=subtype, filename=filename)
+    return message
@@ -0,0 +1,95 @@
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(sort: str, value, pk) -> str:
+    """Codifica la posición (valor de orden + llave primaria) en un cursor opaco."""
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif hasattr(value, "value"):  # Enum
+        value = value.value
+    raw = json.dumps({"s": sort, "v": value, "k": pk}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, column):
+    """Decodifica un cursor y valida que corresponda al mismo criterio de orden."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, pk = data["v"], data["k"]
+        if data["s"] != sort:
+            raise ValueError("sort mismatch")
+        python_type = getattr(column.type, "python_type", None)
+        if value is not None and python_type in (datetime, date):
+            value = datetime.fromisoformat(value)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido")
+    return value, pk
+
+
+def _keyset_filter(column, pk_column, value, last_pk, descending: bool):
+    """
+    Condición "después de (value, last_pk)".
+    MySQL ordena los NULL primero en ASC y al final en DESC, se respeta ese orden.
+    """
+    if column is pk_column:
+        return pk_column < last_pk if descending else pk_column > last_pk
+    if descending:
+        if value is None:
+            return and_(column.is_(None), pk_column < last_pk)
+        return or_(column < value, and_(column == value, pk_column < last_pk), column.is_(None))
+    if value is None:
+        return or_(and_(column.is_(None), pk_column > last_pk), column.isnot(None))
+    return or_(column > value, and_(column == value, pk_column > last_pk))
+
+
+def _page_statement(query, sort: str, column, pk_column, limit: int, after: str | None, descending: bool):
+    """Aplica cursor, orden y límite al select()."""
+    if after:
+        value, last_pk = decode_cursor(after, sort, column)
+        query = query.filter(_keyset_filter(column, pk_column, value, last_pk, descending))
+
+    if column is pk_column:
+        order = [pk_column.desc() if descending else pk_column.asc()]
+    elif descending:
+        order = [column.desc(), pk_column.desc()]
+    else:
+        order = [column.asc(), pk_column.asc()]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def _page_result(rows, sort: str, column, pk_column, limit: int):
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, getattr(last, column.key), getattr(last, pk_column.key))
+    return items, next_cursor
+
+
+def page_columns(model, schema) -> list:
+    """
+    Columnas del modelo que corresponden a los campos del esquema de salida.
+    Leer solo esas columnas evita construir objetos ORM en los listados grandes.
+    """
+    return [getattr(model, name) for name in schema.model_fields]
+
+
+async def paginate_async(
+    db: AsyncSession, stmt: Select, sort: str, column, pk_column, limit: int,
+    after: str | None = None, descending: bool = False,
+):
+    """
+    Paginación por cursor (keyset) de un select() de columnas en una AsyncSession:
+    ordena por `column` y desempata por `pk_column`. Retorna (filas, next_cursor);
+    la columna de orden y la llave deben estar en la proyección.
+    """
+    stmt = _page_statement(stmt, sort, column, pk_column, limit, after, descending)
+    rows = (await db.execute(stmt)).all()
+    return _page_result(rows, sort, column, pk_column, limit)
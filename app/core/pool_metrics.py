@@ -0,0 +1,83 @@
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+# Límites (en ms) de los buckets del histograma de espera
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class WaitHistogram:
+    """Histograma acumulado del tiempo que tarda obtener una conexión del pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.timeouts = 0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        index = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.counts[index] += 1
+            self.total += 1
+            self.sum_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+
+    def timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in WAIT_BUCKETS_MS] + [f">{WAIT_BUCKETS_MS[-1]}ms"]
+            return {
+                "count": self.total,
+                "avg_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+                "max_ms": round(self.max_ms, 3),
+                "timeouts": self.timeouts,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+
+
+class _TimedCheckout:
+    """Mide cada checkout (espera en la cola + conexión nueva si hace falta)."""
+    wait: WaitHistogram
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            type(self).wait.timeout()
+            raise
+        finally:
+            type(self).wait.observe(time.perf_counter() - start)
+
+
+def timed_pool_class(base=QueuePool):
+    """
+    Subclase del pool con su propio histograma; se crea una por motor.
+    El histograma vive en la clase: sobrevive a pool.recreate() (p. ej. tras una desconexión).
+    """
+    return type(f"Timed{base.__name__}", (_TimedCheckout, base), {"wait": WaitHistogram()})
+
+
+def pool_stats(pool) -> dict:
+    """Estado actual del pool y el histograma de espera de su clase."""
+    stats = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    wait = getattr(type(pool), "wait", None)
+    if wait is not None:
+        stats["wait"] = wait.snapshot()
+    return stats
@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import qrcode
+
+from app.core.config import settings
+
+_lru = OrderedDict()
+_lock = threading.Lock()
+_pool = None
+
+
+def content_hash(content: str) -> str:
+    """Dirección del QR: sha256 del contenido codificado."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def cache_path(digest: str) -> str:
+    return os.path.join(settings.QR_CACHE_DIR, digest[:2], f"{digest}.png")
+
+
+def render_qr_png(content: str) -> bytes:
+    """Dibuja el QR y lo codifica a PNG una sola vez."""
+    qr = qrcode.QRCode(box_size=10, border=4)
+    qr.add_data(content)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _remember(digest: str, png: bytes):
+    with _lock:
+        _lru[digest] = png
+        _lru.move_to_end(digest)
+        while len(_lru) > settings.QR_CACHE_SIZE:
+            _lru.popitem(last=False)
+
+
+def _store(path: str, png: bytes):
+    """Escritura atómica: nunca queda un PNG a medias visible en disco."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(png)
+    os.replace(tmp, path)
+
+
+def lookup_qr_png(content: str):
+    """Busca el PNG en memoria y luego en disco, sin dibujarlo. Retorna (ruta, bytes | None)."""
+    digest = content_hash(content)
+    path = cache_path(digest)
+    with _lock:
+        png = _lru.get(digest)
+        if png is not None:
+            _lru.move_to_end(digest)
+            return path, png
+    if os.path.exists(path):
+        with open(path, "rb") as fh:
+            png = fh.read()
+        _remember(digest, png)
+        return path, png
+    return path, None
+
+
+def store_qr_png(content: str, png: bytes) -> str:
+    """Guarda un PNG ya dibujado en disco y en la LRU. Retorna la ruta."""
+    digest = content_hash(content)
+    path = cache_path(digest)
+    _store(path, png)
+    _remember(digest, png)
+    return path
+
+
+def get_qr_png(content: str, use_pool: bool = False):
+    """
+    PNG del QR para `content`: LRU en memoria → archivo en disco → dibujo.
+    Retorna (ruta, bytes). Solo se dibuja la primera vez que se pide un contenido.
+    Con use_pool=True el dibujo se hace en el pool de procesos y el hilo que
+    llama solo espera, sin retener el GIL.
+    """
+    path, png = lookup_qr_png(content)
+    if png is None:
+        png = render_pool().submit(render_qr_png, content).result() if use_pool else render_qr_png(content)
+        path = store_qr_png(content, png)
+    return path, png
+
+
+async def get_qr_png_async(content: str):
+    """
+    Versión para corrutinas: la lectura de disco va a un hilo y el dibujo al
+    pool de procesos, de modo que el event loop nunca se bloquea.
+    """
+    loop = asyncio.get_running_loop()
+    path, png = await asyncio.to_thread(lookup_qr_png, content)
+    if png is None:
+        png = await loop.run_in_executor(render_pool(), render_qr_png, content)
+        path = await asyncio.to_thread(store_qr_png, content, png)
+    return path, png
+
+
+def render_pool() -> ProcessPoolExecutor:
+    """
+    Pool de procesos para dibujar QR en todos los núcleos. Usa "spawn" para no
+    heredar hilos ni conexiones del servidor al crear los procesos hijos.
+    """
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.QR_RENDER_WORKERS or os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def iter_qr_pngs(items):
+    """
+    Recibe pares (llave, contenido) y entrega (llave, png) a medida que están
+    listos: primero los que ya estaban en caché y luego los dibujados en el
+    pool de procesos, en orden de terminación. Se mantienen pocas tareas en
+    vuelo para que la memoria no crezca con el tamaño del evento.
+    """
+    pool = render_pool()
+    max_in_flight = (settings.QR_RENDER_WORKERS or os.cpu_count() or 1) * 4
+    pending = {}
+
+    def drain(return_when):
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            key, content = pending.pop(future)
+            png = future.result()
+            store_qr_png(content, png)
+            yield key, png
+
+    for key, content in items:
+        _, png = lookup_qr_png(content)
+        if png is not None:
+            yield key, png
+            continue
+        pending[pool.submit(render_qr_png, content)] = (key, content)
+        if len(pending) >= max_in_flight:
+            yield from drain(FIRST_COMPLETED)
+
+    while pending:
+        yield from drain(FIRST_COMPLETED)
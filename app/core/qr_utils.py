@@ -4,6 +4,7 @@ import base64
 import json
 import os
 from dotenv import load_dotenv
+from app.core.config import settings
 
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "clave_fallback_segura")
@@ -32,3 +33,26 @@ def verify_qr_signature(data: dict) -> bool:
         digestmod=hashlib.sha256
     ).hexdigest()
     return hmac.compare_digest(signature, expected_signature)
+
+def registration_qr_payload(registration_id: int, event_id: int, participant_document_id: str, version: int = 1) -> dict:
+    """
+    Payload firmado del QR de una inscripción. Es determinista: la misma
+    inscripción y versión producen siempre la misma firma (y la misma imagen).
+    Para revocar un QR basta con subir la versión de la inscripción.
+    """
+    payload = {
+        "registration_id": registration_id,
+        "event_id": event_id,
+        "participant_document_id": participant_document_id,
+        "v": version,
+    }
+    payload["signature"] = hmac.new(
+        settings.QR_SECRET_KEY.encode(),
+        json.dumps(payload, sort_keys=True).encode(),
+        hashlib.sha256
+    ).hexdigest()
+    return payload
+
+def registration_qr_content(registration_id: int, event_id: int, participant_document_id: str, version: int = 1) -> str:
+    """Texto que se codifica en la imagen del QR."""
+    return json.dumps(registration_qr_payload(registration_id, event_id, participant_document_id, version))
@@ -0,0 +1,148 @@
+import logging
+import time
+
+from fastapi import Request, Response
+from starlette.datastructures import MutableHeaders
+from sqlalchemy.exc import DBAPIError
+
+from app.core import database
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Encabezado para forzar el primario en una petición de lectura
+READ_PRIMARY_HEADER = "X-Read-Primary"
+# Cookie que deja las lecturas en el primario un rato después de escribir (read-your-writes)
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+class ReplicaState:
+    """Atraso de la réplica medido por la tarea de fondo; las rutas solo leen este estado."""
+
+    def __init__(self):
+        self.lag_seconds: float | None = None
+        self.healthy = False
+        self.checked_at: float | None = None
+        self.error: str | None = None
+
+    def snapshot(self) -> dict:
+        return {
+            "configured": database.replica_engine is not None,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": settings.REPLICA_MAX_LAG_SECONDS,
+            "checked_at": self.checked_at,
+            "error": self.error,
+        }
+
+
+replica_state = ReplicaState()
+
+
+def _replication_lag(conn):
+    """
+    Segundos de atraso según SHOW REPLICA STATUS (o SHOW SLAVE STATUS en MySQL < 8.0.22).
+    Sin estado de replicación (copia mantenida de otra forma, bases locales de prueba) se toma 0;
+    None significa replicación detenida.
+    """
+    if conn.dialect.name != "mysql":
+        return 0
+    for statement, column in (
+        ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+        ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+    ):
+        try:
+            row = conn.exec_driver_sql(statement).mappings().first()
+        except DBAPIError:
+            continue
+        return 0 if row is None else row[column]
+    raise RuntimeError("No se pudo leer el estado de replicación")
+
+
+def check_replica_lag():
+    """Mide el atraso de la réplica y decide si puede recibir lecturas."""
+    if database.replica_engine is None:
+        return
+    try:
+        with database.replica_engine.connect() as conn:
+            lag = _replication_lag(conn)
+        replica_state.lag_seconds = lag
+        replica_state.healthy = lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+        replica_state.error = None if lag is not None else "Replicación detenida"
+    except Exception as e:
+        replica_state.healthy = False
+        # El detalle (host, usuario, SQL) queda solo en el log; el estado expuesto lleva el tipo de error
+        replica_state.error = f"Réplica no disponible ({type(e).__name__})"
+        logger.warning("Réplica no disponible, las lecturas van al primario: %s", e)
+    replica_state.checked_at = time.time()
+
+
+def use_replica(request: Request) -> bool:
+    """Lecturas a la réplica salvo que no exista, esté atrasada o la petición pida el primario."""
+    if database.replica_engine is None or not replica_state.healthy:
+        return False
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return False
+    try:
+        if float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time():
+            return False
+    except ValueError:
+        pass
+    return True
+
+
+def read_sessionmaker(request: Request):
+    """Fábrica de sesiones para lecturas fuera de una dependencia (p. ej. exportaciones en streaming)."""
+    return database.ReplicaSessionLocal if use_replica(request) else database.SessionLocal
+
+
+def get_read_db(request: Request):
+    db = read_sessionmaker(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request):
+    factory = database.AsyncReplicaSessionLocal if use_replica(request) else database.AsyncSessionLocal
+    async with factory() as db:
+        yield db
+
+
+def _read_primary_cookie() -> str:
+    response = Response()
+    response.set_cookie(
+        READ_PRIMARY_COOKIE,
+        str(time.time() + settings.REPLICA_MAX_LAG_SECONDS),
+        max_age=settings.REPLICA_MAX_LAG_SECONDS,
+        httponly=True,
+    )
+    return response.headers["set-cookie"]
+
+
+class ReadPrimaryMiddleware:
+    """
+    Tras una escritura exitosa, las lecturas de ese cliente van al primario
+    durante REPLICA_MAX_LAG_SECONDS (el atraso máximo que se tolera).
+    Middleware ASGI puro: sin réplica, o en lecturas, la petición pasa directo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or database.replica_engine is None
+            or scope["method"] in ("GET", "HEAD", "OPTIONS")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", _read_primary_cookie())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
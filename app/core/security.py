@@ -1,32 +1,85 @@
+import asyncio
+import hashlib
+import hmac
+import secrets
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.config import settings
 
-def hash_password(password: str) -> str:
-    """Hashea la contraseña, truncándola a 72 bytes para cumplir con las limitaciones de bcrypt."""
-    if not password:
-        raise ValueError("Password no puede ser vacío o None")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# 🔒 bcrypt corre en su propio pool acotado: una ráfaga de logins no ocupa los
+# hilos compartidos de FastAPI (check-in, listados). Si el pool y su cola están
+# llenos se responde 503 de inmediato en lugar de encolar sin límite.
+_bcrypt_pool = ThreadPoolExecutor(max_workers=settings.BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_bcrypt_slots = threading.BoundedSemaphore(settings.BCRYPT_WORKERS + settings.BCRYPT_QUEUE_SIZE)
 
+
+def _truncate(password) -> str:
+    """bcrypt solo usa los primeros 72 bytes."""
     # Convertir a string si viene como SecretStr o similar
     if not isinstance(password, str):
         password = str(password)
 
-    # Truncar si excede 72 bytes
     encoded = password.encode("utf-8")
     if len(encoded) > 72:
         encoded = encoded[:72]
         password = encoded.decode("utf-8", errors="ignore")
+    return password
+
+
+def _submit(fn, *args) -> Future:
+    if not _bcrypt_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Demasiados inicios de sesión simultáneos, intente de nuevo",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _bcrypt_pool.submit(fn, *args)
+    except BaseException:
+        _bcrypt_slots.release()
+        raise
+    future.add_done_callback(lambda _: _bcrypt_slots.release())
+    return future
 
-    return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+# Solo hay variantes async: esperar el pool con .result() desde una ruta síncrona
+# volvería a ocupar un hilo compartido durante todo el hash.
+async def hash_password_async(password: str) -> str:
+    """
+    Hashea la contraseña, truncándola a 72 bytes para cumplir con las limitaciones de bcrypt.
+    Espera sin bloquear el event loop ni un hilo compartido.
+    """
+    if not password:
+        raise ValueError("Password no puede ser vacío o None")
+    return await asyncio.wrap_future(_submit(pwd_context.hash, _truncate(password)))
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
     """Verifica la contraseña sin lanzar error si es demasiado larga."""
-    if not isinstance(plain_password, str):
-        plain_password = str(plain_password)
+    return await asyncio.wrap_future(_submit(pwd_context.verify, _truncate(plain_password), hashed_password))
 
-    encoded = plain_password.encode("utf-8")
-    if len(encoded) > 72:
-        encoded = encoded[:72]
-        plain_password = encoded.decode("utf-8", errors="ignore")
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True si el hash usa otro esquema o un costo distinto de BCRYPT_ROUNDS."""
+    if pwd_context.needs_update(hashed_password):
+        return True
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+def new_secret_token(prefix: str = "") -> str:
+    """Token aleatorio opaco (refresh token, llave de dispositivo)."""
+    return prefix + secrets.token_urlsafe(32)
 
-    return pwd_context.verify(plain_password, hashed_password)
+def token_digest(token: str) -> str:
+    """
+    HMAC-SHA256 del token con la llave del servidor. Es lo único que se guarda
+    en la base y se verifica con una búsqueda, sin bcrypt: los tokens son
+    aleatorios de alta entropía.
+    """
+    return hmac.new(settings.SECRET_KEY.encode(), token.encode("utf-8"), hashlib.sha256).hexdigest()
@@ -1,4 +1,15 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app.core.config import settings
+from app.core import database
+from app.core.database import SessionLocal, async_engine
+from app.core.replica import ReadPrimaryMiddleware, check_replica_lag
+from app.services.attendance_writer import attendance_writer
+from app.services.outbox_service import OutboxService
+from app.services.registration_index import registration_index
 from app.api.v1.routers import (
     staff_router,
     participants_router,
@@ -6,9 +17,66 @@ from app.api.v1.routers import (
     registrations_router,
     attendances_router,
     auth_router,
+    imports_router,
+    internal_router,
 )
 
-app = FastAPI(title="Event Management API")
+def _load_registration_index():
+    db = SessionLocal()
+    try:
+        registration_index.load(db)
+    finally:
+        db.close()
+
+async def _refresh_registration_index(stop: asyncio.Event):
+    """Recarga periódica del índice de check-in (eventos que se activan, cambios de otros workers)."""
+    while not stop.is_set():
+        try:
+            await asyncio.to_thread(_load_registration_index)
+        except Exception:
+            logging.getLogger(__name__).exception("No se pudo recargar el índice de inscripciones")
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.REGISTRATION_INDEX_REFRESH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+async def _watch_replica_lag(stop: asyncio.Event):
+    """Mide el atraso de la réplica; si pasa REPLICA_MAX_LAG_SECONDS las lecturas vuelven al primario."""
+    while not stop.is_set():
+        await asyncio.to_thread(check_replica_lag)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=settings.REPLICA_LAG_CHECK_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    stop = asyncio.Event()
+    tasks = []
+    # 📝 Asistencias por lotes: re-aplica el diario pendiente y arranca el volcado
+    if settings.ATTENDANCE_WRITE_MODE == "batched":
+        await asyncio.to_thread(attendance_writer.start)
+    # 📬 Despachador de la bandeja de salida de correos
+    if settings.OUTBOX_DISPATCHER_ENABLED:
+        tasks.append(asyncio.create_task(OutboxService().run(stop)))
+    # 🎫 Índice en memoria de inscripciones de eventos activos
+    if settings.REGISTRATION_INDEX_ENABLED:
+        tasks.append(asyncio.create_task(_refresh_registration_index(stop)))
+    # 🪞 Réplica de lectura: solo recibe lecturas mientras su atraso sea aceptable
+    if database.replica_engine is not None:
+        tasks.append(asyncio.create_task(_watch_replica_lag(stop)))
+    yield
+    stop.set()
+    await asyncio.gather(*tasks)
+    if settings.ATTENDANCE_WRITE_MODE == "batched":
+        await asyncio.to_thread(attendance_writer.stop)
+    await async_engine.dispose()
+    if database.async_replica_engine is not None:
+        await database.async_replica_engine.dispose()
+        database.replica_engine.dispose()
+
+app = FastAPI(title="Event Management API", lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(ReadPrimaryMiddleware)
 
 app.include_router(auth_router.router)
 app.include_router(staff_router.router)
@@ -16,3 +84,5 @@ app.include_router(participants_router.router)
 app.include_router(events_router.router)
 app.include_router(registrations_router.router)
 app.include_router(attendances_router.router)
+app.include_router(imports_router.router)
+app.include_router(internal_router.router)
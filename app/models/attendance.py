@@ -1,10 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index, Computed
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
+import enum
+
+class AttendanceStatus(enum.Enum):
+    NONE = "NONE"
+    CHECKED_IN = "CHECKED_IN"
+    CHECKED_OUT = "CHECKED_OUT"
 
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (
+        # Última asistencia de una inscripción (check-in / check-out)
+        Index("ix_attendance_registration_id_id", "registration_id", "id"),
+        # Conteos por evento y estado
+        Index("ix_attendance_event_id_status", "event_id", "status"),
+        # A lo sumo una entrada abierta por inscripción (dos escáneres a la vez no duplican el check-in)
+        Index("uq_attendance_open_registration_id", "open_registration_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     registration_id = Column(Integer, ForeignKey("event_registrations.id"), nullable=False)
@@ -12,8 +26,13 @@ class Attendance(Base):
     event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
     check_in_time = Column(DateTime, nullable=True)
     check_out_time = Column(DateTime, nullable=True)
-    status = Column(String(20), default="NONE")  # NONE, CHECKED_IN, CHECKED_OUT
+    status = Column(Enum(AttendanceStatus), default=AttendanceStatus.NONE)
     verified_by = Column(Integer, ForeignKey("staff.id"), nullable=True)
+    # registration_id mientras la entrada está abierta, NULL en cualquier otro caso
+    open_registration_id = Column(
+        Integer,
+        Computed("CASE WHEN status = 'CHECKED_IN' AND check_out_time IS NULL THEN registration_id END", persisted=True),
+    )
 
     registration = relationship("EventRegistration", backref="attendances")
     event = relationship("Event", backref="attendances")
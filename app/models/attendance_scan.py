@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, TIMESTAMP, func
+from app.core.database import Base
+
+class AttendanceScan(Base):
+    """
+    Recibo de cada escaneo subido por lotes, por llave de idempotencia.
+    Permite que un escáner reenvíe el mismo lote sin duplicar asistencias.
+    """
+    __tablename__ = "attendance_scans"
+
+    idempotency_key = Column(String(64), primary_key=True)
+    registration_id = Column(Integer, ForeignKey("event_registrations.id"), nullable=True)
+    result = Column(String(20), nullable=False)  # checked_in / checked_out / rejected
+    detail = Column(String(255), nullable=True)
+    scanned_at = Column(DateTime, nullable=False)
+    received_at = Column(TIMESTAMP, server_default=func.now())
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, TIMESTAMP, func
+from app.core.database import Base
+
+class DeviceKey(Base):
+    """Credencial de larga duración de un escáner; actúa en nombre del staff que la creó."""
+    __tablename__ = "device_keys"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False, index=True)
+    key_prefix = Column(String(12), nullable=False)  # para reconocerla en listados
+    key_hash = Column(String(64), unique=True, nullable=False)
+    last_used_at = Column(DateTime, nullable=True)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
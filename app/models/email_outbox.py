@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, SmallInteger, Enum, ForeignKey, Index, TIMESTAMP, func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+import enum
+
+class OutboxStatus(enum.Enum):
+    PENDING = "PENDING"   # en cola o esperando reintento
+    SENDING = "SENDING"   # tomado por un despachador
+    SENT = "SENT"
+    DEAD = "DEAD"         # agotó los reintentos
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Siguiente lote a despachar
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+        # Progreso por evento
+        Index("ix_email_outbox_event_id_status", "event_id", "status"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    registration_id = Column(Integer, ForeignKey("event_registrations.id"), nullable=False)
+    event_id = Column(Integer, ForeignKey("events.id"), nullable=False)
+    kind = Column(String(20), nullable=False, default="QR")
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING)
+    attempts = Column(SmallInteger, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, server_default=func.now())
+    locked_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+    registration = relationship("EventRegistration", backref="outbox_messages")
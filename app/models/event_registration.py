@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, func, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, TIMESTAMP, func, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class EventRegistration(Base):
     __tablename__ = "event_registrations"
+    __table_args__ = (
+        # Un participante solo puede inscribirse una vez por evento
+        UniqueConstraint("event_id", "participant_document_id", name="uq_event_registrations_event_participant"),
+        # Inscripciones pagadas de un evento (envío masivo de QR)
+        Index("ix_event_registrations_event_id_is_paid", "event_id", "is_paid"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     event_id = Column(Integer, ForeignKey("events.id"))
@@ -14,6 +20,8 @@ class EventRegistration(Base):
     registration_date = Column(TIMESTAMP, server_default=func.now())
     
     is_paid = Column(Boolean, default=False, nullable=False)
+    # Versión del QR firmado; al incrementarla se revocan los QR anteriores
+    qr_version = Column(Integer, default=1, server_default="1", nullable=False)
 
     # 🔹 relaciones
     event = relationship("Event", back_populates="registrations")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Enum, TIMESTAMP, func, SmallInteger
+from sqlalchemy import Column, String, Integer, Enum, TIMESTAMP, func, SmallInteger, Index
 from app.core.database import Base
 import enum
 
@@ -9,6 +9,9 @@ class DocumentType(enum.Enum):
 
 class Participant(Base):
     __tablename__ = "participants"
+    __table_args__ = (
+        Index("ix_participants_email", "email"),
+    )
 
     document_id = Column(String(20), primary_key=True)
     document_type = Column(Enum(DocumentType))
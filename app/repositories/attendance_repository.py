@@ -1,13 +1,180 @@
+from sqlalchemy import bindparam, exists, func, insert, literal, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models.attendance import Attendance
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.event_registration import EventRegistration
 
 class AttendanceRepository:
     def get_all(self, db: Session):
         return db.query(Attendance).all()
 
+    def export_query(self, db: Session, batch_size: int, event_id: int | None = None):
+        """Consulta de columnas planas que se lee por lotes con cursor del lado del servidor."""
+        query = db.query(
+            Attendance.id,
+            Attendance.registration_id,
+            Attendance.event_id,
+            Attendance.participant_document_id,
+            Attendance.check_in_time,
+            Attendance.check_out_time,
+            Attendance.status,
+            Attendance.verified_by,
+        )
+        if event_id is not None:
+            query = query.filter(Attendance.event_id == event_id)
+        return query.order_by(Attendance.id).yield_per(batch_size)
+
     def get_by_id(self, db: Session, attendance_id: int):
         return db.query(Attendance).filter(Attendance.id == attendance_id).first()
 
+    def get_latest_state(self, db: Session, registration_id: int):
+        """Estado y hora de salida de la última asistencia de una inscripción (o None)."""
+        return (
+            db.query(Attendance.status, Attendance.check_out_time)
+            .filter(Attendance.registration_id == registration_id)
+            .order_by(Attendance.id.desc())
+            .first()
+        )
+
+    @staticmethod
+    def _qr_version_matches(registration_id: int, qr_version: int):
+        """La inscripción sigue en esa versión del QR (revocar la sube), según la base y no el índice."""
+        return exists().where(EventRegistration.id == registration_id, EventRegistration.qr_version == qr_version)
+
+    async def get_open_check_in_id_async(self, db: AsyncSession, registration_id: int) -> int | None:
+        """Id de la entrada abierta de la inscripción (índice único sobre open_registration_id), o None."""
+        result = await db.execute(select(Attendance.id).where(Attendance.open_registration_id == registration_id))
+        return result.scalar_one_or_none()
+
+    async def close_open_check_in_async(
+        self, db: AsyncSession, attendance_id: int, registration_id: int, qr_version: int, check_out_time
+    ) -> bool:
+        """
+        Cierra esa entrada con un UPDATE condicional: solo si sigue abierta y el
+        QR no fue revocado. Retorna False si otro escáner la cerró primero o si
+        la versión del QR ya no es la vigente.
+        """
+        table = Attendance.__table__
+        result = await db.execute(
+            update(table)
+            .where(
+                table.c.id == attendance_id,
+                table.c.open_registration_id == registration_id,
+                self._qr_version_matches(registration_id, qr_version),
+            )
+            .values(check_out_time=check_out_time, status=AttendanceStatus.CHECKED_OUT)
+        )
+        return result.rowcount == 1
+
+    async def insert_check_in_async(
+        self,
+        db: AsyncSession,
+        registration_id: int,
+        qr_version: int,
+        participant_document_id: str,
+        event_id: int,
+        check_in_time,
+    ) -> int | None:
+        """
+        Inserta una entrada abierta con INSERT ... SELECT sobre la inscripción y
+        retorna su id, o None si el QR ya fue revocado. El índice único impide
+        una segunda entrada abierta.
+        """
+        table = Attendance.__table__
+        source = select(
+            literal(registration_id, table.c.registration_id.type),
+            literal(participant_document_id, table.c.participant_document_id.type),
+            literal(event_id, table.c.event_id.type),
+            literal(check_in_time, table.c.check_in_time.type),
+            literal(AttendanceStatus.CHECKED_IN.name),
+        ).where(EventRegistration.id == registration_id, EventRegistration.qr_version == qr_version)
+        result = await db.execute(
+            insert(table).from_select(
+                ["registration_id", "participant_document_id", "event_id", "check_in_time", "status"], source
+            )
+        )
+        return result.lastrowid if result.rowcount == 1 else None
+
+    def get_latest_for_registrations(self, db: Session, registration_ids) -> list:
+        """Última asistencia de cada inscripción, para varias inscripciones en una sola consulta."""
+        registration_ids = list(registration_ids)
+        if not registration_ids:
+            return []
+        latest = (
+            db.query(func.max(Attendance.id).label("id"))
+            .filter(Attendance.registration_id.in_(registration_ids))
+            .group_by(Attendance.registration_id)
+            .subquery()
+        )
+        return (
+            db.query(
+                Attendance.id,
+                Attendance.registration_id,
+                Attendance.status,
+                Attendance.check_in_time,
+                Attendance.check_out_time,
+            )
+            .join(latest, Attendance.id == latest.c.id)
+            .all()
+        )
+
+    def get_open_registration_ids(self, db: Session, registration_ids) -> set[int]:
+        """Cuáles de esas inscripciones tienen una entrada abierta, en una sola consulta."""
+        registration_ids = list(registration_ids)
+        if not registration_ids:
+            return set()
+        rows = db.query(Attendance.open_registration_id).filter(Attendance.open_registration_id.in_(registration_ids))
+        return {row[0] for row in rows}
+
+    def bulk_update(self, db: Session, rows: list[dict]):
+        """UPDATE por llave primaria en un solo executemany."""
+        if rows:
+            db.execute(update(Attendance), rows)
+
+    def get_existing_check_ins(self, db: Session, pairs) -> set:
+        """Retorna cuáles pares (registration_id, check_in_time) ya están registrados, en una sola consulta."""
+        pairs = list(pairs)
+        if not pairs:
+            return set()
+        rows = (
+            db.query(Attendance.registration_id, Attendance.check_in_time)
+            .filter(tuple_(Attendance.registration_id, Attendance.check_in_time).in_(pairs))
+            .all()
+        )
+        return {(row[0], row[1]) for row in rows}
+
+    def bulk_check_in(self, db: Session, rows: list[dict]):
+        """Inserta varias entradas (o entradas ya cerradas) en un solo executemany."""
+        if rows:
+            db.execute(
+                insert(Attendance),
+                [{"check_out_time": None, "status": AttendanceStatus.CHECKED_IN, **row} for row in rows],
+            )
+
+    def bulk_check_out(self, db: Session, rows: list[dict]):
+        """
+        Cierra la entrada abierta de cada inscripción en un solo executemany.
+        Solo toca entradas anteriores a la salida, así que repetir el mismo
+        lote no cierra una entrada posterior.
+        """
+        if not rows:
+            return
+        table = Attendance.__table__
+        stmt = (
+            update(table)
+            .where(
+                table.c.registration_id == bindparam("b_registration_id"),
+                table.c.status == AttendanceStatus.CHECKED_IN,
+                table.c.check_out_time.is_(None),
+                table.c.check_in_time <= bindparam("b_check_out_time"),
+            )
+            .values(check_out_time=bindparam("b_check_out_time"), status=AttendanceStatus.CHECKED_OUT)
+        )
+        db.execute(
+            stmt,
+            [{"b_registration_id": row["registration_id"], "b_check_out_time": row["check_out_time"]} for row in rows],
+        )
+
     def create(self, db: Session, attendance: Attendance):
         db.add(attendance)
         db.commit()
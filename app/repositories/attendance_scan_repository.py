@@ -0,0 +1,20 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.attendance_scan import AttendanceScan
+
+class AttendanceScanRepository:
+    def get_existing(self, db: Session, keys) -> dict:
+        """Recibos ya guardados para las llaves de idempotencia dadas, en una sola consulta."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        rows = (
+            db.query(AttendanceScan.idempotency_key, AttendanceScan.registration_id, AttendanceScan.result, AttendanceScan.detail)
+            .filter(AttendanceScan.idempotency_key.in_(keys))
+            .all()
+        )
+        return {row.idempotency_key: row for row in rows}
+
+    def bulk_insert(self, db: Session, rows: list[dict]):
+        if rows:
+            db.execute(insert(AttendanceScan), rows)
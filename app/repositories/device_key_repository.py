@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.models.device_key import DeviceKey
+
+class DeviceKeyRepository:
+    def get_active_by_hash(self, db: Session, key_hash: str):
+        """Solo las columnas que usa la autenticación."""
+        return (
+            db.query(DeviceKey.id, DeviceKey.staff_id)
+            .filter(DeviceKey.key_hash == key_hash, DeviceKey.revoked_at.is_(None))
+            .first()
+        )
+
+    def get_by_id(self, db: Session, device_id: int):
+        return db.query(DeviceKey).filter(DeviceKey.id == device_id).first()
+
+    def list_for_staff(self, db: Session, staff_id: int):
+        return db.query(DeviceKey).filter(DeviceKey.staff_id == staff_id).order_by(DeviceKey.id).all()
+
+    def create(self, db: Session, device: DeviceKey):
+        db.add(device)
+        db.commit()
+        db.refresh(device)
+        return device
+
+    def touch(self, db: Session, device_id: int, now: datetime):
+        db.execute(update(DeviceKey).where(DeviceKey.id == device_id).values(last_used_at=now))
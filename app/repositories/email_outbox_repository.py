@@ -0,0 +1,152 @@
+from datetime import datetime
+from sqlalchemy import exists, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.models.event import Event
+from app.models.event_registration import EventRegistration
+from app.models.participant import Participant
+
+class EmailOutboxRepository:
+    def enqueue_event_qrs(self, db: Session, event_id: int, now: datetime, resend: bool = False) -> int:
+        """
+        Encola con un solo INSERT ... SELECT el QR de cada inscripción pagada del
+        evento que tenga correo. Se omiten las que ya tienen un envío pendiente y,
+        salvo resend=True, las que ya recibieron su QR.
+        """
+        active = (
+            select(EmailOutbox.id)
+            .where(
+                EmailOutbox.registration_id == EventRegistration.id,
+                EmailOutbox.kind == "QR",
+                EmailOutbox.status.in_([OutboxStatus.PENDING, OutboxStatus.SENDING]),
+            )
+        )
+        source = (
+            select(
+                EventRegistration.id,
+                EventRegistration.event_id,
+                literal("QR"),
+                literal(OutboxStatus.PENDING.name),
+                literal(0),
+                literal(now),
+            )
+            .join(Participant, Participant.document_id == EventRegistration.participant_document_id)
+            .where(
+                EventRegistration.event_id == event_id,
+                EventRegistration.is_paid == True,
+                Participant.email.isnot(None),
+                Participant.email != "",
+                ~exists(active),
+            )
+        )
+        if not resend:
+            source = source.where(or_(EventRegistration.qr_code_sent == False, EventRegistration.qr_code_sent.is_(None)))
+
+        result = db.execute(
+            insert(EmailOutbox).from_select(
+                ["registration_id", "event_id", "kind", "status", "attempts", "next_attempt_at"], source
+            )
+        )
+        db.commit()
+        return result.rowcount
+
+    def release_stale(self, db: Session, older_than: datetime) -> int:
+        """Devuelve a PENDING los mensajes que quedaron en SENDING (p. ej. tras un reinicio)."""
+        result = db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.status == OutboxStatus.SENDING, EmailOutbox.locked_at < older_than)
+            .values(status=OutboxStatus.PENDING, locked_at=None)
+        )
+        db.commit()
+        return result.rowcount
+
+    def claim_batch(self, db: Session, now: datetime, limit: int):
+        """
+        Toma hasta `limit` mensajes listos y los marca SENDING. Con SKIP LOCKED
+        varios despachadores (uno por worker) no toman los mismos mensajes.
+        Retorna los datos necesarios para armar cada correo.
+        """
+        ids = [
+            row[0]
+            for row in db.query(EmailOutbox.id)
+            .filter(EmailOutbox.status == OutboxStatus.PENDING, EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        ]
+        if not ids:
+            db.commit()
+            return []
+        db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids))
+            .values(status=OutboxStatus.SENDING, locked_at=now)
+        )
+
+        rows = (
+            db.query(
+                EmailOutbox.id.label("outbox_id"),
+                EmailOutbox.attempts,
+                EventRegistration.id.label("registration_id"),
+                EventRegistration.event_id,
+                EventRegistration.participant_document_id,
+                EventRegistration.qr_version,
+                Participant.first_name,
+                Participant.last_name,
+                Participant.email,
+                Event.name.label("event_name"),
+            )
+            .join(EventRegistration, EventRegistration.id == EmailOutbox.registration_id)
+            .join(Participant, Participant.document_id == EventRegistration.participant_document_id)
+            .join(Event, Event.id == EventRegistration.event_id)
+            .filter(EmailOutbox.id.in_(ids))
+            .all()
+        )
+
+        # Sin inscripción, participante o evento no hay correo que armar: quedarían
+        # en SENDING y volverían a PENDING para siempre. Se descartan en la misma transacción.
+        orphaned = set(ids) - {row.outbox_id for row in rows}
+        if orphaned:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(orphaned))
+                .values(
+                    status=OutboxStatus.DEAD,
+                    locked_at=None,
+                    last_error="La inscripción, el participante o el evento ya no existe",
+                )
+            )
+        db.commit()
+        return rows
+
+    def mark_sent(self, db: Session, outbox_ids: list[int], sent_at: datetime):
+        if outbox_ids:
+            db.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(outbox_ids))
+                .values(status=OutboxStatus.SENT, sent_at=sent_at, locked_at=None, last_error=None)
+            )
+
+    def mark_failed(self, db: Session, failures: list[dict]):
+        """UPDATE por llave primaria en un solo executemany (intentos, estado, próximo intento, error)."""
+        if failures:
+            db.execute(update(EmailOutbox), failures)
+
+    def status_counts(self, db: Session, event_id: int) -> dict:
+        rows = (
+            db.query(EmailOutbox.status, func.count(EmailOutbox.id))
+            .filter(EmailOutbox.event_id == event_id)
+            .group_by(EmailOutbox.status)
+            .all()
+        )
+        return {status.name: count for status, count in rows}
+
+    def dead_letters(self, db: Session, event_id: int, limit: int = 100):
+        return (
+            db.query(EmailOutbox.registration_id, EmailOutbox.attempts, EmailOutbox.last_error)
+            .filter(EmailOutbox.event_id == event_id, EmailOutbox.status == OutboxStatus.DEAD)
+            .order_by(EmailOutbox.id)
+            .limit(limit)
+            .all()
+        )
@@ -1,10 +1,53 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.pagination import paginate_async
 from app.models.event import Event
 
 class EventRepository:
+    # Llaves de orden permitidas para la paginación
+    SORT_COLUMNS = {
+        "id": Event.id,
+        "name": Event.name,
+        "start_date": Event.start_date,
+        "created_at": Event.created_at,
+    }
+
     def get_all(self, db: Session):
         return db.query(Event).all()
 
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        columns: list,
+        limit: int,
+        after: str | None = None,
+        sort: str = "id",
+        descending: bool = False,
+        status: str | None = None,
+        faculty_id: int | None = None,
+    ):
+        stmt = self._filter_page(select(*columns), status, faculty_id)
+        return await paginate_async(db, stmt, sort, self.SORT_COLUMNS[sort], Event.id, limit, after, descending)
+
+    @staticmethod
+    def _filter_page(query, status: str | None, faculty_id: int | None):
+        if status is not None:
+            query = query.filter(Event.status == status)
+        if faculty_id is not None:
+            query = query.filter(Event.faculty_id == faculty_id)
+        return query
+
+    def get_by_id(self, db: Session, event_id: int):
+        return db.query(Event).filter(Event.id == event_id).first()
+
+    def get_existing_ids(self, db: Session, ids) -> set[int]:
+        """Retorna cuáles ids de evento existen, en una sola consulta."""
+        ids = list(ids)
+        if not ids:
+            return set()
+        return {row[0] for row in db.query(Event.id).filter(Event.id.in_(ids)).all()}
+
     def create(self, db: Session, event: Event):
         db.add(event)
         db.commit()
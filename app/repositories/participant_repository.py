@@ -1,7 +1,18 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.import_utils import chunked
+from app.core.pagination import paginate_async
 from app.models.participant import Participant
 
 class ParticipantRepository:
+    # Llaves de orden permitidas para la paginación
+    SORT_COLUMNS = {
+        "document_id": Participant.document_id,
+        "last_name": Participant.last_name,
+        "created_at": Participant.created_at,
+    }
+
     def create(self, db: Session, participant: Participant):
         db.add(participant)
         db.commit()
@@ -11,6 +22,45 @@ class ParticipantRepository:
     def get_all(self, db: Session):
         return db.query(Participant).all()
 
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        columns: list,
+        limit: int,
+        after: str | None = None,
+        sort: str = "document_id",
+        descending: bool = False,
+        career: str | None = None,
+        document_type: str | None = None,
+    ):
+        stmt = self._filter_page(select(*columns), career, document_type)
+        return await paginate_async(db, stmt, sort, self.SORT_COLUMNS[sort], Participant.document_id, limit, after, descending)
+
+    @staticmethod
+    def _filter_page(query, career: str | None, document_type: str | None):
+        if career is not None:
+            query = query.filter(Participant.career == career)
+        if document_type is not None:
+            query = query.filter(Participant.document_type == document_type)
+        return query
+
+    def export_query(self, db: Session, batch_size: int, career: str | None = None):
+        """Consulta de columnas planas que se lee por lotes con cursor del lado del servidor."""
+        query = db.query(
+            Participant.document_id,
+            Participant.document_type,
+            Participant.first_name,
+            Participant.last_name,
+            Participant.email,
+            Participant.phone_number,
+            Participant.career,
+            Participant.idnumber,
+            Participant.created_at,
+        )
+        if career is not None:
+            query = query.filter(Participant.career == career)
+        return query.order_by(Participant.document_id).yield_per(batch_size)
+
     def get_by_id(self, db: Session, participant_id: int):
         return db.query(Participant).filter(Participant.document_id == participant_id).first()
 
@@ -18,3 +68,19 @@ class ParticipantRepository:
     def get_by_document_id(self, db: Session, document_id: str):
         """Busca un participante por su documento."""
         return db.query(Participant).filter(Participant.document_id == document_id).first()
+
+    def get_existing_document_ids(self, db: Session, document_ids, chunk_size: int = 1000) -> set[str]:
+        """Retorna cuáles documentos ya existen, consultando por bloques con IN (...)."""
+        existing = set()
+        for chunk in chunked(document_ids, chunk_size):
+            rows = db.query(Participant.document_id).filter(Participant.document_id.in_(chunk)).all()
+            existing.update(row[0] for row in rows)
+        return existing
+
+    def bulk_insert(self, db: Session, rows: list[dict]):
+        """
+        Inserta varias filas en un solo executemany.
+        En MySQL se usa INSERT IGNORE para tolerar duplicados insertados en paralelo.
+        """
+        if rows:
+            db.execute(insert(Participant).prefix_with("IGNORE", dialect="mysql"), rows)
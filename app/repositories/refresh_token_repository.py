@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.models.refresh_token import RefreshToken
+
+class RefreshTokenRepository:
+    def get_by_hash(self, db: Session, token_hash: str):
+        return db.query(RefreshToken).filter(RefreshToken.token_hash == token_hash).first()
+
+    def create(self, db: Session, staff_id: int, token_hash: str, expires_at: datetime):
+        token = RefreshToken(staff_id=staff_id, token_hash=token_hash, expires_at=expires_at)
+        db.add(token)
+        return token
+
+    def revoke(self, db: Session, token_id: int, now: datetime) -> bool:
+        """
+        Revoca el token con un UPDATE condicional. Retorna False si ya estaba
+        revocado: otra petición lo usó primero.
+        """
+        result = db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == token_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
+        return result.rowcount == 1
+
+    def revoke_all_for_staff(self, db: Session, staff_id: int, now: datetime):
+        """Revoca todos los tokens vigentes del staff con un solo UPDATE."""
+        db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.staff_id == staff_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=now)
+        )
@@ -1,7 +1,19 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, tuple_, update
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+from app.core.pagination import paginate_async
+from app.models.event import Event, EventStatus
 from app.models.event_registration import EventRegistration
 
 class EventRegistrationRepository:
+    # Llaves de orden permitidas para la paginación
+    SORT_COLUMNS = {
+        "id": EventRegistration.id,
+        "registration_date": EventRegistration.registration_date,
+        "participant_document_id": EventRegistration.participant_document_id,
+    }
+
     def create(self, db: Session, registration: EventRegistration):
         db.add(registration)
         db.commit()
@@ -11,9 +23,138 @@ class EventRegistrationRepository:
     def get_all(self, db: Session):
         return db.query(EventRegistration).all()
 
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        columns: list,
+        limit: int,
+        after: str | None = None,
+        sort: str = "id",
+        descending: bool = False,
+        event_id: int | None = None,
+        is_paid: bool | None = None,
+        qr_code_sent: bool | None = None,
+        participant_document_id: str | None = None,
+    ):
+        stmt = self._filter_page(select(*columns), event_id, is_paid, qr_code_sent, participant_document_id)
+        return await paginate_async(db, stmt, sort, self.SORT_COLUMNS[sort], EventRegistration.id, limit, after, descending)
+
+    @staticmethod
+    def _filter_page(query, event_id, is_paid, qr_code_sent, participant_document_id):
+        if event_id is not None:
+            query = query.filter(EventRegistration.event_id == event_id)
+        if is_paid is not None:
+            query = query.filter(EventRegistration.is_paid == is_paid)
+        if qr_code_sent is not None:
+            query = query.filter(EventRegistration.qr_code_sent == qr_code_sent)
+        if participant_document_id is not None:
+            query = query.filter(EventRegistration.participant_document_id == participant_document_id)
+        return query
+
+    def export_query(self, db: Session, batch_size: int, event_id: int | None = None, is_paid: bool | None = None):
+        """Consulta de columnas planas que se lee por lotes con cursor del lado del servidor."""
+        query = db.query(
+            EventRegistration.id,
+            EventRegistration.event_id,
+            EventRegistration.participant_document_id,
+            EventRegistration.registered_by_staff_id,
+            EventRegistration.is_paid,
+            EventRegistration.qr_code_sent,
+            EventRegistration.qr_sent_at,
+            EventRegistration.registration_date,
+        )
+        if event_id is not None:
+            query = query.filter(EventRegistration.event_id == event_id)
+        if is_paid is not None:
+            query = query.filter(EventRegistration.is_paid == is_paid)
+        return query.order_by(EventRegistration.id).yield_per(batch_size)
+
+    def list_qr_rows(self, db: Session, event_id: int, paid_only: bool = False):
+        """Solo las columnas que firman el QR de cada inscripción del evento."""
+        query = db.query(
+            EventRegistration.id,
+            EventRegistration.event_id,
+            EventRegistration.participant_document_id,
+            EventRegistration.qr_version,
+        ).filter(EventRegistration.event_id == event_id)
+        if paid_only:
+            query = query.filter(EventRegistration.is_paid == True)
+        return query.order_by(EventRegistration.id).all()
+
+    def mark_qr_sent(self, db: Session, reg_ids: list[int], sent_at):
+        """Marca varias inscripciones como QR enviado con un solo UPDATE."""
+        if reg_ids:
+            db.execute(
+                update(EventRegistration)
+                .where(EventRegistration.id.in_(reg_ids))
+                .values(qr_code_sent=True, qr_sent_at=sent_at)
+            )
+
     def get_by_id(self, db: Session, reg_id: int):
         return db.query(EventRegistration).filter(EventRegistration.id == reg_id).first()
 
+    async def get_index_row_async(self, db: AsyncSession, reg_id: int):
+        """Solo las columnas que usa el check-in."""
+        result = await db.execute(
+            select(
+                EventRegistration.id,
+                EventRegistration.event_id,
+                EventRegistration.participant_document_id,
+                EventRegistration.qr_version,
+            ).where(EventRegistration.id == reg_id)
+        )
+        return result.first()
+
+    def get_index_rows(self, db: Session, reg_ids, lock: bool = False) -> list:
+        """
+        Como get_index_row_async pero para varias inscripciones en una sola consulta.
+        lock=True las bloquea en modo compartido hasta el commit (una revocación espera).
+        """
+        reg_ids = list(reg_ids)
+        if not reg_ids:
+            return []
+        query = db.query(
+            EventRegistration.id,
+            EventRegistration.event_id,
+            EventRegistration.participant_document_id,
+            EventRegistration.qr_version,
+        ).filter(EventRegistration.id.in_(reg_ids))
+        if lock:
+            query = query.with_for_update(read=True)
+        return query.all()
+
+    def list_active_index_rows(self, db: Session, event_ids=None):
+        """
+        Retorna (ids de eventos ACTIVE, filas de sus inscripciones) con las
+        columnas que usa el check-in. event_ids restringe la carga a esos eventos.
+        """
+        events = db.query(Event.id).filter(Event.status == EventStatus.ACTIVE)
+        if event_ids is not None:
+            events = events.filter(Event.id.in_(list(event_ids)))
+        active = [row[0] for row in events.all()]
+        if not active:
+            return active, []
+        rows = (
+            db.query(
+                EventRegistration.id,
+                EventRegistration.event_id,
+                EventRegistration.participant_document_id,
+                EventRegistration.qr_version,
+            )
+            .filter(EventRegistration.event_id.in_(active))
+            .all()
+        )
+        return active, rows
+
+    def get_with_participant_and_event(self, db: Session, reg_id: int):
+        """Inscripción con participante y evento cargados en la misma consulta (JOIN)."""
+        return (
+            db.query(EventRegistration)
+            .options(joinedload(EventRegistration.participant), joinedload(EventRegistration.event))
+            .filter(EventRegistration.id == reg_id)
+            .first()
+        )
+
     def get_existing_registration(self, db: Session, event_id: int, participant_document_id: str):
         """Verifica si un participante ya está inscrito en un evento."""
         return (
@@ -24,3 +165,47 @@ class EventRegistrationRepository:
             )
             .first()
         )
+
+    def get_existing_pairs(self, db: Session, pairs) -> set[tuple[int, str]]:
+        """Retorna cuáles pares (event_id, participant_document_id) ya existen, en una sola consulta."""
+        pairs = list(pairs)
+        if not pairs:
+            return set()
+        rows = (
+            db.query(EventRegistration.event_id, EventRegistration.participant_document_id)
+            .filter(tuple_(EventRegistration.event_id, EventRegistration.participant_document_id).in_(pairs))
+            .all()
+        )
+        return {(row[0], row[1]) for row in rows}
+
+    def bulk_upsert(self, db: Session, rows: list[dict], update_existing: bool = False):
+        """
+        Inserta varias inscripciones en un solo executemany apoyándose en el
+        índice único (event_id, participant_document_id). Si update_existing es
+        True, los duplicados actualizan is_paid / qr_code_sent / qr_sent_at;
+        si no, se ignoran.
+        """
+        if not rows:
+            return
+        dialect = db.get_bind().dialect.name
+        update_columns = ("is_paid", "qr_code_sent", "qr_sent_at")
+
+        if dialect == "mysql":
+            stmt = mysql.insert(EventRegistration)
+            if update_existing:
+                stmt = stmt.on_duplicate_key_update({c: stmt.inserted[c] for c in update_columns})
+            else:
+                stmt = stmt.prefix_with("IGNORE")
+        elif dialect == "sqlite":
+            stmt = sqlite.insert(EventRegistration)
+            index_elements = ["event_id", "participant_document_id"]
+            if update_existing:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=index_elements,
+                    set_={c: stmt.excluded[c] for c in update_columns},
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        else:
+            stmt = insert(EventRegistration)
+        db.execute(stmt, rows)
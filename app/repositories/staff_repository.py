@@ -1,12 +1,80 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.pagination import paginate_async
 from app.models.staff import Staff
 
 class StaffRepository:
+    # Llaves de orden permitidas para la paginación
+    SORT_COLUMNS = {
+        "id": Staff.id,
+        "username": Staff.username,
+        "created_at": Staff.created_at,
+    }
+
     def get_all(self, db: Session):
         return db.query(Staff).all()
 
-    def create(self, db: Session, staff: Staff):
+    async def get_page_async(
+        self,
+        db: AsyncSession,
+        columns: list,
+        limit: int,
+        after: str | None = None,
+        sort: str = "id",
+        descending: bool = False,
+        role: str | None = None,
+        is_active: bool | None = None,
+    ):
+        stmt = self._filter_page(select(*columns), role, is_active)
+        return await paginate_async(db, stmt, sort, self.SORT_COLUMNS[sort], Staff.id, limit, after, descending)
+
+    @staticmethod
+    def _filter_page(query, role: str | None, is_active: bool | None):
+        if role is not None:
+            query = query.filter(Staff.role == role)
+        if is_active is not None:
+            query = query.filter(Staff.is_active == is_active)
+        return query
+
+    async def get_by_id_async(self, db: AsyncSession, staff_id: int):
+        return await db.get(Staff, staff_id)
+
+    async def get_credentials_async(self, db: AsyncSession, username: str):
+        """id, hash de contraseña y estado para el login."""
+        result = await db.execute(
+            select(Staff.id, Staff.password, Staff.is_active).where(Staff.username == username)
+        )
+        return result.first()
+
+    async def update_password_hash_async(self, db: AsyncSession, staff_id: int, password_hash: str):
+        await db.execute(update(Staff).where(Staff.id == staff_id).values(password=password_hash))
+        await db.commit()
+
+    def get_principal(self, db: Session, staff_id: int):
+        """Solo las columnas que usa la autorización."""
+        return (
+            db.query(Staff.id, Staff.username, Staff.role, Staff.is_active)
+            .filter(Staff.id == staff_id)
+            .first()
+        )
+
+    def get_existing_ids(self, db: Session, ids) -> set[int]:
+        """Retorna cuáles ids de staff existen, en una sola consulta."""
+        ids = list(ids)
+        if not ids:
+            return set()
+        return {row[0] for row in db.query(Staff.id).filter(Staff.id.in_(ids)).all()}
+
+    async def create_async(self, db: AsyncSession, staff: Staff):
         db.add(staff)
-        db.commit()
-        db.refresh(staff)
+        await db.commit()
+        await db.refresh(staff)
+        return staff
+
+    async def update_async(self, db: AsyncSession, staff: Staff, changes: dict):
+        for field, value in changes.items():
+            setattr(staff, field, value)
+        await db.commit()
+        await db.refresh(staff)
         return staff
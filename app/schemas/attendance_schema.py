@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 class AttendanceBase(BaseModel):
     registration_id: int
@@ -17,5 +17,28 @@ class AttendanceOut(AttendanceBase):
     exit_timestamp: Optional[datetime]
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# 📦 Carga por lotes desde escáneres sin conexión
+class ScanItem(BaseModel):
+    qr: dict
+    scanned_at: datetime
+    idempotency_key: str = Field(..., min_length=1, max_length=64)
+
+class ScanBatch(BaseModel):
+    items: list[ScanItem]
+
+class ScanResult(BaseModel):
+    idempotency_key: str
+    result: Literal["checked_in", "checked_out", "rejected"]
+    registration_id: Optional[int] = None
+    detail: Optional[str] = None
+    duplicate: bool = False
+
+class ScanBatchOut(BaseModel):
+    results: list[ScanResult]
+    checked_in: int
+    checked_out: int
+    rejected: int
+    duplicates: int
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import Optional
 
 class LoginRequest(BaseModel):
     username: str
@@ -7,3 +9,24 @@ class LoginRequest(BaseModel):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class DeviceKeyCreate(BaseModel):
+    name: str
+
+class DeviceKeyOut(BaseModel):
+    id: int
+    name: str
+    key_prefix: str
+    created_at: Optional[datetime] = None
+    last_used_at: Optional[datetime] = None
+    revoked_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class DeviceKeyCreated(DeviceKeyOut):
+    key: str  # solo se muestra al crearla
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -24,8 +24,13 @@ class EventCreate(EventBase):
 
 class EventOut(EventBase):
     id: int
+    # Admite NULL en la base (el listado no revalida las filas)
+    created_by_staff_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class EventPage(BaseModel):
+    items: list[EventOut]
+    next_cursor: Optional[str] = None
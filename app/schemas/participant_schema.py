@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -22,8 +22,19 @@ class ParticipantCreate(ParticipantBase):
     pass
 
 class ParticipantOut(ParticipantBase):
+    # El listado envía las filas sin revalidarlas: las columnas que admiten NULL son opcionales
+    document_type: Optional[DocumentType] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = None
+    career: Optional[str] = None
+    idnumber: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class ParticipantPage(BaseModel):
+    items: list[ParticipantOut]
+    next_cursor: Optional[str] = None
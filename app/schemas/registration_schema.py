@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional
 
@@ -14,8 +14,16 @@ class EventRegistrationCreate(EventRegistrationBase):
 
 class EventRegistrationOut(EventRegistrationBase):
     id: int
+    # Admiten NULL en la base (el listado no revalida las filas)
+    event_id: Optional[int] = None
+    participant_document_id: Optional[str] = None
+    registered_by_staff_id: Optional[int] = None
+    qr_version: Optional[int] = 1
     qr_sent_at: Optional[datetime]
     registration_date: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class EventRegistrationPage(BaseModel):
+    items: list[EventRegistrationOut]
+    next_cursor: Optional[str] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator
 from datetime import datetime
 from typing import Optional
 
@@ -12,10 +12,28 @@ class StaffBase(BaseModel):
 class StaffCreate(StaffBase):
     password: str
 
+class StaffUpdate(BaseModel):
+    full_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    role: Optional[str] = None
+    is_active: Optional[bool] = None
+    password: Optional[str] = None
+
+    @field_validator("full_name", "email", "is_active")
+    @classmethod
+    def not_null(cls, value):
+        # Se pueden omitir, pero no enviar en null: las columnas son obligatorias
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
 class StaffOut(StaffBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class StaffPage(BaseModel):
+    items: list[StaffOut]
+    next_cursor: Optional[str] = None
@@ -1,15 +1,27 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 import hmac, hashlib, json
 
-from app.models.attendance import Attendance
-from app.models.event_registration import EventRegistration
+from app.core.config import settings
+from app.models.attendance import AttendanceStatus
+from app.repositories.attendance_repository import AttendanceRepository
+from app.repositories.attendance_scan_repository import AttendanceScanRepository
+from app.repositories.registration_repository import EventRegistrationRepository
+from app.schemas.attendance_schema import ScanItem
+from app.services.attendance_writer import attendance_writer
+from app.services.registration_index import IndexedRegistration, registration_index
 
 
 class AttendanceService:
     def __init__(self):
-        self.secret_key = b"ucc-seminario-secret-key"
+        self.secret_key = settings.QR_SECRET_KEY.encode()
+        self.registration_repo = EventRegistrationRepository()
+        self.repo = AttendanceRepository()
+        self.scan_repo = AttendanceScanRepository()
 
     def _validate_qr_signature(self, payload: dict):
         """
@@ -31,71 +43,331 @@ class AttendanceService:
 
         return data
 
-    def check_in_or_out(self, db: Session, qr_payload: dict):
-        """
-        Recibe el JSON del QR, valida la firma y registra check-in o check-out automáticamente.
-        """
+    def _read_qr(self, qr_payload: dict):
+        """Valida la firma y retorna (registration_id, versión del QR)."""
         # ✅ Validar firma e integridad
         payload = self._validate_qr_signature(qr_payload)
 
         registration_id = payload.get("registration_id")
         if not registration_id:
             raise HTTPException(status_code=400, detail="Falta registration_id en el QR")
+        # QR sin versión = emitido antes del versionado (versión 1)
+        return registration_id, payload.get("v", 1)
 
-        # Buscar registro de inscripción
-        reg = db.query(EventRegistration).filter_by(id=registration_id).first()
-        if not reg:
+    @staticmethod
+    def _indexed(registration_id: int, row):
+        if not row:
             raise HTTPException(status_code=404, detail="Event registration not found")
+        reg = IndexedRegistration(row.event_id, row.participant_document_id, row.qr_version or 1)
+        registration_index.put(registration_id, *reg)
+        return reg
+
+    @staticmethod
+    def _revoked_qr():
+        return HTTPException(status_code=400, detail="QR revocado")
+
+    def _check_version(self, reg: IndexedRegistration, version: int):
+        if version != reg.qr_version:
+            raise self._revoked_qr()
+        return reg
+
+    async def _resolve_registration_async(self, db: AsyncSession, registration_id: int, version: int):
+        """
+        Busca la inscripción primero en el índice en memoria y solo va a la
+        base si no está o si la versión del QR no coincide (el índice podría
+        estar desactualizado respecto a otro worker).
+        """
+        reg = registration_index.get(registration_id)
+        if reg is None or reg.qr_version != version:
+            row = await self.registration_repo.get_index_row_async(db, registration_id)
+            reg = self._indexed(registration_id, row)
+        return self._check_version(reg, version)
+
+    @staticmethod
+    def _checked_out(reg: IndexedRegistration, attendance_id: int, now: datetime):
+        return {
+            "message": f"👋 Check-out registrado para {reg.participant_document_id}",
+            "data": {
+                "id": attendance_id,
+                "status": AttendanceStatus.CHECKED_OUT.value,
+                "check_out_time": now.isoformat(),
+            },
+        }
 
-        # Buscar asistencia previa
-        attendance = (
-            db.query(Attendance)
-            .filter(Attendance.registration_id == registration_id)
-            .order_by(Attendance.id.desc())
-            .first()
+    @staticmethod
+    def _checked_in(reg: IndexedRegistration, attendance_id: int, now: datetime):
+        return {
+            "message": f"✅ Check-in registrado para {reg.participant_document_id}",
+            "data": {
+                "id": attendance_id,
+                "status": AttendanceStatus.CHECKED_IN.value,
+                "check_in_time": now.isoformat(),
+            },
+        }
+
+    @staticmethod
+    def _simultaneous_scan(recorded: str = "la entrada"):
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El QR se escaneó al mismo tiempo en otro punto; {recorded} ya quedó registrada.",
         )
 
+    async def _reject_stale_write(self, db: AsyncSession, registration_id: int, version: int, recorded: str):
+        """
+        La escritura no tocó filas: se deshace y se decide con la versión vigente
+        si el QR fue revocado (400) o si otro escáner ganó la carrera (409).
+        """
+        await db.rollback()
+        # El índice de este worker pudo quedar atrás: se actualiza con la versión vigente
+        reg = self._indexed(registration_id, await self.registration_repo.get_index_row_async(db, registration_id))
+        if reg.qr_version != version:
+            raise self._revoked_qr()
+        raise self._simultaneous_scan(recorded)
+
+    async def check_in_or_out_async(self, db: AsyncSession, qr_payload: dict):
+        """
+        Recibe el JSON del QR, valida la firma y registra check-in o check-out automáticamente.
+        Va por la sesión async: un escaneo no ocupa un hilo mientras espera a la base.
+        """
+        registration_id, version = self._read_qr(qr_payload)
+
+        # Buscar registro de inscripción (índice en memoria de eventos activos)
+        reg = await self._resolve_registration_async(db, registration_id, version)
+
+        # ⏩ Modo por lotes: se confirma al quedar en el diario y se escribe después.
+        # El diario hace fsync: se deja en el threadpool
+        if settings.ATTENDANCE_WRITE_MODE == "batched":
+            return await run_in_threadpool(
+                attendance_writer.record, registration_id, reg.participant_document_id, reg.event_id
+            )
+
         now = datetime.utcnow()
 
-        # 🟢 No existe asistencia previa → registrar entrada
-        if not attendance or attendance.status == "CHECKED_OUT":
-            new_attendance = Attendance(
-                registration_id=registration_id,
-                participant_document_id=reg.participant_document_id,
-                event_id=reg.event_id,
-                check_in_time=now,
-                status="CHECKED_IN",
+        # Las dos escrituras exigen que qr_version siga igual en la base: un QR
+        # revocado desde otro worker se rechaza aunque el índice de este no lo sepa.
+
+        # 🔴 Tenía entrada abierta → se cierra esa fila (UPDATE condicional, atómico frente a otro escáner).
+        # La lectura del id no bloquea: si otro escáner la cierra antes, el UPDATE no toca filas y es un 409.
+        attendance_id = await self.repo.get_open_check_in_id_async(db, registration_id)
+        if attendance_id is not None:
+            if not await self.repo.close_open_check_in_async(db, attendance_id, registration_id, version, now):
+                await self._reject_stale_write(db, registration_id, version, "la salida")
+            await db.commit()
+            return self._checked_out(reg, attendance_id, now)
+
+        # 🟢 Sin entrada abierta → registrar entrada; el índice único rechaza una segunda entrada simultánea
+        try:
+            attendance_id = await self.repo.insert_check_in_async(
+                db, registration_id, version, reg.participant_document_id, reg.event_id, now
             )
-            db.add(new_attendance)
-            db.commit()
-            db.refresh(new_attendance)
-            return {
-                "message": f"✅ Check-in registrado para {reg.participant_document_id}",
-                "data": {
-                    "id": new_attendance.id,
-                    "status": new_attendance.status,
-                    "check_in_time": new_attendance.check_in_time.isoformat(),
-                },
+            if attendance_id is not None:
+                await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise self._simultaneous_scan()
+        if attendance_id is None:
+            await self._reject_stale_write(db, registration_id, version, "la entrada")
+        return self._checked_in(reg, attendance_id, now)
+
+    # =========================
+    # CARGA POR LOTES (escáneres sin conexión)
+    # =========================
+    @staticmethod
+    def _scan_time(value: datetime) -> datetime:
+        """Hora del dispositivo en UTC sin zona y en segundos, como la guarda la columna DATETIME."""
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=0)
+
+    def _resolve_registrations(self, db: Session, registration_ids) -> dict[int, IndexedRegistration]:
+        """
+        Lee las inscripciones del lote de la base en una sola consulta, con
+        bloqueo compartido hasta el commit: una revocación hecha en otro worker
+        ya se ve y no puede colarse entre la lectura y la escritura del lote.
+        """
+        resolved = {}
+        for row in self.registration_repo.get_index_rows(db, registration_ids, lock=True):
+            reg = IndexedRegistration(row.event_id, row.participant_document_id, row.qr_version or 1)
+            registration_index.put(row.id, *reg)
+            resolved[row.id] = reg
+        return resolved
+
+    def _plan_batch(self, db: Session, items: list[ScanItem]):
+        """
+        Decide el resultado de cada escaneo del lote contra el estado leído de la
+        base. Retorna (resultados, estado, inserts, updates, recibos) sin escribir nada.
+        """
+        results: list[dict | None] = [None] * len(items)
+        stored = self.scan_repo.get_existing(db, {item.idempotency_key for item in items})
+        first_index: dict[str, int] = {}
+        scans = []  # (posición, registration_id, versión, hora)
+
+        # ✅ Llaves repetidas y firmas
+        for i, item in enumerate(items):
+            key = item.idempotency_key
+            if key in stored:
+                row = stored[key]
+                results[i] = {
+                    "idempotency_key": key,
+                    "result": row.result,
+                    "registration_id": row.registration_id,
+                    "detail": row.detail,
+                    "duplicate": True,
+                }
+                continue
+            if key in first_index:
+                continue  # se completa con el resultado de su primera aparición
+            first_index[key] = i
+
+            try:
+                payload = self._validate_qr_signature(item.qr)
+            except HTTPException as e:
+                results[i] = {"idempotency_key": key, "result": "rejected", "detail": e.detail}
+                continue
+            registration_id = payload.get("registration_id")
+            if not registration_id:
+                results[i] = {"idempotency_key": key, "result": "rejected", "detail": "Falta registration_id en el QR"}
+                continue
+            scans.append((i, registration_id, payload.get("v", 1), self._scan_time(item.scanned_at)))
+
+        # 🔎 Inscripciones (una consulta) y su última asistencia (una consulta)
+        registrations = self._resolve_registrations(db, {registration_id for _, registration_id, _, _ in scans})
+
+        valid = []
+        for i, registration_id, version, scanned_at in scans:
+            reg = registrations.get(registration_id)
+            key = items[i].idempotency_key
+            if reg is None:
+                # Sin registration_id en el recibo: no existe la inscripción a la que apuntaría
+                results[i] = {"idempotency_key": key, "result": "rejected", "detail": "Event registration not found"}
+            elif version != reg.qr_version:
+                results[i] = {"idempotency_key": key, "result": "rejected", "registration_id": registration_id, "detail": "QR revocado"}
+            else:
+                valid.append((scanned_at, i, registration_id, reg))
+
+        # Con escritura diferida, lo pendiente del diario debe estar en la base antes de leer el estado
+        if settings.ATTENDANCE_WRITE_MODE == "batched":
+            attendance_writer.flush()
+
+        state = {
+            row.registration_id: {
+                "id": row.id,
+                "status": row.status,
+                "check_in_time": row.check_in_time,
+                "check_out_time": row.check_out_time,
+                "new": None,
             }
+            for row in self.repo.get_latest_for_registrations(db, {v[2] for v in valid})
+        }
+
+        # 🔁 Máquina de estados en orden de hora del dispositivo
+        inserts, updates = [], {}
+        for scanned_at, i, registration_id, reg in sorted(valid, key=lambda v: (v[0], v[1])):
+            result = {"idempotency_key": items[i].idempotency_key, "registration_id": registration_id}
+            results[i] = result
+            current = state.get(registration_id)
+            last_time = current and (current["check_out_time"] or current["check_in_time"])
+
+            if last_time and scanned_at < last_time:
+                result.update(result="rejected", detail="Escaneo anterior al último registro de asistencia")
+            elif current is None or current["status"] == AttendanceStatus.CHECKED_OUT:
+                row = {
+                    "registration_id": registration_id,
+                    "participant_document_id": reg.participant_document_id,
+                    "event_id": reg.event_id,
+                    "check_in_time": scanned_at,
+                }
+                inserts.append(row)
+                state[registration_id] = {
+                    "id": None,
+                    "status": AttendanceStatus.CHECKED_IN,
+                    "check_in_time": scanned_at,
+                    "check_out_time": None,
+                    "new": row,
+                }
+                result["result"] = "checked_in"
+            elif current["status"] == AttendanceStatus.CHECKED_IN and not current["check_out_time"]:
+                if current["new"] is not None:
+                    # Entrada y salida en el mismo lote: una sola fila ya cerrada
+                    current["new"].update(check_out_time=scanned_at, status=AttendanceStatus.CHECKED_OUT)
+                else:
+                    updates[current["id"]] = {
+                        "id": current["id"],
+                        "check_out_time": scanned_at,
+                        "status": AttendanceStatus.CHECKED_OUT,
+                    }
+                current.update(status=AttendanceStatus.CHECKED_OUT, check_out_time=scanned_at)
+                result["result"] = "checked_out"
+            else:
+                result.update(result="rejected", detail="Asistencia ya completada o inválida.")
 
-        # 🔴 Ya tenía entrada activa → registrar salida
-        elif attendance.status == "CHECKED_IN" and not attendance.check_out_time:
-            attendance.check_out_time = now
-            attendance.status = "CHECKED_OUT"
-            db.commit()
-            db.refresh(attendance)
-            return {
-                "message": f"👋 Check-out registrado para {reg.participant_document_id}",
-                "data": {
-                    "id": attendance.id,
-                    "status": attendance.status,
-                    "check_out_time": attendance.check_out_time.isoformat(),
-                },
+        # Duplicados dentro del mismo lote
+        for i, item in enumerate(items):
+            if results[i] is None:
+                results[i] = {**results[first_index[item.idempotency_key]], "duplicate": True}
+
+        # Recibos de idempotencia
+        receipts = [
+            {
+                "idempotency_key": items[i].idempotency_key,
+                "registration_id": results[i].get("registration_id"),
+                "result": results[i]["result"],
+                "detail": results[i].get("detail"),
+                "scanned_at": self._scan_time(items[i].scanned_at),
             }
+            for i in first_index.values()
+        ]
+        return results, state, inserts, updates, receipts
 
-        # 🚫 Caso inválido (ya completó entrada/salida)
-        else:
+    def record_batch(self, db: Session, items: list[ScanItem]):
+        """
+        Registra un lote de escaneos hechos sin conexión.
+        Cada escaneo trae la hora del dispositivo y una llave de idempotencia:
+        reenviar el mismo lote devuelve los mismos resultados sin duplicar.
+        Los escaneos válidos se aplican en orden de hora con la misma máquina de
+        estados que /record, con consultas por conjunto y un solo commit.
+        Si el commit choca con otra escritura, el lote se re-aplica una vez sobre
+        el estado nuevo; si vuelve a chocar se responde 409 con las inscripciones en conflicto.
+        """
+        if len(items) > settings.ATTENDANCE_BATCH_MAX_ITEMS:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Asistencia ya completada o inválida."
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Máximo {settings.ATTENDANCE_BATCH_MAX_ITEMS} escaneos por lote",
             )
+
+        # 💾 Un INSERT, un UPDATE y los recibos en una sola transacción. Un
+        # IntegrityError viene de una escritura concurrente: el mismo lote enviado
+        # en otra solicitud (llave de idempotencia) o un check-in en línea que abrió
+        # la misma inscripción. Se vuelve a leer el estado y se re-aplica una vez.
+        for _ in range(2):
+            results, state, inserts, updates, receipts = self._plan_batch(db, items)
+            try:
+                self.repo.bulk_check_in(db, inserts)
+                self.repo.bulk_update(db, list(updates.values()))
+                self.scan_repo.bulk_insert(db, receipts)
+                db.commit()
+                break
+            except IntegrityError:
+                db.rollback()
+        else:
+            conflicts = self.repo.get_open_registration_ids(db, {row["registration_id"] for row in inserts})
+            detail = "El lote se está procesando en otra solicitud; reintente el envío"
+            if conflicts:
+                detail = (
+                    f"Las inscripciones {', '.join(map(str, sorted(conflicts)))} tienen una entrada "
+                    "abierta registrada por otra solicitud; reintente el envío"
+                )
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=detail)
+
+        if settings.ATTENDANCE_WRITE_MODE == "batched":
+            attendance_writer.forget(state.keys())
+
+        counts = {"checked_in": 0, "checked_out": 0, "rejected": 0}
+        for result in results:
+            if not result.get("duplicate"):
+                counts[result["result"]] += 1
+        return {
+            "results": results,
+            **counts,
+            "duplicates": sum(1 for result in results if result.get("duplicate")),
+        }
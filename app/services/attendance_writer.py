@@ -0,0 +1,321 @@
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.attendance import AttendanceStatus
+from app.repositories.attendance_repository import AttendanceRepository
+
+logger = logging.getLogger(__name__)
+
+CHECK_IN = "in"
+CHECK_OUT = "out"
+# Registros que la base rechaza: fuera del patrón *.jsonl para que no se re-apliquen al arrancar
+DEAD_LETTER_FILE = "dead-letter.log"
+
+
+class AttendanceWriter:
+    """
+    Escritura diferida (write-behind) de las asistencias.
+
+    Cada escaneo se decide contra el estado en memoria, se anexa a un diario
+    local (JSONL + fsync) y se confirma al escáner; un hilo de fondo vuelca
+    los registros pendientes a la tabla attendance cada
+    ATTENDANCE_FLUSH_INTERVAL_MS o al juntar ATTENDANCE_FLUSH_MAX_ROWS, con
+    un INSERT y un UPDATE multi-fila por lote y un solo commit.
+
+    El diario se divide en segmentos: cada volcado abre uno nuevo y borra los
+    anteriores solo después del commit. Al arrancar se re-aplican los
+    segmentos que hayan quedado (caída del proceso); aplicar un lote dos
+    veces no duplica filas. Si la base rechaza una fila del lote (índice
+    único de entrada abierta, inscripción borrada) el lote se reintenta
+    registro por registro y los rechazados pasan a DEAD_LETTER_FILE, así un
+    registro inválido no frena los escaneos siguientes.
+
+    El estado en memoria es de este proceso: el modo por lotes supone un
+    único worker atendiendo el check-in. Solo guarda las inscripciones con
+    registros sin volcar; después del volcado se vuelve a leer de la base.
+    """
+
+    def __init__(self, journal_dir: str | None = None):
+        self.repo = AttendanceRepository()
+        self.journal_dir = Path(journal_dir or settings.ATTENDANCE_JOURNAL_DIR)
+        self._state: dict[int, AttendanceStatus | None] = {}
+        self._pending: list[dict] = []
+        self._sealed: list[Path] = []
+        self._segment: Path | None = None
+        self._journal = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # =========================
+    # DIARIO
+    # =========================
+    def _segments(self) -> list[Path]:
+        return sorted(self.journal_dir.glob("*.jsonl"))
+
+    def _open_segment(self):
+        if self._journal:
+            self._journal.close()
+            self._sealed.append(self._segment)
+        existing = self._segments()
+        number = int(existing[-1].stem) + 1 if existing else 1
+        self._segment = self.journal_dir / f"{number:012d}.jsonl"
+        self._journal = open(self._segment, "a", encoding="utf-8")
+
+    def _append(self, record: dict):
+        self._journal.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    @staticmethod
+    def _read_segment(path: Path) -> list[dict]:
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # Solo la última línea puede quedar a medias si el proceso cayó escribiéndola
+                    logger.warning("Línea incompleta en el diario de asistencia %s", path)
+        return records
+
+    # =========================
+    # ESCANEOS
+    # =========================
+    def _latest_state(self, registration_id: int):
+        db = SessionLocal()
+        try:
+            return self.repo.get_latest_state(db, registration_id)
+        finally:
+            db.close()
+
+    def record(self, registration_id: int, participant_document_id: str, event_id: int):
+        """Decide entrada o salida, la deja en el diario y responde sin esperar a la base."""
+        if registration_id not in self._state:
+            # Sin registros pendientes de esta inscripción la base está al día
+            latest = self._latest_state(registration_id)
+            current = None
+            if latest:
+                current = latest.status
+                if current == AttendanceStatus.CHECKED_IN and latest.check_out_time:
+                    current = AttendanceStatus.NONE
+            with self._lock:
+                self._state.setdefault(registration_id, current)
+
+        # Segundos exactos: es lo que guarda la columna DATETIME y permite reconocer un lote ya aplicado
+        now = datetime.utcnow().replace(microsecond=0)
+        with self._lock:
+            current = self._state[registration_id]
+            if current is None or current == AttendanceStatus.CHECKED_OUT:
+                op, new_state = CHECK_IN, AttendanceStatus.CHECKED_IN
+            elif current == AttendanceStatus.CHECKED_IN:
+                op, new_state = CHECK_OUT, AttendanceStatus.CHECKED_OUT
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Asistencia ya completada o inválida."
+                )
+
+            record = {
+                "op": op,
+                "registration_id": registration_id,
+                "participant_document_id": participant_document_id,
+                "event_id": event_id,
+                "ts": now.isoformat(),
+            }
+            self._append(record)
+            self._pending.append(record)
+            self._state[registration_id] = new_state
+            if len(self._pending) >= settings.ATTENDANCE_FLUSH_MAX_ROWS:
+                self._wake.set()
+
+        if op == CHECK_IN:
+            return {
+                "message": f"✅ Check-in registrado para {participant_document_id}",
+                "data": {"status": new_state.value, "check_in_time": now.isoformat(), "queued": True},
+            }
+        return {
+            "message": f"👋 Check-out registrado para {participant_document_id}",
+            "data": {"status": new_state.value, "check_out_time": now.isoformat(), "queued": True},
+        }
+
+    def forget(self, registration_ids):
+        """Descarta el estado en memoria de esas inscripciones (cambiaron por fuera del diario)."""
+        with self._lock:
+            for registration_id in registration_ids:
+                self._state.pop(registration_id, None)
+
+    # =========================
+    # VOLCADO A LA BASE
+    # =========================
+    def _apply(self, db: Session, records: list[dict]):
+        """
+        Aplica los registros en orden. Se parten en fases donde cada inscripción
+        aparece una sola vez (entrada → salida → entrada de la misma persona
+        quedan en fases distintas); cada fase es un INSERT y un UPDATE multi-fila.
+        """
+        phases, current, seen = [], [], set()
+        for record in records:
+            if record["registration_id"] in seen:
+                phases.append(current)
+                current, seen = [], set()
+            current.append(record)
+            seen.add(record["registration_id"])
+        if current:
+            phases.append(current)
+
+        for phase in phases:
+            check_ins = [
+                {
+                    "registration_id": r["registration_id"],
+                    "participant_document_id": r["participant_document_id"],
+                    "event_id": r["event_id"],
+                    "check_in_time": datetime.fromisoformat(r["ts"]),
+                }
+                for r in phase if r["op"] == CHECK_IN
+            ]
+            existing = self.repo.get_existing_check_ins(
+                db, [(r["registration_id"], r["check_in_time"]) for r in check_ins]
+            )
+            self.repo.bulk_check_in(
+                db, [r for r in check_ins if (r["registration_id"], r["check_in_time"]) not in existing]
+            )
+            self.repo.bulk_check_out(db, [
+                {"registration_id": r["registration_id"], "check_out_time": datetime.fromisoformat(r["ts"])}
+                for r in phase if r["op"] == CHECK_OUT
+            ])
+        db.commit()
+
+    def _apply_or_reject(self, db: Session, records: list[dict]) -> int:
+        """
+        Aplica el lote; ante un error de datos lo aplica registro por registro
+        y descarta los que fallen. Retorna cuántos se descartaron.
+        """
+        try:
+            self._apply(db, records)
+            return 0
+        except (IntegrityError, DataError):
+            db.rollback()
+
+        rejected = []
+        for record in records:
+            try:
+                self._apply(db, [record])
+            except (IntegrityError, DataError) as e:
+                db.rollback()
+                rejected.append({**record, "error": str(e.orig)})
+        self._dead_letter(rejected)
+        return len(rejected)
+
+    def _dead_letter(self, records: list[dict]):
+        if not records:
+            return
+        with open(self.journal_dir / DEAD_LETTER_FILE, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        for record in records:
+            logger.error(
+                "Asistencia descartada (inscripción %s, %s %s): %s",
+                record["registration_id"], record["op"], record["ts"], record["error"],
+            )
+
+    def flush(self) -> int:
+        """Vuelca los registros pendientes. Retorna cuántos se escribieron."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                records, self._pending = self._pending, []
+                self._open_segment()
+                segments, self._sealed = self._sealed, []
+
+            db = SessionLocal()
+            try:
+                rejected = self._apply_or_reject(db, records)
+            except Exception:
+                db.rollback()
+                # Se reintentan en el próximo volcado; el diario sigue en disco
+                with self._lock:
+                    self._pending[:0] = records
+                    self._sealed[:0] = segments
+                raise
+            finally:
+                db.close()
+
+            # Ya en la base: el estado en memoria solo hace falta mientras haya registros sin volcar
+            with self._lock:
+                unflushed = {r["registration_id"] for r in self._pending}
+                for registration_id in {r["registration_id"] for r in records} - unflushed:
+                    self._state.pop(registration_id, None)
+
+            for segment in segments:
+                segment.unlink(missing_ok=True)
+            return len(records) - rejected
+
+    def replay(self) -> int:
+        """Re-aplica los segmentos del diario que quedaron de una ejecución anterior."""
+        segments = self._segments() if self.journal_dir.exists() else []
+        records = [record for segment in segments for record in self._read_segment(segment)]
+        if records:
+            db = SessionLocal()
+            try:
+                self._apply_or_reject(db, records)
+            finally:
+                db.close()
+            logger.info("Diario de asistencia: %s registros re-aplicados", len(records))
+        for segment in segments:
+            segment.unlink()
+        return len(records)
+
+    # =========================
+    # CICLO DE VIDA
+    # =========================
+    def _run(self):
+        interval = settings.ATTENDANCE_FLUSH_INTERVAL_MS / 1000
+        while not self._stop.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Error volcando asistencias; se reintenta en el próximo ciclo")
+
+    def start(self):
+        """Re-aplica el diario pendiente y arranca el hilo de volcado."""
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+        self.replay()
+        with self._lock:
+            self._open_segment()
+            self._sealed = []
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Último volcado al apagar; si falla, el diario queda para la próxima ejecución."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("No se pudieron volcar las asistencias pendientes; quedan en el diario")
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+
+
+attendance_writer = AttendanceWriter()
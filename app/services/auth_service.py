@@ -1,19 +1,147 @@
+from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
-from app.models.staff import Staff
-from app.core.security import verify_password
+from app.core.config import settings
+from app.core.dependencies import device_cache, load_principal
+from app.models.device_key import DeviceKey
+from app.core.security import (
+    hash_password_async,
+    new_secret_token,
+    password_needs_rehash,
+    token_digest,
+    verify_password_async,
+)
 from app.core.jwt import create_access_token
-from datetime import timedelta
+from app.repositories.device_key_repository import DeviceKeyRepository
+from app.repositories.refresh_token_repository import RefreshTokenRepository
+from app.repositories.staff_repository import StaffRepository
 
 class AuthService:
-    def login(self, db: Session, username: str, password: str):
-        staff = db.query(Staff).filter(Staff.username == username).first()
+    def __init__(self):
+        self.refresh_repo = RefreshTokenRepository()
+        self.device_repo = DeviceKeyRepository()
+        self.staff_repo = StaffRepository()
+
+    def _add_tokens(self, db, staff_id: int):
+        """Access token (JWT corto) + refresh token opaco guardado como HMAC. El commit queda al llamador."""
+        refresh_token = new_secret_token("rt_")
+        expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        self.refresh_repo.create(db, staff_id, token_digest(refresh_token), expires_at)
+
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        access_token = create_access_token(data={"sub": str(staff_id)}, expires_delta=access_token_expires)
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "expires_in": int(access_token_expires.total_seconds()),
+            "refresh_token": refresh_token,
+        }
+
+    def _issue_tokens(self, db: Session, staff_id: int):
+        tokens = self._add_tokens(db, staff_id)
+        db.commit()
+        return tokens
+
+    async def _issue_tokens_async(self, db: AsyncSession, staff_id: int):
+        tokens = self._add_tokens(db, staff_id)
+        await db.commit()
+        return tokens
+
+    async def login(self, db: AsyncSession, username: str, password: str):
+        """
+        Las consultas van por la sesión async y bcrypt a su pool propio,
+        así un login no retiene un hilo compartido mientras se verifica.
+        """
+        staff = await self.staff_repo.get_credentials_async(db, username)
         if not staff:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        if not verify_password(password, staff.password):
+        if not await verify_password_async(password, staff.password):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
-        access_token_expires = timedelta(minutes=60)
-        access_token = create_access_token(data={"sub": str(staff.id)}, expires_delta=access_token_expires)
-        return {"access_token": access_token, "token_type": "bearer"}
+        # Después de bcrypt: un staff inactivo no se distingue por el tiempo de respuesta
+        if not staff.is_active:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+
+        # Cambió BCRYPT_ROUNDS: se aprovecha la contraseña en claro para actualizar el hash.
+        # Con el pool de bcrypt lleno se deja para el próximo login; el login ya fue válido.
+        if password_needs_rehash(staff.password):
+            try:
+                new_hash = await hash_password_async(password)
+            except HTTPException as e:
+                if e.status_code != status.HTTP_503_SERVICE_UNAVAILABLE:
+                    raise
+            else:
+                await self.staff_repo.update_password_hash_async(db, staff.id, new_hash)
+
+        return await self._issue_tokens_async(db, staff.id)
+
+    def refresh(self, db: Session, refresh_token: str):
+        """
+        Cambia un refresh token vigente por un par nuevo (rotación) sin bcrypt.
+        Si llega uno ya rotado, se asume robado y se revocan todos los del staff.
+        """
+        invalid = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+        now = datetime.utcnow()
+        token = self.refresh_repo.get_by_hash(db, token_digest(refresh_token))
+        if not token or token.expires_at <= now:
+            raise invalid
+        if token.revoked_at is not None:
+            self._revoke_reused(db, token.staff_id, now)
+            raise invalid
+
+        principal = load_principal(token.staff_id)
+        if principal is None or not principal.is_active:
+            raise invalid
+
+        # Revocación condicional: de dos refresh simultáneos con el mismo token
+        # solo uno recibe el par nuevo; el otro cuenta como reuso.
+        if not self.refresh_repo.revoke(db, token.id, now):
+            self._revoke_reused(db, token.staff_id, now)
+            raise invalid
+        return self._issue_tokens(db, token.staff_id)
+
+    def _revoke_reused(self, db: Session, staff_id: int, now: datetime):
+        """Un refresh token ya rotado volvió a llegar: se asume robado y se revocan todos los del staff."""
+        self.refresh_repo.revoke_all_for_staff(db, staff_id, now)
+        db.commit()
+
+    def logout(self, db: Session, refresh_token: str):
+        token = self.refresh_repo.get_by_hash(db, token_digest(refresh_token))
+        if token and token.revoked_at is None:
+            self.refresh_repo.revoke(db, token.id, datetime.utcnow())
+            db.commit()
+        return {"message": "Sesión cerrada"}
+
+    # =========================
+    # LLAVES DE DISPOSITIVO (escáneres)
+    # =========================
+    def create_device_key(self, db: Session, staff_id: int, name: str):
+        """Crea la llave de un escáner. El valor en claro solo se entrega esta vez."""
+        key = new_secret_token("dk_")
+        device = DeviceKey(name=name, staff_id=staff_id, key_prefix=key[:12], key_hash=token_digest(key))
+        device = self.device_repo.create(db, device)
+        return {
+            "id": device.id,
+            "name": device.name,
+            "key_prefix": device.key_prefix,
+            "created_at": device.created_at,
+            "last_used_at": device.last_used_at,
+            "revoked_at": device.revoked_at,
+            "key": key,
+        }
+
+    def list_device_keys(self, db: Session, staff_id: int):
+        return self.device_repo.list_for_staff(db, staff_id)
+
+    def revoke_device_key(self, db: Session, staff_id: int, device_id: int):
+        device = self.device_repo.get_by_id(db, device_id)
+        if not device or device.staff_id != staff_id:
+            raise HTTPException(status_code=404, detail="Device key not found")
+        if device.revoked_at is None:
+            device.revoked_at = datetime.utcnow()
+            db.commit()
+            db.refresh(device)
+        device_cache.invalidate(device.key_hash)
+        return device
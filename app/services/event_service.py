@@ -1,8 +1,13 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from app.core.pagination import page_columns
 from app.models.event import Event
-from app.schemas.event_schema import EventCreate
+from app.schemas.event_schema import EventCreate, EventOut
 from app.repositories.event_repository import EventRepository
 
+# Columnas que lee el listado paginado (los campos de EventOut)
+PAGE_COLUMNS = page_columns(Event, EventOut)
+
 class EventService:
     def __init__(self):
         self.repo = EventRepository()
@@ -11,5 +16,8 @@ class EventService:
         event = Event(**data.dict())
         return self.repo.create(db, event)
 
-    def list_events(self, db: Session):
-        return self.repo.get_all(db)
+    async def list_events_async(self, db: AsyncSession, limit: int, after: str | None = None, sort: str = "id", order: str = "asc", **filters):
+        rows, next_cursor = await self.repo.get_page_async(
+            db, PAGE_COLUMNS, limit, after, sort, order == "desc", **filters
+        )
+        return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
@@ -0,0 +1,54 @@
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.export_utils import iter_csv, iter_ndjson
+from app.repositories.attendance_repository import AttendanceRepository
+from app.repositories.participant_repository import ParticipantRepository
+from app.repositories.registration_repository import EventRegistrationRepository
+
+
+class ExportService:
+    def __init__(self):
+        self.participant_repo = ParticipantRepository()
+        self.registration_repo = EventRegistrationRepository()
+        self.attendance_repo = AttendanceRepository()
+
+    def _stream(self, fmt: str, build_query, session_factory=SessionLocal):
+        """
+        Recorre la consulta por lotes y la entrega como CSV o NDJSON.
+        La sesión se abre dentro del generador porque la respuesta se sigue
+        enviando después de que terminan las dependencias de la ruta.
+        session_factory permite leer de la réplica.
+        """
+        db = session_factory()
+        try:
+            query = build_query(db)
+            columns = [c["name"] for c in query.column_descriptions]
+            writer = iter_csv if fmt == "csv" else iter_ndjson
+            yield from writer(columns, query)
+        finally:
+            db.close()
+
+    def export_participants(self, fmt: str, career: str | None = None, session_factory=SessionLocal):
+        return self._stream(
+            fmt,
+            lambda db: self.participant_repo.export_query(db, settings.EXPORT_YIELD_PER, career=career),
+            session_factory,
+        )
+
+    def export_registrations(
+        self, fmt: str, event_id: int | None = None, is_paid: bool | None = None, session_factory=SessionLocal
+    ):
+        return self._stream(
+            fmt,
+            lambda db: self.registration_repo.export_query(
+                db, settings.EXPORT_YIELD_PER, event_id=event_id, is_paid=is_paid
+            ),
+            session_factory,
+        )
+
+    def export_attendance(self, fmt: str, event_id: int | None = None, session_factory=SessionLocal):
+        return self._stream(
+            fmt,
+            lambda db: self.attendance_repo.export_query(db, settings.EXPORT_YIELD_PER, event_id=event_id),
+            session_factory,
+        )
@@ -0,0 +1,153 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.participant_service import ParticipantService
+from app.services.registration_service import EventRegistrationService
+
+MAX_FAILED_ROWS = 500
+
+
+class ImportJob:
+    """Estado y avance de una importación en segundo plano."""
+
+    def __init__(self, kind: str, filename: str | None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.filename = filename
+        self.status = "PENDING"  # PENDING, RUNNING, DONE, FAILED
+        self.processed = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.updated = 0
+        self.failed = 0
+        self.failed_rows = []
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+        self._started = None
+        self._finished = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.status = "RUNNING"
+            self.started_at = datetime.utcnow()
+            self._started = time.monotonic()
+
+    def update(self, processed: int, inserted: int, skipped: int, updated: int = 0):
+        with self._lock:
+            self.processed, self.inserted, self.skipped, self.updated = processed, inserted, skipped, updated
+
+    def add_failure(self, row: int, reason: str):
+        with self._lock:
+            self.failed += 1
+            # Solo se guarda el detalle de las primeras filas para acotar la memoria
+            if len(self.failed_rows) < MAX_FAILED_ROWS:
+                self.failed_rows.append({"row": row, "error": reason})
+
+    def finish(self, error: str | None = None):
+        with self._lock:
+            self.status = "FAILED" if error else "DONE"
+            self.error = error
+            self.finished_at = datetime.utcnow()
+            self._finished = time.monotonic()
+
+    def to_dict(self):
+        with self._lock:
+            elapsed = None
+            if self._started is not None:
+                elapsed = (self._finished or time.monotonic()) - self._started
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "filename": self.filename,
+                "status": self.status,
+                "rows_processed": self.processed,
+                "inserted": self.inserted,
+                "skipped": self.skipped,
+                "updated": self.updated,
+                "failed": self.failed,
+                "failed_rows": list(self.failed_rows),
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+                "rows_per_second": round(self.processed / elapsed, 1) if elapsed else None,
+            }
+
+
+class ImportJobService:
+    """
+    Ejecuta importaciones en un pool de hilos propio, separado del threadpool
+    de anyio que atiende las rutas síncronas. Los trabajos viven en memoria
+    del proceso que recibió el archivo.
+    """
+
+    def __init__(self):
+        self.importers = {
+            "participants": ParticipantService().import_file,
+            "registrations": EventRegistrationService().import_file,
+        }
+        self._executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix="import-job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, file: UploadFile, **options) -> ImportJob:
+        # El UploadFile se cierra al terminar la petición: se copia a disco primero
+        suffix = os.path.splitext(file.filename or "")[1]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            shutil.copyfileobj(file.file, tmp)
+            path = tmp.name
+
+        job = ImportJob(kind, file.filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        self._executor.submit(self._run, job, path, options)
+        return job
+
+    def _evict_finished(self):
+        """Descarta los trabajos terminados más antiguos; los pendientes o en curso nunca se pierden."""
+        excess = len(self._jobs) - settings.IMPORT_JOBS_KEPT
+        if excess <= 0:
+            return
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("DONE", "FAILED")]
+        for job_id in finished[:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> ImportJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: ImportJob, path: str, options: dict):
+        job.start()
+        db = SessionLocal()
+        try:
+            with open(path, "rb") as fh:
+                self.importers[job.kind](db, fh, job.filename, progress=job, **options)
+            job.finish()
+        except HTTPException as e:
+            db.rollback()
+            job.finish(error=str(e.detail))
+        except Exception as e:
+            db.rollback()
+            job.finish(error=str(e))
+        finally:
+            db.close()
+            os.remove(path)
+
+
+import_job_service = ImportJobService()
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.mail_pool import get_mail_pool
+from app.models.email_outbox import OutboxStatus
+from app.repositories.email_outbox_repository import EmailOutboxRepository
+from app.repositories.event_repository import EventRepository
+from app.repositories.registration_repository import EventRegistrationRepository
+from app.services.registration_service import EventRegistrationService
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxService:
+    """
+    Envío de correos de QR a través de una bandeja de salida persistente.
+    La ruta solo encola; el despachador (tarea de fondo) envía por lotes,
+    reintenta con espera exponencial y deja en DEAD lo que no se pudo enviar.
+    """
+
+    def __init__(self):
+        self.repo = EmailOutboxRepository()
+        self.event_repo = EventRepository()
+        self.registration_repo = EventRegistrationRepository()
+        self.registration_service = EventRegistrationService()
+
+    # =========================
+    # ENCOLAR Y CONSULTAR
+    # =========================
+    def enqueue_event_qrs(self, db: Session, event_id: int, resend: bool = False):
+        event = self.event_repo.get_by_id(db, event_id)
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+
+        enqueued = self.repo.enqueue_event_qrs(db, event_id, datetime.utcnow(), resend=resend)
+        return {
+            "status": "queued",
+            "event": event.name,
+            "enqueued": enqueued,
+            "message": f"📬 {enqueued} correos en cola para el evento '{event.name}'.",
+        }
+
+    def event_status(self, db: Session, event_id: int):
+        event = self.event_repo.get_by_id(db, event_id)
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+
+        counts = {status.name: 0 for status in OutboxStatus}
+        counts.update(self.repo.status_counts(db, event_id))
+        total = sum(counts.values())
+        done = counts[OutboxStatus.SENT.name] + counts[OutboxStatus.DEAD.name]
+        return {
+            "event": event.name,
+            "total": total,
+            "pending": counts[OutboxStatus.PENDING.name],
+            "sending": counts[OutboxStatus.SENDING.name],
+            "sent": counts[OutboxStatus.SENT.name],
+            "dead": counts[OutboxStatus.DEAD.name],
+            "progress": round(done / total, 4) if total else 1.0,
+            "dead_letters": [
+                {"registration_id": r.registration_id, "attempts": r.attempts, "error": r.last_error}
+                for r in self.repo.dead_letters(db, event_id)
+            ],
+        }
+
+    # =========================
+    # DESPACHADOR
+    # =========================
+    def _claim(self):
+        db = SessionLocal()
+        try:
+            now = datetime.utcnow()
+            self.repo.release_stale(db, now - timedelta(seconds=settings.OUTBOX_STALE_SECONDS))
+            return self.repo.claim_batch(db, now, settings.OUTBOX_BATCH_SIZE)
+        finally:
+            db.close()
+
+    def _record(self, sent: list, failed: list):
+        """Escribe el resultado del lote: pocos UPDATE en lugar de uno por correo."""
+        now = datetime.utcnow()
+        failures = []
+        for row, error in failed:
+            attempts = row.attempts + 1
+            dead = attempts >= settings.OUTBOX_MAX_ATTEMPTS
+            delay = min(settings.OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1), settings.OUTBOX_MAX_BACKOFF_SECONDS)
+            failures.append({
+                "id": row.outbox_id,
+                "status": OutboxStatus.DEAD if dead else OutboxStatus.PENDING,
+                "attempts": attempts,
+                "next_attempt_at": now + timedelta(seconds=delay),
+                "locked_at": None,
+                "last_error": error[:1000],
+            })
+
+        db = SessionLocal()
+        try:
+            self.repo.mark_sent(db, [row.outbox_id for row in sent], now)
+            self.registration_repo.mark_qr_sent(db, [row.registration_id for row in sent], now)
+            self.repo.mark_failed(db, failures)
+            db.commit()
+        finally:
+            db.close()
+
+    async def _deliver(self, row):
+        reg = SimpleNamespace(
+            id=row.registration_id,
+            event_id=row.event_id,
+            participant_document_id=row.participant_document_id,
+            qr_version=row.qr_version,
+        )
+        participant = SimpleNamespace(
+            document_id=row.participant_document_id,
+            first_name=row.first_name,
+            last_name=row.last_name,
+            email=row.email,
+        )
+        event = SimpleNamespace(id=row.event_id, name=row.event_name)
+        _, png = await self.registration_service._registration_qr_async(reg)
+        message = self.registration_service._qr_email_message(reg, participant, event, png)
+        await get_mail_pool().send(message)
+
+    async def dispatch_once(self) -> int:
+        """Envía un lote de la bandeja. Retorna cuántos mensajes se procesaron."""
+        batch = await asyncio.to_thread(self._claim)
+        if not batch:
+            return 0
+
+        results = await asyncio.gather(*(self._deliver(row) for row in batch), return_exceptions=True)
+        sent = [row for row, result in zip(batch, results) if not isinstance(result, Exception)]
+        failed = [(row, str(result) or type(result).__name__) for row, result in zip(batch, results) if isinstance(result, Exception)]
+
+        await asyncio.to_thread(self._record, sent, failed)
+        return len(batch)
+
+    async def run(self, stop: asyncio.Event):
+        """Ciclo del despachador: procesa lotes mientras haya trabajo y espera cuando la bandeja está vacía."""
+        while not stop.is_set():
+            try:
+                processed = await self.dispatch_once()
+            except Exception:
+                logger.exception("Error en el despachador de correos")
+                processed = 0
+            if not processed:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=settings.OUTBOX_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
@@ -1,8 +1,28 @@
-import pandas as pd
-from fastapi import HTTPException, UploadFile, status
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models.participant import Participant
+from app.core.config import settings
+from app.core.import_utils import cell_to_str, chunked, open_spreadsheet
+from app.core.pagination import page_columns
+from app.models.participant import DocumentType, Participant
+from app.schemas.participant_schema import ParticipantOut
 from app.repositories.participant_repository import ParticipantRepository
+from app.services.registration_service import MAX_IMPORT_ERRORS
+
+PARTICIPANT_COLUMNS = (
+    "document_id",
+    "document_type",
+    "first_name",
+    "last_name",
+    "email",
+    "phone_number",
+    "career",
+    "idnumber",
+)
+
+# Columnas que lee el listado paginado (los campos de ParticipantOut)
+PAGE_COLUMNS = page_columns(Participant, ParticipantOut)
 
 class ParticipantService:
     def __init__(self):
@@ -18,65 +38,98 @@ class ParticipantService:
         participant = Participant(**data.dict())
         return self.repo.create(db, participant)
 
-    def list_participants(self, db: Session):
-        return self.repo.get_all(db)
+    async def list_participants_async(self, db: AsyncSession, limit: int, after: str | None = None, sort: str = "document_id", order: str = "asc", **filters):
+        rows, next_cursor = await self.repo.get_page_async(
+            db, PAGE_COLUMNS, limit, after, sort, order == "desc", **filters
+        )
+        # Filas planas con los campos de ParticipantOut: se serializan directo, sin pasar por el ORM
+        return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
 
     def get_participant(self, db: Session, participant_id: str):
         return self.repo.get_by_document_id(db, participant_id)
 
-    def import_from_excel(self, db: Session, file: UploadFile):
-        """Importa múltiples participantes desde un archivo Excel (.xlsx)."""
+    def import_file(self, db: Session, fileobj, filename: str | None, progress=None):
+        """
+        Importa desde un archivo abierto. `progress` (opcional) recibe el avance
+        por lote con update() y las filas inválidas con add_failure().
+        """
         try:
-            df = pd.read_excel(file.file)
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Error al leer el archivo Excel: {str(e)}")
-
-        required_columns = {
-            "document_id",
-            "document_type",
-            "first_name",
-            "last_name",
-            "email",
-            "phone_number",
-            "career",
-            "idnumber",
-        }
-
-        # Validar que las columnas sean correctas
-        if not required_columns.issubset(set(df.columns)):
+            sheet = open_spreadsheet(fileobj, filename, PARTICIPANT_COLUMNS)
+        except ValueError:
             raise HTTPException(
                 status_code=400,
-                detail=f"El archivo Excel debe contener las columnas: {', '.join(required_columns)}"
+                detail=f"El archivo Excel debe contener las columnas: {', '.join(PARTICIPANT_COLUMNS)}"
             )
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error al leer el archivo Excel: {str(e)}")
 
-        inserted = 0
-        skipped = 0
-
-        for _, row in df.iterrows():
-            existing = self.repo.get_by_document_id(db, str(row["document_id"]))
-            if existing:
-                skipped += 1
-                continue
-
-            participant = Participant(
-                document_id=str(row["document_id"]),
-                document_type=str(row["document_type"]),
-                first_name=str(row["first_name"]),
-                last_name=str(row["last_name"]),
-                email=str(row["email"]),
-                phone_number=str(row["phone_number"]),
-                career=str(row["career"]),
-                idnumber=str(row["idnumber"]),
-            )
-
-            db.add(participant)
-            inserted += 1
-
-        db.commit()
+        rows = ({column: cell_to_str(row.get(column)) for column in PARTICIPANT_COLUMNS} for row in sheet)
+        inserted, skipped, failed, errors = self._import_rows(db, rows, progress)
 
         return {
             "status": "success",
             "inserted": inserted,
             "skipped": skipped,
-            "message": f"Se importaron {inserted} participantes. Se omitieron {skipped} duplicados."
+            "failed": failed,
+            "errors": errors,
+            "message": (
+                f"Se importaron {inserted} participantes. Se omitieron {skipped} duplicados "
+                f"y {failed} filas inválidas."
+            ),
         }
+
+    def _import_rows(self, db: Session, rows, progress=None):
+        """
+        Inserta las filas por lotes: un SELECT ... IN por lote para descartar
+        duplicados, un INSERT masivo y un commit por lote. Si un lote falla,
+        los lotes anteriores ya quedan guardados. Las filas inválidas se cuentan
+        en `failed` y se reportan en `errors` sin detener la importación.
+        """
+        chunk_size = settings.IMPORT_CHUNK_SIZE
+        inserted, skipped, failed, processed = 0, 0, 0, 0
+        errors = []
+
+        def fail(row_number, message):
+            nonlocal failed
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({"row": row_number, "error": message})
+            if progress:
+                progress.add_failure(row_number, message)
+
+        for chunk in chunked(rows, chunk_size):
+            # Los lotes anteriores ya están confirmados, así que basta con
+            # revisar la base de datos y los duplicados dentro del mismo lote.
+            existing = self.repo.get_existing_document_ids(db, [r["document_id"] for r in chunk], chunk_size)
+            seen = set()
+            new_rows = []
+            for row_number, row in enumerate(chunk, start=processed + 1):
+                # Una fila sin documento es un fallo, no un duplicado: se cuenta una sola vez
+                if not row["document_id"]:
+                    fail(row_number, "document_id vacío")
+                    continue
+                # Un tipo fuera del enum haría fallar el INSERT de todo el lote
+                if row["document_type"] and row["document_type"] not in DocumentType.__members__:
+                    fail(row_number, f"document_type inválido: {row['document_type']}")
+                    continue
+                if row["document_id"] in existing or row["document_id"] in seen:
+                    skipped += 1
+                    continue
+                seen.add(row["document_id"])
+                new_rows.append(row)
+
+            try:
+                self.repo.bulk_insert(db, new_rows)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error al importar participantes (se importaron {inserted} antes del error): {str(e)}",
+                )
+            inserted += len(new_rows)
+            processed += len(chunk)
+            if progress:
+                progress.update(processed, inserted, skipped)
+
+        return inserted, skipped, failed, errors
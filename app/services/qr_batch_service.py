@@ -0,0 +1,34 @@
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.export_utils import iter_zip
+from app.core.qr_cache import iter_qr_pngs
+from app.core.qr_utils import registration_qr_content
+from app.repositories.event_repository import EventRepository
+from app.repositories.registration_repository import EventRegistrationRepository
+
+
+class QRBatchService:
+    def __init__(self):
+        self.event_repo = EventRepository()
+        self.registration_repo = EventRegistrationRepository()
+
+    def event_qrs_zip(self, db: Session, event_id: int, paid_only: bool = False):
+        """
+        Retorna (evento, generador del ZIP) con el QR de cada inscripción del evento.
+        Las filas se leen antes de empezar a enviar, así la conexión no queda
+        ocupada mientras se dibujan las imágenes.
+        """
+        event = self.event_repo.get_by_id(db, event_id)
+        if not event:
+            raise HTTPException(status_code=404, detail="Event not found")
+
+        rows = self.registration_repo.list_qr_rows(db, event_id, paid_only)
+        items = (
+            (
+                f"{row.participant_document_id}.png",
+                registration_qr_content(row.id, row.event_id, row.participant_document_id, row.qr_version or 1),
+            )
+            for row in rows
+        )
+        return event, iter_zip(iter_qr_pngs(items))
@@ -0,0 +1,65 @@
+import threading
+import time
+from typing import NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.repositories.registration_repository import EventRegistrationRepository
+
+
+class IndexedRegistration(NamedTuple):
+    """Lo mínimo que necesita el check-in de una inscripción."""
+    event_id: int
+    participant_document_id: str
+    qr_version: int
+
+
+class RegistrationIndex:
+    """
+    Índice en memoria de las inscripciones de los eventos ACTIVE, por
+    registration_id. Resuelve los escaneos de la entrada sin ir a la base.
+    Las altas y revocaciones de este proceso lo actualizan al momento; los
+    cambios hechos por otros workers llegan con la recarga periódica.
+    """
+
+    def __init__(self):
+        self.repo = EventRegistrationRepository()
+        self._entries: dict[int, IndexedRegistration] = {}
+        self._events: set[int] = set()
+        self._lock = threading.Lock()
+        self.loaded_at = None
+
+    def load(self, db: Session):
+        """Recarga completa: se arma un dict nuevo y se reemplaza de una vez."""
+        events, rows = self.repo.list_active_index_rows(db)
+        entries = {row.id: IndexedRegistration(row.event_id, row.participant_document_id, row.qr_version or 1) for row in rows}
+        with self._lock:
+            self._entries = entries
+            self._events = set(events)
+            self.loaded_at = time.time()
+
+    def refresh_events(self, db: Session, event_ids):
+        """Recarga solo las inscripciones de los eventos activos indicados (p. ej. tras una importación)."""
+        with self._lock:
+            tracked = self._events.intersection(event_ids)
+        if not tracked:
+            return
+        _, rows = self.repo.list_active_index_rows(db, tracked)
+        with self._lock:
+            for row in rows:
+                self._entries[row.id] = IndexedRegistration(row.event_id, row.participant_document_id, row.qr_version or 1)
+
+    def get(self, registration_id: int) -> IndexedRegistration | None:
+        return self._entries.get(registration_id)
+
+    def put(self, registration_id: int, event_id: int, participant_document_id: str, qr_version: int = 1):
+        """Agrega o actualiza una inscripción si su evento está en el índice."""
+        with self._lock:
+            if event_id in self._events:
+                self._entries[registration_id] = IndexedRegistration(event_id, participant_document_id, qr_version or 1)
+
+    def stats(self):
+        return {"events": len(self._events), "registrations": len(self._entries), "loaded_at": self.loaded_at}
+
+
+registration_index = RegistrationIndex()
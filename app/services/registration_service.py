@@ -1,30 +1,48 @@
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime
-from fastapi import HTTPException, status, UploadFile
-import pandas as pd
-import qrcode
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 import base64
-import io
-import hmac
-import hashlib
-import json
-import os
-import asyncio
 
 from app.models.event_registration import EventRegistration
-from app.schemas.registration_schema import EventRegistrationCreate
+from app.schemas.registration_schema import EventRegistrationCreate, EventRegistrationOut
 from app.repositories.registration_repository import EventRegistrationRepository
-from app.core.mail_config import FastMail, MessageSchema, conf
+from app.core.config import settings
+from app.core.import_utils import cell_to_str, chunked, open_spreadsheet, parse_bool
+from app.core.mail_pool import build_message, get_mail_pool
+from app.core.pagination import page_columns
+from app.core.qr_cache import get_qr_png, get_qr_png_async
+from app.core.qr_utils import registration_qr_content
+from app.repositories.event_repository import EventRepository
+from app.repositories.participant_repository import ParticipantRepository
+from app.repositories.staff_repository import StaffRepository
+from app.services.registration_index import registration_index
+
+
+MAX_IMPORT_ERRORS = 500
+
+# Columnas que lee el listado paginado (los campos de EventRegistrationOut)
+PAGE_COLUMNS = page_columns(EventRegistration, EventRegistrationOut)
 
 
 class EventRegistrationService:
     def __init__(self):
         self.repo = EventRegistrationRepository()
+        self.event_repo = EventRepository()
+        self.participant_repo = ParticipantRepository()
+        self.staff_repo = StaffRepository()
 
     # =========================
     # CRUD PRINCIPAL
     # =========================
     def create_registration(self, db: Session, data: EventRegistrationCreate):
+        if self.repo.get_existing_registration(db, data.event_id, data.participant_document_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Participant {data.participant_document_id} is already registered in event {data.event_id}."
+            )
         registration = EventRegistration(
             event_id=data.event_id,
             participant_document_id=data.participant_document_id,
@@ -33,10 +51,17 @@ class EventRegistrationService:
             qr_sent_at=datetime.utcnow() if data.qr_code_sent else None,
             is_paid=getattr(data, "is_paid", False),
         )
-        return self.repo.create(db, registration)
+        registration = self.repo.create(db, registration)
+        registration_index.put(
+            registration.id, registration.event_id, registration.participant_document_id, registration.qr_version
+        )
+        return registration
 
-    def list_registrations(self, db: Session):
-        return self.repo.get_all(db)
+    async def list_registrations_async(self, db: AsyncSession, limit: int, after: str | None = None, sort: str = "id", order: str = "asc", **filters):
+        rows, next_cursor = await self.repo.get_page_async(
+            db, PAGE_COLUMNS, limit, after, sort, order == "desc", **filters
+        )
+        return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
 
     def get_registration(self, db: Session, reg_id: int):
         reg = self.repo.get_by_id(db, reg_id)
@@ -65,254 +90,169 @@ class EventRegistrationService:
     # =========================
     # IMPORTAR DESDE EXCEL
     # =========================
-    def import_from_excel(self, db: Session, file: UploadFile):
+    def import_file(self, db: Session, fileobj, filename: str | None, progress=None, update_existing: bool = False):
+        """
+        Importa desde un archivo abierto. `progress` (opcional) recibe el avance
+        por lote con update() y las filas inválidas con add_failure().
+
+        Por cada lote se hacen consultas IN para validar eventos, participantes y
+        staff, otra para detectar inscripciones existentes y un único INSERT
+        con upsert; no hay consultas por fila.
+        """
+        required_columns = ("event_id", "participant_document_id", "registered_by_staff_id", "qr_code_sent", "is_paid")
         try:
-            df = pd.read_excel(file.file)
+            sheet = open_spreadsheet(fileobj, filename, required_columns)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Faltan columnas: {', '.join(required_columns)}")
         except Exception as e:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Error al leer Excel: {str(e)}")
 
-        required_columns = {"event_id", "participant_document_id", "registered_by_staff_id", "qr_code_sent", "is_paid"}
-        if not required_columns.issubset(set(df.columns)):
-            raise HTTPException(status_code=400, detail=f"Faltan columnas: {', '.join(required_columns)}")
-
-        def parse_bool(v):
-            if isinstance(v, bool):
-                return v
-            if isinstance(v, (int, float)):
-                return v != 0
-            if isinstance(v, str):
-                return v.strip().lower() in ["true", "1", "yes", "si", "sí"]
-            return False
-
-        inserted, skipped = 0, 0
-        for _, row in df.iterrows():
-            try:
-                event_id = int(row["event_id"])
-                participant_id = str(row["participant_document_id"])
-                staff_id = int(row["registered_by_staff_id"])
-                qr_sent = parse_bool(row["qr_code_sent"])
-                is_paid = parse_bool(row["is_paid"])
-            except Exception:
-                skipped += 1
-                continue
-
-            if self.repo.get_existing_registration(db, event_id=event_id, participant_document_id=participant_id):
-                skipped += 1
-                continue
-
-            reg = EventRegistration(
-                event_id=event_id,
-                participant_document_id=participant_id,
-                registered_by_staff_id=staff_id,
-                qr_code_sent=qr_sent,
-                qr_sent_at=datetime.utcnow() if qr_sent else None,
-                is_paid=is_paid,
+        inserted, updated, skipped, failed, processed = 0, 0, 0, 0, 0
+        errors = []
+        touched_events = set()
+
+        def fail(row_number, message):
+            nonlocal failed
+            failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                errors.append({"row": row_number, "error": message})
+            if progress:
+                progress.add_failure(row_number, message)
+
+        for chunk in chunked(sheet, settings.IMPORT_CHUNK_SIZE):
+            parsed = []
+            for row_number, row in enumerate(chunk, start=processed + 1):
+                try:
+                    parsed.append((row_number, self._parse_import_row(row)))
+                except ValueError as e:
+                    fail(row_number, str(e))
+
+            # Validación de llaves foráneas en bloque
+            events = self.event_repo.get_existing_ids(db, {r["event_id"] for _, r in parsed})
+            participants = self.participant_repo.get_existing_document_ids(
+                db, list({r["participant_document_id"] for _, r in parsed})
+            )
+            staff = self.staff_repo.get_existing_ids(db, {r["registered_by_staff_id"] for _, r in parsed})
+            existing = self.repo.get_existing_pairs(
+                db, {(r["event_id"], r["participant_document_id"]) for _, r in parsed}
             )
-            db.add(reg)
-            inserted += 1
-        db.commit()
-
-        return {"status": "success", "inserted": inserted, "skipped": skipped}
-
-    # =========================
-    # GENERAR QR INDIVIDUAL
-    # =========================
-    def generate_qr_for_registration(self, db: Session, reg_id: int):
-        reg = self.repo.get_by_id(db, reg_id)
-        if not reg:
-            raise HTTPException(status_code=404, detail="Registration not found")
 
-        event = getattr(reg, "event", None)
-        participant = getattr(reg, "participant", None)
+            rows, seen = [], set()
+            for row_number, r in parsed:
+                key = (r["event_id"], r["participant_document_id"])
+                if r["event_id"] not in events:
+                    fail(row_number, f"El evento {r['event_id']} no existe")
+                elif r["participant_document_id"] not in participants:
+                    fail(row_number, f"El participante {r['participant_document_id']} no existe")
+                elif r["registered_by_staff_id"] not in staff:
+                    fail(row_number, f"El staff {r['registered_by_staff_id']} no existe")
+                elif key in seen:
+                    skipped += 1
+                elif key in existing:
+                    seen.add(key)
+                    if update_existing:
+                        rows.append(r)
+                        updated += 1
+                    else:
+                        skipped += 1
+                else:
+                    seen.add(key)
+                    rows.append(r)
+                    inserted += 1
 
-        payload = {
-            "registration_id": reg.id,
-            "event_id": reg.event_id,
-            "participant_document_id": reg.participant_document_id,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-        secret_key = b"ucc-seminario-secret-key"
-        payload["signature"] = hmac.new(
-            secret_key, json.dumps(payload, sort_keys=True).encode(), hashlib.sha256
-        ).hexdigest()
-
-        qr = qrcode.QRCode(box_size=10, border=4)
-        qr.add_data(json.dumps(payload))
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        event_name = (event.name if event else f"evento_{reg.event_id}").replace(" ", "_")
-        save_dir = os.path.join("app", "static", "qrs", event_name)
-        os.makedirs(save_dir, exist_ok=True)
-        file_path = os.path.join(save_dir, f"{reg.participant_document_id}.png")
-        img.save(file_path)
-
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        base64_png = base64.b64encode(buf.getvalue()).decode()
-        buf.close()
+            try:
+                self.repo.bulk_upsert(db, rows, update_existing=update_existing)
+                db.commit()
+                touched_events.update(r["event_id"] for r in rows)
+            except SQLAlchemyError as e:
+                db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error al importar inscripciones (se procesaron {processed} filas antes del error): {str(e)}",
+                )
+            processed += len(chunk)
+            if progress:
+                progress.update(processed, inserted, skipped, updated)
+
+        # Las nuevas inscripciones de eventos activos quedan disponibles para el check-in
+        registration_index.refresh_events(db, touched_events)
 
         return {
             "status": "success",
-            "qr_image_path": file_path,
-            "qr_image_base64": f"data:image/png;base64,{base64_png}",
+            "inserted": inserted,
+            "updated": updated,
+            "skipped": skipped,
+            "failed": failed,
+            "errors": errors,
         }
 
+    def _parse_import_row(self, row: dict) -> dict:
+        """Convierte una fila del archivo en valores para el INSERT; lanza ValueError si es inválida."""
+        values = {}
+        for field in ("event_id", "registered_by_staff_id"):
+            try:
+                values[field] = int(float(row[field]))
+            except (TypeError, ValueError):
+                raise ValueError(f"{field} inválido: {row[field]!r}")
+        values["participant_document_id"] = cell_to_str(row["participant_document_id"])
+        if not values["participant_document_id"]:
+            raise ValueError("participant_document_id vacío")
+        values["is_paid"] = parse_bool(row["is_paid"])
+        values["qr_code_sent"] = parse_bool(row["qr_code_sent"])
+        values["qr_sent_at"] = datetime.utcnow() if values["qr_code_sent"] else None
+        return values
+
     # =========================
-    # GENERAR Y ENVIAR QRS PAGADOS (ASÍNCRONO CON PLANTILLA)
+    # GENERAR QR INDIVIDUAL
     # =========================
-    async def generate_and_send_all_qrs_paid(self, db: Session, event_id: int):
-        from app.models.participant import Participant
-        from app.models.event import Event
-
-        event = db.query(Event).filter_by(id=event_id).first()
-        if not event:
-            raise HTTPException(status_code=404, detail="Event not found")
-
-        regs = (
-            db.query(EventRegistration)
-            .filter(EventRegistration.event_id == event_id, EventRegistration.is_paid == True)
-            .all()
+    def _registration_qr(self, reg: EventRegistration):
+        """Ruta y PNG del QR de la inscripción, servidos desde la caché por contenido."""
+        content = registration_qr_content(reg.id, reg.event_id, reg.participant_document_id, reg.qr_version or 1)
+        return get_qr_png(content, use_pool=True)
+
+    async def _registration_qr_async(self, reg: EventRegistration):
+        """Igual que _registration_qr pero sin bloquear el event loop (firma en hilo, dibujo en proceso)."""
+        content = await run_in_threadpool(
+            registration_qr_content, reg.id, reg.event_id, reg.participant_document_id, reg.qr_version or 1
         )
-        if not regs:
-            return {"message": f"No hay inscripciones pagadas para el evento '{event.name}'."}
-
-        event_dir = os.path.join("app", "static", "qrs", event.name.replace(" ", "_"))
-        os.makedirs(event_dir, exist_ok=True)
-
-        secret_key = b"ucc-seminario-secret-key"
-        fm = FastMail(conf)
-
-        async def send_email_task(reg, participant):
-            payload = {
-                "registration_id": reg.id,
-                "event_id": event.id,
-                "participant_document_id": participant.document_id,
-                "timestamp": datetime.utcnow().isoformat(),
-            }
-            payload["signature"] = hmac.new(
-                secret_key, json.dumps(payload, sort_keys=True).encode(), hashlib.sha256
-            ).hexdigest()
-
-            qr_img = qrcode.make(json.dumps(payload))
-            qr_path = os.path.join(event_dir, f"{participant.document_id}.png")
-            qr_img.save(qr_path)
-
-            # QR como base64 embebido
-            buf = io.BytesIO()
-            qr_img.save(buf, format="PNG")
-            qr_base64 = base64.b64encode(buf.getvalue()).decode()
-            buf.close()
-            qr_inline = f"data:image/png;base64,{qr_base64}"
-
-            # Enlace de verificación (ajusta a tu dominio/ruta)
-            verify_url = f"https://iemchambu2.edu.co/verify-qr/{reg.id}"
-
-            # Plantilla HTML profesional
-            html_body = f"""
-            <div style="font-family: Arial, sans-serif; color: #222; line-height: 1.6; padding: 20px; max-width: 600px; margin: auto; border: 1px solid #ddd; border-radius: 10px;">
-                <h2 style="color: #004b87;">Plantilla para Entrega de QR de Acceso a Seminario de Ingeniería</h2>
-                <p>¡Hola, <b>{participant.first_name} {participant.last_name}</b>!</p>
-
-                <p>Tu acceso para el seminario de ingeniería <b>{event.name}</b> programado para <b>viernes, 17 de octubre de 2025</b>, está listo.</p>
-
-                <p>A continuación encontrarás tu código QR personal e intransferible. Por favor, preséntalo en la entrada para agilizar tu registro:</p>
-
-                <div style="text-align:center; margin:20px 0;">
-                    <img src="{qr_inline}" alt="Código QR" style="width:200px; height:200px; border:2px solid #004b87; padding:5px; border-radius:8px;">
-                </div>
-
-                <p>También puedes verificar tu registro haciendo clic en el siguiente enlace:</p>
-                <p style="text-align:center; margin: 20px 0;">
-                    <a href="{verify_url}" style="background-color:#004b87; color:#fff; text-decoration:none; padding:10px 20px; border-radius:5px;">Verificar mi QR</a>
-                </p>
-
-                <p>¡Te esperamos! 👋</p>
-
-                <hr style="border:none; border-top:1px solid #ddd;">
-                <p style="font-size:12px; color:#666; text-align:center;">
-                    Universidad Cooperativa de Colombia - Campus Pasto<br>
-                    Seminario de Ingeniería de Software<br>
-                    © 2025 Todos los derechos reservados.
-                </p>
-            </div>
-            """
-
-            message = MessageSchema(
-                subject=f"Tu Acceso al {event.name}",
-                recipients=[participant.email],
-                body=html_body,
-                subtype="html",
-                attachments=[qr_path],
-            )
+        return await get_qr_png_async(content)
 
-            await fm.send_message(message)
-            return participant.email
+    def revoke_qr(self, db: Session, reg_id: int):
+        """Invalida los QR emitidos para la inscripción subiendo su versión."""
+        reg = self.repo.get_by_id(db, reg_id)
+        if not reg:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Registration not found")
+        reg.qr_version = (reg.qr_version or 1) + 1
+        db.commit()
+        db.refresh(reg)
+        registration_index.put(reg.id, reg.event_id, reg.participant_document_id, reg.qr_version)
+        return reg
 
-        # Ejecutar todas las tareas en paralelo
-        tasks = []
-        for reg in regs:
-            participant = db.query(Participant).filter_by(document_id=reg.participant_document_id).first()
-            if participant and participant.email:
-                tasks.append(send_email_task(reg, participant))
+    def generate_qr_for_registration(self, db: Session, reg_id: int):
+        reg = self.repo.get_by_id(db, reg_id)
+        if not reg:
+            raise HTTPException(status_code=404, detail="Registration not found")
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        sent = [r for r in results if isinstance(r, str)]
-        failed = [str(r) for r in results if isinstance(r, Exception)]
+        file_path, png = self._registration_qr(reg)
+        base64_png = base64.b64encode(png).decode()
 
         return {
             "status": "success",
-            "event": event.name,
-            "generated_qrs": len(regs),
-            "emails_sent": len(sent),
-            "failed_emails": failed,
-            "message": f"✅ {len(sent)} correos enviados correctamente para el evento '{event.name}'."
+            "qr_image_path": file_path,
+            "qr_image_base64": f"data:image/png;base64,{base64_png}",
         }
 
     # =========================
-    # ENVIAR UN SOLO QR POR CORREO (PRUEBA)
+    # PLANTILLA DEL CORREO CON QR
     # =========================
-    async def send_single_qr(self, db: Session, reg_id: int):
-        from app.models.participant import Participant
-        from app.models.event import Event
-
-        reg = self.repo.get_by_id(db, reg_id)
-        if not reg:
-            raise HTTPException(status_code=404, detail="Registration not found")
-
-        participant = db.query(Participant).filter_by(document_id=reg.participant_document_id).first()
-        event = db.query(Event).filter_by(id=reg.event_id).first()
-
-        if not participant or not participant.email:
-            raise HTTPException(status_code=404, detail="Participant not found or email missing")
-
-        secret_key = b"ucc-seminario-secret-key"
-        payload = {
-            "registration_id": reg.id,
-            "event_id": reg.event_id,
-            "participant_document_id": participant.document_id,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-        payload["signature"] = hmac.new(
-            secret_key, json.dumps(payload, sort_keys=True).encode(), hashlib.sha256
-        ).hexdigest()
-
-        # Generar imagen QR
-        qr_img = qrcode.make(json.dumps(payload))
-        event_dir = os.path.join("app", "static", "qrs", event.name.replace(" ", "_"))
-        os.makedirs(event_dir, exist_ok=True)
-        qr_path = os.path.join(event_dir, f"{participant.document_id}.png")
-        qr_img.save(qr_path)
-
-        # Base64 inline
-        buf = io.BytesIO()
-        qr_img.save(buf, format="PNG")
-        qr_base64 = base64.b64encode(buf.getvalue()).decode()
-        buf.close()
-        qr_inline = f"data:image/png;base64,{qr_base64}"
+    def _qr_email_message(self, reg, participant, event, png: bytes):
+        """Arma el correo con el QR embebido (base64) y adjunto como PNG."""
+        qr_inline = f"data:image/png;base64,{base64.b64encode(png).decode()}"
 
+        # Enlace de verificación (ajusta a tu dominio/ruta)
         verify_url = f"https://iemchambu2.edu.co/verify-qr/{reg.id}"
 
+        # Plantilla HTML profesional
         html_body = f"""
         <div style="font-family: Arial, sans-serif; color: #222; line-height: 1.6; padding: 20px; max-width: 600px; margin: auto; border: 1px solid #ddd; border-radius: 10px;">
             <h2 style="color: #004b87;">Plantilla para Entrega de QR de Acceso a Seminario de Ingeniería</h2>
@@ -342,27 +282,53 @@ class EventRegistrationService:
         </div>
         """
 
-        fm = FastMail(conf)
-        message = MessageSchema(
+        return build_message(
+            to=participant.email,
             subject=f"Tu Acceso al {event.name}",
-            recipients=[participant.email],
-            body=html_body,
-            subtype="html",
-            attachments=[qr_path],
+            html=html_body,
+            attachments=[(f"{participant.document_id}.png", png, "png")],
         )
 
-        await fm.send_message(message)
+    # =========================
+    # ENVIAR UN SOLO QR POR CORREO (PRUEBA)
+    # =========================
+    def _load_for_mail(self, db: Session, reg_id: int):
+        # Una sola consulta: inscripción + participante + evento
+        reg = self.repo.get_with_participant_and_event(db, reg_id)
+        if not reg:
+            raise HTTPException(status_code=404, detail="Registration not found")
 
-        # Marcar como enviado
+        participant = reg.participant
+        event = reg.event
+
+        if not participant or not participant.email:
+            raise HTTPException(status_code=404, detail="Participant not found or email missing")
+        return reg, participant, event
+
+    def _mark_qr_sent(self, db: Session, reg: EventRegistration):
         reg.qr_code_sent = True
         reg.qr_sent_at = datetime.utcnow()
         db.commit()
 
-        return {
+    async def send_single_qr(self, db: Session, reg_id: int):
+        # La sesión es síncrona: cada acceso a la base va al threadpool para no
+        # bloquear el event loop (y con él los check-in que atiende el worker).
+        reg, participant, event = await run_in_threadpool(self._load_for_mail, db, reg_id)
+
+        # Imagen QR (cacheada por contenido, dibujada en el pool de procesos)
+        _, png = await self._registration_qr_async(reg)
+        await get_mail_pool().send(self._qr_email_message(reg, participant, event, png))
+
+        # La respuesta se arma antes del commit, que expira los objetos de la sesión
+        result = {
             "status": "success",
             "message": f"Correo enviado correctamente a {participant.email}",
             "participant": f"{participant.first_name} {participant.last_name}",
             "event": event.name,
             "email": participant.email,
-            "qr_image": f"data:image/png;base64,{qr_base64}"
+            "qr_image": f"data:image/png;base64,{base64.b64encode(png).decode()}"
         }
+
+        # Marcar como enviado
+        await run_in_threadpool(self._mark_qr_sent, db, reg)
+        return result
@@ -1,15 +1,22 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import HTTPException
+from app.core.dependencies import staff_cache
+from app.core.pagination import page_columns
 from app.models.staff import Staff
-from app.schemas.staff_schema import StaffCreate
+from app.schemas.staff_schema import StaffCreate, StaffOut, StaffUpdate
 from app.repositories.staff_repository import StaffRepository
-from app.core.security import hash_password
+from app.core.security import hash_password_async
+
+# Columnas que lee el listado paginado (los campos de StaffOut; nunca el hash de la contraseña)
+PAGE_COLUMNS = page_columns(Staff, StaffOut)
 
 class StaffService:
     def __init__(self):
         self.repo = StaffRepository()
 
-    def create_staff(self, db: Session, data: StaffCreate):
-        hashed_pw = hash_password(data.password)
+    async def create_staff_async(self, db: AsyncSession, data: StaffCreate):
+        # bcrypt corre en su pool propio; la ruta espera sin ocupar un hilo del threadpool
+        hashed_pw = await hash_password_async(data.password)
         staff = Staff(
             username=data.username,
             full_name=data.full_name,
@@ -17,7 +24,26 @@ class StaffService:
             role=data.role,
             password=hashed_pw,
         )
-        return self.repo.create(db, staff)
+        return await self.repo.create_async(db, staff)
+
+    async def update_staff_async(self, db: AsyncSession, staff_id: int, data: StaffUpdate):
+        staff = await self.repo.get_by_id_async(db, staff_id)
+        if not staff:
+            raise HTTPException(status_code=404, detail="Staff not found")
+
+        changes = data.dict(exclude_unset=True)
+        if changes.get("password"):
+            changes["password"] = await hash_password_async(changes["password"])
+        else:
+            changes.pop("password", None)
+        staff = await self.repo.update_async(db, staff, changes)
+        # Rol o estado cambiado: la próxima petición de este staff vuelve a leerlo de la base
+        staff_cache.invalidate(staff_id)
+        return staff
+
+    async def list_staff_async(self, db: AsyncSession, limit: int, after: str | None = None, sort: str = "id", order: str = "asc", **filters):
+        rows, next_cursor = await self.repo.get_page_async(
+            db, PAGE_COLUMNS, limit, after, sort, order == "desc", **filters
+        )
+        return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
 
-    def list_staff(self, db: Session):
-        return self.repo.get_all(db)
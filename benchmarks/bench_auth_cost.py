@@ -0,0 +1,64 @@
+"""
+Costo de autenticar una petición, sin y con las cachés de JWT y de staff.
+
+Mide verify_token (decodificar y verificar la firma frente al acierto en
+token_cache) y get_current_user completo (JWT + staff leído de la base
+frente a ambas cachés calientes).
+
+    python -m benchmarks.bench_auth_cost [--iterations 20000]
+"""
+import argparse
+import timeit
+
+from benchmarks.common import create_schema, use_temp_database
+
+use_temp_database()
+
+from app.core.dependencies import get_current_user, staff_cache  # noqa: E402
+from app.core.jwt import create_access_token, token_cache, verify_token  # noqa: E402
+from tests.factories import add_staff  # noqa: E402
+
+
+def per_call_us(fn, iterations: int) -> float:
+    return min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def report(label, cold, warm):
+    print(f"{label:<18} sin caché {cold:8.1f} µs   con caché {warm:8.1f} µs   ×{cold / warm:6.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    db = create_schema()
+    staff_id = add_staff(db, "bench").id
+    db.close()
+    token = create_access_token({"sub": str(staff_id)})
+
+    def verify_cold():
+        token_cache.clear()
+        verify_token(token)
+
+    def request_cold():
+        token_cache.clear()
+        staff_cache.clear()
+        get_current_user(token=token, device_key=None)
+
+    # get_current_user en frío abre sesión con la base: menos iteraciones
+    cold_iterations = max(args.iterations // 20, 1)
+    report(
+        "verify_token",
+        per_call_us(verify_cold, args.iterations),
+        per_call_us(lambda: verify_token(token), args.iterations),
+    )
+    report(
+        "get_current_user",
+        per_call_us(request_cold, cold_iterations),
+        per_call_us(lambda: get_current_user(token=token, device_key=None), args.iterations),
+    )
+
+
+if __name__ == "__main__":
+    main()
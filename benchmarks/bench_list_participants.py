@@ -0,0 +1,99 @@
+"""
+Filas por segundo de GET /participants recorriendo todas las páginas.
+
+Compara el listado actual (proyección de columnas + orjson) con el camino
+anterior: objetos ORM validados con el response_model y serializados por
+Pydantic.
+
+    python -m benchmarks.bench_list_participants [--rows 20000] [--limit 500]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import app_client, create_schema, use_temp_database
+
+use_temp_database()
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.models.participant import DocumentType, Participant  # noqa: E402
+from app.schemas.participant_schema import ParticipantPage  # noqa: E402
+
+
+def seed(db, rows: int):
+    db.execute(
+        insert(Participant),
+        [
+            {
+                "document_id": f"{n:08d}",
+                "document_type": DocumentType.CC,
+                "first_name": "Ana",
+                "last_name": f"Pérez {n}",
+                "email": f"p{n}@example.com",
+                "phone_number": "3000000000",
+                "career": "Sistemas",
+                "idnumber": f"{n:08d}",
+            }
+            for n in range(rows)
+        ],
+    )
+    db.commit()
+
+
+async def endpoint_rows(limit: int) -> int:
+    total, after = 0, None
+    async with app_client() as client:
+        while True:
+            params = {"limit": limit, **({"after": after} if after else {})}
+            body = (await client.get("/participants/", params=params)).json()
+            total += len(body["items"])
+            after = body["next_cursor"]
+            if not after:
+                return total
+
+
+def orm_response_model_rows(db, limit: int) -> int:
+    """Como antes: entidades ORM por página y validación + serialización con el response_model."""
+    total, last = 0, ""
+    while True:
+        page = (
+            db.query(Participant)
+            .filter(Participant.document_id > last)
+            .order_by(Participant.document_id)
+            .limit(limit)
+            .all()
+        )
+        if not page:
+            return total
+        ParticipantPage.model_validate({"items": page, "next_cursor": None}, from_attributes=True).model_dump_json()
+        total += len(page)
+        last = page[-1].document_id
+        db.expunge_all()
+
+
+def report(label, rows, elapsed):
+    print(f"{label:<40} {rows / elapsed:10.0f} filas/s  ({rows} filas en {elapsed:.2f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=500)
+    args = parser.parse_args()
+
+    db = create_schema()
+    seed(db, args.rows)
+
+    start = time.perf_counter()
+    rows = orm_response_model_rows(db, args.limit)
+    report("ORM + response_model (anterior)", rows, time.perf_counter() - start)
+    db.close()
+
+    start = time.perf_counter()
+    rows = asyncio.run(endpoint_rows(args.limit))
+    report("GET /participants (proyección + orjson)", rows, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
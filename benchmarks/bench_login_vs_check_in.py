@@ -0,0 +1,77 @@
+"""
+Latencia de check-in con y sin una ráfaga de logins concurrentes.
+
+bcrypt corre en su pool acotado (BCRYPT_WORKERS + BCRYPT_QUEUE_SIZE): una
+ráfaga de logins debe dar 503 a los que no caben, no subir la latencia del
+check-in. Se reporta el throughput de logins y la latencia de check-in en
+ambos casos.
+
+    python -m benchmarks.bench_login_vs_check_in [--logins 200] [--scans 200]
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import app_client, create_schema, latency_ms, timer, use_temp_database
+
+use_temp_database(BCRYPT_ROUNDS=12)
+
+from tests.factories import add_staff, qr_payload, seed_registration  # noqa: E402
+
+
+async def scan_loop(client, payloads, samples):
+    """Un escáner: escanea sus QR uno tras otro (entrada y salida)."""
+    for payload in payloads:
+        with timer(samples):
+            response = await client.post("/attendance/record", json=payload)
+        assert response.status_code == 200, response.text
+
+
+async def login_burst(client, total, concurrency):
+    codes = {}
+    pending = iter(range(total))
+
+    async def worker():
+        for _ in pending:
+            response = await client.post("/auth/login", json={"username": "bench", "password": "secret"})
+            codes[response.status_code] = codes.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return codes, time.perf_counter() - start
+
+
+async def run(args, payloads):
+    async with app_client() as client:
+        quiet = []
+        await scan_loop(client, payloads, quiet)
+
+        loaded = []
+        scans = asyncio.create_task(scan_loop(client, payloads, loaded))
+        codes, elapsed = await login_burst(client, args.logins, args.concurrency)
+        await scans
+
+    ok = codes.get(200, 0)
+    print(f"check-in sin logins     {latency_ms(quiet)}")
+    print(f"check-in con logins     {latency_ms(loaded)}")
+    print(f"logins: {args.logins} en {elapsed:.2f} s → {ok / elapsed:.1f} ok/s, respuestas {codes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50, help="logins en vuelo a la vez")
+    parser.add_argument("--scans", type=int, default=200)
+    args = parser.parse_args()
+
+    db = create_schema()
+    registration = seed_registration(db)
+    add_staff(db, "bench")
+    # Pares entrada/salida sobre la misma inscripción
+    payloads = [qr_payload(registration)] * args.scans
+    db.close()
+    asyncio.run(run(args, payloads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Correos por segundo: una conexión SMTP por mensaje contra SMTPPool.
+
+Levanta un servidor aiosmtpd local que acepta y descarta los mensajes, así
+se mide el costo de conexión y protocolo sin la red ni el proveedor.
+
+    python -m benchmarks.bench_smtp_pool [--messages 500] [--pool-size 4]
+"""
+import argparse
+import asyncio
+import socket
+import time
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from app.core.mail_pool import SMTPPool, build_message
+
+HOST = "127.0.0.1"
+
+
+class CountingHandler:
+    """Acepta cada mensaje sin guardarlo; cuenta mensajes y conexiones."""
+
+    def __init__(self):
+        self.messages = 0
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def sample_message(n: int):
+    return build_message(
+        to=f"p{n}@example.com",
+        subject="Tu acceso al seminario",
+        html="<p>QR adjunto</p>",
+        attachments=[(f"{n}.png", b"\x89PNG" + bytes(2048), "png")],
+    )
+
+
+async def one_connection_per_message(port, messages, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+
+    async def send(message):
+        async with slots:
+            await aiosmtplib.send(message, hostname=HOST, port=port, start_tls=False)
+
+    await asyncio.gather(*(send(message) for message in messages))
+
+
+async def pooled(port, messages, size):
+    pool = SMTPPool(HOST, port, None, None, start_tls=False, size=size, max_messages=50, rate=0)
+    await asyncio.gather(*(pool.send(message) for message in messages))
+    await pool.close()
+
+
+async def measure(label, handler, sender, count):
+    handler.messages = handler.connections = 0
+    start = time.perf_counter()
+    await sender
+    elapsed = time.perf_counter() - start
+    assert handler.messages == count, handler.messages
+    print(f"{label:<28} {count / elapsed:8.1f} correos/s  {handler.connections:5d} conexiones  {elapsed:6.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+
+    handler = CountingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname=HOST, port=port)
+    controller.start()
+    messages = [sample_message(n) for n in range(args.messages)]
+
+    async def run():
+        await measure(
+            "conexión por mensaje",
+            handler,
+            one_connection_per_message(port, messages, args.pool_size),
+            args.messages,
+        )
+        await measure(f"SMTPPool (size={args.pool_size})", handler, pooled(port, messages, args.pool_size), args.messages)
+
+    try:
+        asyncio.run(run())
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
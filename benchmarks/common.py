@@ -0,0 +1,73 @@
+"""
+Base SQLite temporal y utilidades de medición para los benchmarks.
+use_temp_database() va antes de importar la app: la configuración se lee al importarla.
+"""
+import os
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+
+def use_temp_database(**settings):
+    """Motores sync y async sobre un mismo archivo SQLite temporal, sin tareas de fondo."""
+    tmp_dir = tempfile.mkdtemp(prefix="events-bench-")
+    path = os.path.join(tmp_dir, "bench.db")
+    os.environ.update(
+        DATABASE_URL_OVERRIDE=f"sqlite:///{path}",
+        ASYNC_DATABASE_URL_OVERRIDE=f"sqlite+aiosqlite:///{path}",
+        OUTBOX_DISPATCHER_ENABLED="false",
+        REGISTRATION_INDEX_ENABLED="false",
+        QR_CACHE_DIR=os.path.join(tmp_dir, "qrs"),
+        ATTENDANCE_JOURNAL_DIR=os.path.join(tmp_dir, "journal"),
+        **{key: str(value) for key, value in settings.items()},
+    )
+    return tmp_dir
+
+
+def create_schema():
+    from app.core import database
+    from app.core.database import Base
+    from app.models import (  # noqa: F401 (registran las tablas en Base.metadata)
+        attendance,
+        attendance_scan,
+        device_key,
+        email_outbox,
+        event,
+        event_registration,
+        participant,
+        refresh_token,
+        staff,
+    )
+
+    Base.metadata.create_all(database.engine)
+    return database.SessionLocal()
+
+
+@asynccontextmanager
+async def app_client():
+    """Cliente HTTP en proceso sobre la app ASGI (sin red); al salir cierra el pool async."""
+    import httpx
+
+    from app.core import database
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        yield client
+    await database.async_engine.dispose()
+
+
+@contextmanager
+def timer(samples: list):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - start)
+
+
+def latency_ms(samples) -> str:
+    """p50 / p95 / máx en milisegundos."""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"p50 {statistics.median(ordered) * 1000:7.1f} ms  p95 {p95 * 1000:7.1f} ms  máx {ordered[-1] * 1000:7.1f} ms"
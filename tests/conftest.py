@@ -0,0 +1,92 @@
+import os
+import tempfile
+
+# La configuración se lee al importar app.core.config: las variables van antes de importar la app.
+# Los motores sync y async apuntan al mismo archivo SQLite.
+_tmp_dir = tempfile.mkdtemp(prefix="events-tests-")
+TEST_DB = os.path.join(_tmp_dir, "test.db")
+os.environ.update(
+    DATABASE_URL_OVERRIDE=f"sqlite:///{TEST_DB}",
+    ASYNC_DATABASE_URL_OVERRIDE=f"sqlite+aiosqlite:///{TEST_DB}",
+    OUTBOX_DISPATCHER_ENABLED="false",
+    REGISTRATION_INDEX_ENABLED="false",
+    BCRYPT_ROUNDS="4",
+    QR_CACHE_DIR=os.path.join(_tmp_dir, "qrs"),
+    ATTENDANCE_JOURNAL_DIR=os.path.join(_tmp_dir, "journal"),
+)
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import database
+from app.core.database import Base, SessionLocal
+from app.core.dependencies import device_cache, staff_cache
+from app.core.jwt import token_cache
+from app.models import (  # noqa: F401 (registran las tablas en Base.metadata)
+    attendance,
+    attendance_scan,
+    device_key,
+    email_outbox,
+    event,
+    event_registration,
+    participant,
+    refresh_token,
+    staff,
+)
+from app.services import outbox_service, registration_service
+from app.services.registration_index import registration_index
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    """Base vacía por prueba y una sesión sync para preparar los datos."""
+    Base.metadata.create_all(database.engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(database.engine)
+        for cache in (staff_cache, device_cache, token_cache):
+            cache.clear()
+        registration_index.__init__()
+
+
+@pytest.fixture
+async def async_db(db):
+    """Sesión async sobre aiosqlite; el pool se cierra al terminar porque queda atado al loop de la prueba."""
+    async with database.AsyncSessionLocal() as session:
+        yield session
+    await database.async_engine.dispose()
+
+
+@pytest.fixture
+def client(db):
+    """Cliente HTTP con el lifespan de la app (al salir cierra el pool async)."""
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+class RecordingMailPool:
+    """Reemplaza el pool SMTP: guarda los mensajes en lugar de enviarlos."""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+@pytest.fixture
+def mail_pool(monkeypatch):
+    pool = RecordingMailPool()
+    for module in (outbox_service, registration_service):
+        monkeypatch.setattr(module, "get_mail_pool", lambda: pool)
+    return pool
@@ -0,0 +1,92 @@
+"""Datos mínimos para las pruebas: staff, evento activo, participante e inscripción."""
+from app.core.qr_utils import registration_qr_payload
+from app.core.security import pwd_context
+from app.models.event import Event, EventStatus
+from app.models.event_registration import EventRegistration
+from app.models.participant import DocumentType, Participant
+from app.models.staff import Staff
+
+
+def add_staff(db, username="staff", password="secret", role=None, is_active=True):
+    staff = Staff(
+        username=username,
+        password=pwd_context.hash(password),
+        full_name=username.title(),
+        email=f"{username}@example.com",
+        role=role,
+        is_active=is_active,
+    )
+    db.add(staff)
+    db.commit()
+    return staff
+
+
+def add_participant(db, document_id="1001", **fields):
+    participant = Participant(
+        document_id=document_id,
+        document_type=DocumentType.CC,
+        first_name=fields.pop("first_name", "Ana"),
+        last_name=fields.pop("last_name", f"Pérez {document_id}"),
+        email=fields.pop("email", f"p{document_id}@example.com"),
+        phone_number="3000000000",
+        career=fields.pop("career", "Sistemas"),
+        idnumber=document_id,
+        **fields,
+    )
+    db.add(participant)
+    db.commit()
+    return participant
+
+
+def add_event(db, staff_id, name="Seminario", status=EventStatus.ACTIVE):
+    event = Event(name=name, status=status, total_sessions=1, created_by_staff_id=staff_id)
+    db.add(event)
+    db.commit()
+    return event
+
+
+def add_registration(db, event_id, participant_document_id, staff_id, is_paid=True):
+    registration = EventRegistration(
+        event_id=event_id,
+        participant_document_id=participant_document_id,
+        registered_by_staff_id=staff_id,
+        is_paid=is_paid,
+    )
+    db.add(registration)
+    db.commit()
+    return registration
+
+
+def seed_registration(db, document_id="1001"):
+    """Staff, evento activo, participante e inscripción; retorna la inscripción."""
+    staff = add_staff(db)
+    event = add_event(db, staff.id)
+    add_participant(db, document_id)
+    return add_registration(db, event.id, document_id, staff.id)
+
+
+def seed_paid_event(db, count, staff_id=None):
+    """Evento activo con `count` inscripciones pagadas de participantes con correo; retorna el evento."""
+    staff_id = staff_id or add_staff(db).id
+    event = add_event(db, staff_id, name=f"Evento de {count}")
+    for n in range(count):
+        document_id = f"{event.id}-{n}"
+        add_participant(db, document_id)
+        add_registration(db, event.id, document_id, staff_id)
+    return event
+
+
+def qr_payload(registration, version=None):
+    """Contenido firmado del QR de la inscripción, como lo lee el escáner."""
+    return registration_qr_payload(
+        registration.id,
+        registration.event_id,
+        registration.participant_document_id,
+        version or registration.qr_version or 1,
+    )
+
+
+def auth_headers(client, username="staff", password="secret"):
+    """Inicia sesión y retorna el encabezado Authorization con el access token."""
+    response = client.post("/auth/login", json={"username": username, "password": password})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
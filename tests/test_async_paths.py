@@ -0,0 +1,58 @@
+"""Rutas calientes sobre el motor async (aiosqlite): listados paginados y check-in."""
+from tests.factories import add_participant, qr_payload, seed_registration
+
+
+def test_list_participants_pages_with_cursor(client, db):
+    for document_id in ("1003", "1001", "1002"):
+        add_participant(db, document_id)
+
+    first = client.get("/participants/", params={"limit": 2})
+    assert first.status_code == 200
+    body = first.json()
+    assert [p["document_id"] for p in body["items"]] == ["1001", "1002"]
+    assert body["items"][0]["document_type"] == "CC"
+    assert body["next_cursor"]
+
+    second = client.get("/participants/", params={"limit": 2, "after": body["next_cursor"]}).json()
+    assert [p["document_id"] for p in second["items"]] == ["1003"]
+    assert second["next_cursor"] is None
+
+
+def test_list_participants_filters_on_the_server(client, db):
+    add_participant(db, "1001", career="Sistemas")
+    add_participant(db, "1002", career="Civil")
+
+    body = client.get("/participants/", params={"career": "Civil"}).json()
+    assert [p["document_id"] for p in body["items"]] == ["1002"]
+
+
+def test_list_registrations_and_staff(client, db):
+    registration = seed_registration(db)
+
+    registrations = client.get("/registrations/", params={"event_id": registration.event_id}).json()
+    assert [r["id"] for r in registrations["items"]] == [registration.id]
+
+    staff = client.get("/staff/").json()
+    assert [s["username"] for s in staff["items"]] == ["staff"]
+    assert "password" not in staff["items"][0]
+
+
+def test_record_checks_in_then_out(client, db):
+    registration = seed_registration(db)
+    payload = qr_payload(registration)
+
+    check_in = client.post("/attendance/record", json=payload)
+    assert check_in.status_code == 200
+    assert check_in.json()["data"]["status"] == "CHECKED_IN"
+
+    check_out = client.post("/attendance/record", json=payload)
+    assert check_out.status_code == 200
+    assert check_out.json()["data"]["status"] == "CHECKED_OUT"
+
+
+def test_record_rejects_tampered_qr(client, db):
+    registration = seed_registration(db)
+    payload = {**qr_payload(registration), "participant_document_id": "9999"}
+
+    response = client.post("/attendance/record", json=payload)
+    assert response.status_code == 400
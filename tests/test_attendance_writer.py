@@ -0,0 +1,82 @@
+"""Escritura diferida de asistencias: estado en memoria acotado y registros que la base rechaza."""
+import json
+from datetime import datetime
+
+import pytest
+
+from app.models.attendance import Attendance, AttendanceStatus
+from app.repositories.attendance_repository import AttendanceRepository
+from app.services.attendance_writer import DEAD_LETTER_FILE, AttendanceWriter
+from tests.factories import add_participant, add_registration, seed_registration
+
+
+@pytest.fixture
+def writer(tmp_path, db):
+    writer = AttendanceWriter(journal_dir=str(tmp_path))
+    writer.start()
+    yield writer
+    writer.stop()
+
+
+def scan(writer, registration):
+    return writer.record(registration.id, registration.participant_document_id, registration.event_id)
+
+
+def test_flush_drops_the_state_of_flushed_registrations(writer, db):
+    registration = seed_registration(db)
+
+    assert scan(writer, registration)["data"]["status"] == "CHECKED_IN"
+    writer.flush()
+    assert registration.id not in writer._state
+
+    # Sin estado en memoria se decide con la base: la segunda lectura es la salida
+    assert scan(writer, registration)["data"]["status"] == "CHECKED_OUT"
+    writer.flush()
+    assert writer._state == {}
+
+    db.expire_all()
+    attendance = db.query(Attendance).one()
+    assert attendance.status == AttendanceStatus.CHECKED_OUT
+
+
+def test_flush_keeps_the_state_of_scans_recorded_meanwhile(writer, db, monkeypatch):
+    registration = seed_registration(db)
+    scan(writer, registration)
+    apply = writer._apply
+
+    def apply_while_scanning(session, records):
+        apply(session, records)
+        # Salida registrada mientras se volcaba la entrada: aún no está en la base
+        scan(writer, registration)
+
+    monkeypatch.setattr(writer, "_apply", apply_while_scanning)
+    writer.flush()
+
+    assert writer._state[registration.id] == AttendanceStatus.CHECKED_OUT
+
+
+def test_conflicting_record_is_dead_lettered_without_blocking_the_batch(writer, db, tmp_path):
+    registration = seed_registration(db, "1001")
+    add_participant(db, "1002")
+    other = add_registration(db, registration.event_id, "1002", registration.registered_by_staff_id)
+    scan(writer, registration)
+    # Entrada abierta por otra vía (modo sync o lote offline) antes del volcado: choca con el índice único
+    AttendanceRepository().bulk_check_in(db, [{
+        "registration_id": registration.id,
+        "participant_document_id": registration.participant_document_id,
+        "event_id": registration.event_id,
+        "check_in_time": datetime(2026, 1, 10, 8, 0),
+    }])
+    db.commit()
+    scan(writer, other)
+
+    assert writer.flush() == 1
+
+    assert writer._pending == []
+    assert [segment.name for segment in writer._segments()] == [writer._segment.name]
+    dead = [json.loads(line) for line in (tmp_path / DEAD_LETTER_FILE).read_text().splitlines()]
+    assert [r["registration_id"] for r in dead] == [registration.id]
+    assert db.query(Attendance).filter(Attendance.registration_id == other.id).count() == 1
+    # El siguiente volcado ya no arrastra el registro rechazado
+    scan(writer, other)
+    assert writer.flush() == 1
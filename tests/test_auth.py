@@ -0,0 +1,96 @@
+"""Login (estado del staff, rehash con el pool de bcrypt) y rotación de refresh tokens."""
+import pytest
+from fastapi import HTTPException, status
+
+from app.core.database import SessionLocal
+from app.core.security import pwd_context, token_digest
+from app.models.refresh_token import RefreshToken
+from app.models.staff import Staff
+from app.repositories.refresh_token_repository import RefreshTokenRepository
+from app.services import auth_service
+from app.services.auth_service import AuthService
+from tests.factories import add_staff
+
+
+def login(client, username="staff", password="secret"):
+    return client.post("/auth/login", json={"username": username, "password": password})
+
+
+def old_cost_hash(password="secret"):
+    """Hash con un costo distinto de BCRYPT_ROUNDS (pide rehash al iniciar sesión)."""
+    return pwd_context.handler("bcrypt").using(rounds=5).hash(password)
+
+
+def test_inactive_staff_cannot_log_in(client, db):
+    add_staff(db, is_active=False)
+
+    response = login(client)
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Inactive user"
+    # Con la contraseña equivocada sigue siendo 401: el estado no se revela sin credenciales
+    assert login(client, password="wrong").status_code == 401
+
+
+def test_login_rehashes_an_outdated_hash(client, db):
+    staff = add_staff(db)
+    staff.password = old_cost_hash()
+    db.commit()
+
+    assert login(client).status_code == 200
+
+    db.expire_all()
+    assert db.get(Staff, staff.id).password.split("$")[2] == "04"
+
+
+def test_login_skips_the_rehash_when_bcrypt_is_saturated(client, db, monkeypatch):
+    staff = add_staff(db)
+    outdated = staff.password = old_cost_hash()
+    db.commit()
+
+    async def saturated(password):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="busy")
+
+    monkeypatch.setattr(auth_service, "hash_password_async", saturated)
+
+    response = login(client)
+
+    assert response.status_code == 200
+    assert response.json()["access_token"]
+    db.expire_all()
+    assert db.get(Staff, staff.id).password == outdated
+
+
+def test_refresh_rotates_the_token_once(client, db):
+    add_staff(db)
+    first = login(client).json()["refresh_token"]
+
+    rotated = client.post("/auth/refresh", json={"refresh_token": first})
+    assert rotated.status_code == 200
+
+    # Reusar el token ya rotado revoca también el par nuevo
+    assert client.post("/auth/refresh", json={"refresh_token": first}).status_code == 401
+    assert client.post("/auth/refresh", json={"refresh_token": rotated.json()["refresh_token"]}).status_code == 401
+
+
+def test_concurrent_refresh_with_the_same_token_issues_one_pair(client, db):
+    add_staff(db)
+    token = login(client).json()["refresh_token"]
+
+    # La otra petición ya leyó el token sin revocar (y lo retiene) cuando esta lo rota
+    slow = SessionLocal()
+    try:
+        stale = RefreshTokenRepository().get_by_hash(slow, token_digest(token))
+        assert stale.revoked_at is None
+        winner = client.post("/auth/refresh", json={"refresh_token": token})
+        assert winner.status_code == 200
+
+        with pytest.raises(HTTPException) as lost:
+            AuthService().refresh(slow, token)
+    finally:
+        slow.close()
+
+    assert lost.value.status_code == 401
+    db.expire_all()
+    assert db.query(RefreshToken).count() == 2
+    assert db.query(RefreshToken).filter(RefreshToken.revoked_at.is_(None)).count() == 0
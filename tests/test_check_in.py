@@ -0,0 +1,214 @@
+"""Check-in/check-out: revocación de QR decidida por la base y escaneos simultáneos."""
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app.core import database
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.event_registration import EventRegistration
+from app.repositories.attendance_repository import AttendanceRepository
+from app.services.attendance_service import AttendanceService
+from app.services.registration_index import registration_index
+from tests.factories import qr_payload, seed_registration
+
+SCANNERS = 8
+
+
+def revoke_elsewhere(db, registration):
+    """Revocación hecha por otro worker: sube qr_version en la base sin tocar el índice de este proceso."""
+    db.execute(
+        update(EventRegistration)
+        .where(EventRegistration.id == registration.id)
+        .values(qr_version=EventRegistration.qr_version + 1)
+    )
+    db.commit()
+
+
+def open_entries(db):
+    return db.query(Attendance).filter(Attendance.open_registration_id.isnot(None)).count()
+
+
+def test_revoked_qr_is_rejected_even_with_a_stale_index(client, db):
+    registration = seed_registration(db)
+    registration_index.load(db)
+    old_qr = qr_payload(registration, version=1)
+    revoke_elsewhere(db, registration)
+    assert registration_index.get(registration.id).qr_version == 1
+
+    response = client.post("/attendance/record", json=old_qr)
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "QR revocado"
+    assert db.query(Attendance).count() == 0
+    # El rechazo deja el índice con la versión vigente y el QR nuevo entra
+    assert registration_index.get(registration.id).qr_version == 2
+    assert client.post("/attendance/record", json=qr_payload(registration, version=2)).status_code == 200
+
+
+def test_revoked_qr_cannot_check_out(client, db):
+    registration = seed_registration(db)
+    registration_index.load(db)
+    old_qr = qr_payload(registration, version=1)
+    assert client.post("/attendance/record", json=old_qr).status_code == 200
+    revoke_elsewhere(db, registration)
+
+    response = client.post("/attendance/record", json=old_qr)
+
+    assert response.status_code == 400
+    assert open_entries(db) == 1
+
+
+def test_batch_rejects_qr_revoked_by_another_worker(client, db):
+    registration = seed_registration(db)
+    registration_index.load(db)
+    old_qr = qr_payload(registration, version=1)
+    revoke_elsewhere(db, registration)
+
+    response = client.post(
+        "/attendance/record-batch",
+        json={"items": [{"qr": old_qr, "scanned_at": "2026-01-10T08:00:00", "idempotency_key": "scan-1"}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["detail"] == "QR revocado"
+    assert db.query(Attendance).count() == 0
+
+
+def test_check_out_returns_the_closed_row_id(client, db):
+    payload = qr_payload(seed_registration(db))
+
+    check_in = client.post("/attendance/record", json=payload).json()["data"]
+    check_out = client.post("/attendance/record", json=payload).json()["data"]
+
+    assert check_out["status"] == "CHECKED_OUT"
+    assert check_out["id"] == check_in["id"]
+
+
+# =========================
+# ESCANEOS SIMULTÁNEOS (N escáneres, una inscripción, aiosqlite)
+# =========================
+async def scan_concurrently(payload, scanners=SCANNERS):
+    """Cada escáner con su propia sesión; retorna el estado o el código HTTP de cada uno."""
+    service = AttendanceService()
+
+    async def scan():
+        async with database.AsyncSessionLocal() as session:
+            try:
+                return (await service.check_in_or_out_async(session, payload))["data"]["status"]
+            except HTTPException as e:
+                return e.status_code
+
+    return await asyncio.gather(*(scan() for _ in range(scanners)))
+
+
+def in_lockstep(monkeypatch, method_name, scanners=SCANNERS):
+    """Todos los escáneres llegan a la escritura antes de que cualquiera la ejecute."""
+    barrier = asyncio.Barrier(scanners)
+    original = getattr(AttendanceRepository, method_name)
+
+    async def gated(self, *args, **kwargs):
+        await barrier.wait()
+        return await original(self, *args, **kwargs)
+
+    monkeypatch.setattr(AttendanceRepository, method_name, gated)
+
+
+@pytest.mark.anyio
+async def test_simultaneous_first_scans_open_one_entry(async_db, db, monkeypatch):
+    payload = qr_payload(seed_registration(db))
+    in_lockstep(monkeypatch, "insert_check_in_async")
+
+    outcomes = await scan_concurrently(payload)
+
+    assert sorted(outcomes, key=str) == [409] * (SCANNERS - 1) + ["CHECKED_IN"]
+    assert db.query(Attendance).count() == 1
+    assert open_entries(db) == 1
+
+
+@pytest.mark.anyio
+async def test_simultaneous_check_outs_close_the_entry_once(async_db, db, monkeypatch):
+    payload = qr_payload(seed_registration(db))
+    async with database.AsyncSessionLocal() as session:
+        await AttendanceService().check_in_or_out_async(session, payload)
+    in_lockstep(monkeypatch, "close_open_check_in_async")
+
+    outcomes = await scan_concurrently(payload)
+
+    assert sorted(outcomes, key=str) == [409] * (SCANNERS - 1) + ["CHECKED_OUT"]
+    assert db.query(Attendance).count() == 1
+    assert open_entries(db) == 0
+
+
+@pytest.mark.anyio
+async def test_concurrent_scans_never_leave_two_open_entries(async_db, db):
+    payload = qr_payload(seed_registration(db))
+    checked_in = checked_out = 0
+
+    for _ in range(3):
+        outcomes = await scan_concurrently(payload)
+        checked_in += outcomes.count("CHECKED_IN")
+        checked_out += outcomes.count("CHECKED_OUT")
+
+        assert set(outcomes) <= {"CHECKED_IN", "CHECKED_OUT", 409}
+        assert open_entries(db) <= 1
+        # Cada respuesta exitosa corresponde a exactamente una fila escrita
+        assert db.query(Attendance).count() == checked_in
+        assert db.query(Attendance).filter(Attendance.status == AttendanceStatus.CHECKED_OUT).count() == checked_out
+
+
+# =========================
+# LOTE SIN CONEXIÓN CONTRA UN CHECK-IN EN LÍNEA
+# =========================
+def online_check_in_after_the_read(monkeypatch, registration, times=1):
+    """Un check-in en línea abre la inscripción justo después de que el lote leyó su estado."""
+    original = AttendanceRepository.get_latest_for_registrations
+    calls = []
+
+    def racing(self, db, registration_ids):
+        calls.append(1)
+        if len(calls) > times:
+            return original(self, db, registration_ids)
+        # Lectura previa al check-in en línea: todavía no hay asistencia
+        if not open_entries(db):
+            with database.SessionLocal() as other:
+                AttendanceRepository().bulk_check_in(other, [{
+                    "registration_id": registration.id,
+                    "participant_document_id": registration.participant_document_id,
+                    "event_id": registration.event_id,
+                    "check_in_time": datetime(2026, 1, 10, 7, 0),
+                }])
+                other.commit()
+        return []
+
+    monkeypatch.setattr(AttendanceRepository, "get_latest_for_registrations", racing)
+
+
+def batch_of_one(registration, key="scan-1"):
+    return {"items": [{"qr": qr_payload(registration), "scanned_at": "2026-01-10T08:00:00", "idempotency_key": key}]}
+
+
+def test_batch_replays_over_a_concurrent_online_check_in(client, db, monkeypatch):
+    registration = seed_registration(db)
+    online_check_in_after_the_read(monkeypatch, registration)
+
+    response = client.post("/attendance/record-batch", json=batch_of_one(registration))
+
+    assert response.status_code == 200
+    # Re-aplicado sobre la entrada en línea: el escaneo del lote es la salida
+    assert response.json()["results"][0]["result"] == "checked_out"
+    assert db.query(Attendance).count() == 1
+    assert open_entries(db) == 0
+
+
+def test_batch_names_the_registration_when_the_conflict_persists(client, db, monkeypatch):
+    registration = seed_registration(db)
+    online_check_in_after_the_read(monkeypatch, registration, times=2)
+
+    response = client.post("/attendance/record-batch", json=batch_of_one(registration))
+
+    assert response.status_code == 409
+    assert str(registration.id) in response.json()["detail"]
+    assert db.query(Attendance).count() == 1
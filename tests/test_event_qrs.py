@@ -0,0 +1,17 @@
+"""Descarga del ZIP de QR de un evento."""
+from urllib.parse import unquote
+
+from tests.factories import add_event, add_staff
+
+
+def test_zip_download_header_survives_any_event_name(client, db):
+    name = 'Día "Sí"; 🎉 Seminario'
+    event = add_event(db, add_staff(db).id, name=name)
+
+    response = client.get(f"/events/{event.id}/qrs.zip")
+
+    assert response.status_code == 200
+    disposition = response.headers["content-disposition"]
+    fallback, original = disposition.split("; filename*=UTF-8''")
+    assert fallback == 'attachment; filename="qrs_D_a__S______Seminario.zip"'
+    assert unquote(original) == f"qrs_{name.replace(' ', '_')}.zip"
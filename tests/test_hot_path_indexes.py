@@ -0,0 +1,55 @@
+"""
+EXPLAIN antes y después de los índices de la migración d71b3e5a9c20:
+sin ellos las consultas calientes recorren la tabla (u otro índice); con ellos los usan.
+"""
+from pathlib import Path
+
+import pytest
+from sqlalchemy import text
+
+from app.core.database import Base
+
+MIGRATION = Path(__file__).parents[1] / "alembic" / "versions" / "d71b3e5a9c20_hot_path_indexes.py"
+
+# Índice de la migración → consulta caliente que debe usarlo
+HOT_PATHS = {
+    "ix_attendance_registration_id_id": (
+        "SELECT id, status FROM attendance WHERE registration_id = :v ORDER BY id DESC LIMIT 1"
+    ),
+    "ix_attendance_event_id_status": "SELECT count(*) FROM attendance WHERE event_id = :v AND status = 'CHECKED_IN'",
+    "ix_event_registrations_event_id_is_paid": "SELECT id FROM event_registrations WHERE event_id = :v AND is_paid = 1",
+    "ix_participants_email": "SELECT document_id FROM participants WHERE email = :v",
+}
+
+
+def model_index(name):
+    return next(index for table in Base.metadata.tables.values() for index in table.indexes if index.name == name)
+
+
+def query_plan(db, sql, label):
+    # La etiqueta cambia el texto: sqlite3 no reutiliza el plan de la sentencia ya preparada
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql} -- {label}"), {"v": 1}).all()
+    return " | ".join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize("index_name", HOT_PATHS)
+def test_hot_path_uses_its_index(db, index_name):
+    index = model_index(index_name)
+    sql = HOT_PATHS[index_name]
+
+    # Todo por la misma conexión: otra del pool podría tener el esquema anterior en memoria
+    index.drop(db.connection())
+    before = query_plan(db, sql, "antes")
+    index.create(db.connection())
+    after = query_plan(db, sql, "después")
+
+    assert index_name not in before
+    assert index_name in after, after
+
+
+def test_migration_creates_the_model_indexes():
+    """Los modelos (con los que se crean las tablas de las pruebas) y la migración usan los mismos índices."""
+    source = MIGRATION.read_text(encoding="utf-8")
+    for index_name in HOT_PATHS:
+        assert f"op.create_index('{index_name}'" in source
+        assert model_index(index_name) is not None
@@ -0,0 +1,85 @@
+"""Importaciones en segundo plano: conteo de filas inválidas y retención de trabajos."""
+import io
+import time
+
+from app.core.config import settings
+from app.models.participant import Participant
+from app.services.import_job_service import ImportJob, ImportJobService
+from app.services.participant_service import PARTICIPANT_COLUMNS, ParticipantService
+from tests.factories import add_participant
+
+
+def participants_csv(*document_ids, document_types=None):
+    lines = [",".join(PARTICIPANT_COLUMNS)]
+    for document_id in document_ids:
+        values = {column: "" for column in PARTICIPANT_COLUMNS}
+        document_type = (document_types or {}).get(document_id, "CC")
+        values.update(document_id=document_id, document_type=document_type, first_name="Ana", last_name="Pérez")
+        lines.append(",".join(values[column] for column in PARTICIPANT_COLUMNS))
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def test_row_without_document_id_counts_only_as_failure(db):
+    add_participant(db, "1001")
+    job = ImportJob("participants", "p.csv")
+
+    result = ParticipantService().import_file(db, participants_csv("1001", "", "1002"), "p.csv", progress=job)
+
+    assert (result["inserted"], result["skipped"], result["failed"]) == (1, 1, 1)
+    status = job.to_dict()
+    assert (status["inserted"], status["skipped"], status["failed"]) == (1, 1, 1)
+    assert status["failed_rows"] == [{"row": 2, "error": "document_id vacío"}]
+
+
+def test_invalid_document_type_fails_only_its_row(db, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+    ids = [f"{n}" for n in range(2001, 2006)]
+    job = ImportJob("participants", "p.csv")
+
+    result = ParticipantService().import_file(
+        db, participants_csv(*ids, document_types={"2003": "DNI"}), "p.csv", progress=job
+    )
+
+    assert (result["inserted"], result["failed"]) == (4, 1)
+    assert result["errors"] == [{"row": 3, "error": "document_type inválido: DNI"}]
+    assert job.to_dict()["failed_rows"] == result["errors"]
+    assert db.query(Participant).filter(Participant.document_id.in_(ids)).count() == 4
+
+
+def test_eviction_keeps_jobs_that_have_not_finished(monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_JOBS_KEPT", 2)
+    service = ImportJobService()
+    running, done, pending = ImportJob("participants", None), ImportJob("participants", None), ImportJob("participants", None)
+    running.start()
+    done.start()
+    done.finish()
+    for job in (running, done, pending):
+        service._jobs[job.id] = job
+
+    service._evict_finished()
+
+    assert service.get(running.id) is running
+    assert service.get(pending.id) is pending
+    assert service.get(done.id) is None
+
+    # Sin trabajos terminados no se descarta nada, aunque se pase del límite
+    queued = ImportJob("participants", None)
+    service._jobs[queued.id] = queued
+    service._evict_finished()
+    assert len(service._jobs) == 3
+
+
+def test_import_excel_route_runs_as_a_background_job(client, db):
+    response = client.post(
+        "/participants/import-excel",
+        files={"file": ("p.csv", participants_csv("1001", "1002"), "text/csv")},
+    )
+
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    for _ in range(100):
+        job = client.get(f"/imports/{job_id}").json()
+        if job["status"] in ("DONE", "FAILED"):
+            break
+        time.sleep(0.05)
+    assert (job["status"], job["inserted"]) == ("DONE", 2)
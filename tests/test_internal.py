@@ -0,0 +1,32 @@
+"""Métricas internas: solo para el rol de administración y sin detalles de conexión."""
+from sqlalchemy import create_engine
+
+from app.core import database
+from app.core.replica import check_replica_lag, replica_state
+from tests.factories import add_staff, auth_headers
+
+
+def test_db_pool_requires_admin_role(client, db):
+    add_staff(db)
+    add_staff(db, "root", role="admin")
+
+    assert client.get("/internal/db-pool").status_code == 401
+    assert client.get("/internal/db-pool", headers=auth_headers(client)).status_code == 403
+
+    response = client.get("/internal/db-pool", headers=auth_headers(client, "root"))
+    assert response.status_code == 200
+    assert {"sync", "async", "replica"} <= set(response.json())
+
+
+def test_replica_error_hides_connection_details(monkeypatch):
+    unreachable = create_engine("sqlite:////nonexistent-dir/secret-replica.db")
+    monkeypatch.setattr(database, "replica_engine", unreachable)
+    monkeypatch.setattr(replica_state, "error", None)
+    monkeypatch.setattr(replica_state, "healthy", True)
+    monkeypatch.setattr(replica_state, "checked_at", None)
+
+    check_replica_lag()
+
+    assert not replica_state.healthy
+    assert replica_state.error == "Réplica no disponible (OperationalError)"
+    assert "secret-replica" not in replica_state.snapshot()["error"]
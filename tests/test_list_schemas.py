@@ -0,0 +1,40 @@
+"""Los listados envían filas proyectadas sin response_model: el esquema publicado debe admitirlas."""
+import pytest
+from pydantic import TypeAdapter
+
+from app.models.event import Event
+from app.models.event_registration import EventRegistration
+from app.models.participant import Participant
+from app.models.staff import Staff
+from app.schemas.event_schema import EventOut
+from app.schemas.participant_schema import ParticipantOut, ParticipantPage
+from app.schemas.registration_schema import EventRegistrationOut
+from app.schemas.staff_schema import StaffOut
+
+LISTS = [
+    (Participant, ParticipantOut),
+    (Event, EventOut),
+    (EventRegistration, EventRegistrationOut),
+    (Staff, StaffOut),
+]
+
+
+@pytest.mark.parametrize("model, schema", LISTS, ids=lambda value: value.__name__)
+def test_nullable_columns_are_optional_in_the_list_schema(model, schema):
+    for name, field in schema.model_fields.items():
+        column = model.__table__.c[name]
+        if column.nullable and column.server_default is None and not column.primary_key:
+            # La fila siempre trae la columna: basta con que el tipo admita None
+            assert TypeAdapter(field.annotation).validate_python(None) is None, f"{schema.__name__}.{name}"
+
+
+def test_participant_with_null_columns_matches_the_published_schema(client, db):
+    db.add(Participant(document_id="1001"))
+    db.commit()
+
+    response = client.get("/participants/")
+
+    assert response.status_code == 200
+    page = ParticipantPage.model_validate(response.json())
+    assert page.items[0].document_id == "1001"
+    assert page.items[0].email is None
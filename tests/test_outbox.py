@@ -0,0 +1,25 @@
+"""Bandeja de salida de correos: lo que no se puede armar no queda reintentándose."""
+import asyncio
+
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.models.participant import Participant
+from app.services.outbox_service import OutboxService
+from tests.factories import seed_paid_event
+
+
+def test_dispatch_marks_orphaned_messages_dead(db, mail_pool):
+    event = seed_paid_event(db, 3)
+    service = OutboxService()
+    service.enqueue_event_qrs(db, event.id)
+    # El participante se borró después de encolar: el JOIN del lote ya no lo trae
+    db.query(Participant).filter(Participant.document_id == f"{event.id}-1").delete()
+    db.commit()
+
+    assert asyncio.run(service.dispatch_once()) == 2
+    assert asyncio.run(service.dispatch_once()) == 0
+
+    db.expire_all()
+    assert sorted(row.status.name for row in db.query(EmailOutbox)) == ["DEAD", "SENT", "SENT"]
+    dead = db.query(EmailOutbox).filter(EmailOutbox.status == OutboxStatus.DEAD).one()
+    assert dead.locked_at is None and dead.last_error
+    assert len(mail_pool.sent) == 2
@@ -0,0 +1,68 @@
+"""Envío de QR por correo: el envío masivo no frena los check-in que atiende el mismo worker."""
+import asyncio
+import statistics
+import time
+
+import httpx
+import pytest
+
+from app.core import database
+from app.main import app
+from app.models.email_outbox import EmailOutbox, OutboxStatus
+from app.services.outbox_service import OutboxService
+from tests.factories import qr_payload, seed_paid_event, seed_registration
+
+BULK_SIZE = 40
+
+
+async def timed_scans(client, payload, count):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.post("/attendance/record", json=payload)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.text
+    return latencies
+
+
+async def drain_outbox(service):
+    while await service.dispatch_once():
+        pass
+
+
+def test_send_single_qr_mails_the_participant(client, db, mail_pool):
+    registration = seed_registration(db)
+
+    response = client.post(f"/registrations/{registration.id}/send-single-qr")
+
+    assert response.status_code == 200
+    assert response.json()["email"] == "p1001@example.com"
+    assert [message["To"] for message in mail_pool.sent] == ["p1001@example.com"]
+    db.refresh(registration)
+    assert registration.qr_code_sent
+
+
+@pytest.mark.anyio
+async def test_check_in_latency_stays_flat_during_a_bulk_send(async_db, db, mail_pool):
+    registration = seed_registration(db, document_id="1001")
+    event = seed_paid_event(db, BULK_SIZE, registration.registered_by_staff_id)
+    payload = qr_payload(registration)
+    service = OutboxService()
+    assert service.enqueue_event_qrs(db, event.id)["enqueued"] == BULK_SIZE
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # Sin envío en curso (y con el pool de dibujo ya arrancado)
+        await client.post(f"/registrations/{registration.id}/send-single-qr")
+        quiet = await timed_scans(client, payload, 20)
+
+        bulk = asyncio.create_task(drain_outbox(service))
+        during = await timed_scans(client, payload, 20)
+        await bulk
+
+    assert len(mail_pool.sent) == BULK_SIZE + 1
+    db.expire_all()
+    assert db.query(EmailOutbox).filter(EmailOutbox.status == OutboxStatus.SENT).count() == BULK_SIZE
+    # El dibujo y la base van fuera del event loop: el check-in no espera al envío
+    assert statistics.median(during) < statistics.median(quiet) * 3 + 0.02
+    assert max(during) < 0.5
+    await database.async_engine.dispose()
@@ -0,0 +1,98 @@
+"""Regresión de N+1: cada ruta de QR y correo hace un número fijo de consultas."""
+import asyncio
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event as sa_event
+
+from app.core import database
+from app.repositories.registration_repository import EventRegistrationRepository
+from app.services.outbox_service import OutboxService
+from app.services.qr_batch_service import QRBatchService
+from app.services.registration_service import EventRegistrationService
+from tests.factories import add_staff, seed_paid_event, seed_registration
+
+
+@contextmanager
+def count_queries(engine=None):
+    """Lista de las sentencias SQL que ejecuta el motor dentro del bloque."""
+    engine = engine or database.engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_registration_loads_participant_and_event_in_one_query(db):
+    reg_id = seed_registration(db).id
+    db.expunge_all()
+
+    with count_queries() as statements:
+        reg = EventRegistrationRepository().get_with_participant_and_event(db, reg_id)
+        assert reg.participant.email and reg.event.name
+
+    assert len(statements) == 1
+
+
+def test_generate_qr_is_one_query(db):
+    reg_id = seed_registration(db).id
+    db.expunge_all()
+
+    with count_queries() as statements:
+        EventRegistrationService().generate_qr_for_registration(db, reg_id)
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+async def test_send_single_qr_is_one_read_and_one_write(db, mail_pool):
+    reg_id = seed_registration(db).id
+    db.expunge_all()
+
+    with count_queries() as statements:
+        await EventRegistrationService().send_single_qr(db, reg_id)
+
+    assert len(mail_pool.sent) == 1
+    assert [s.split()[0] for s in statements] == ["SELECT", "UPDATE"]
+
+
+def bulk_send_queries(db, event_id):
+    """Encolar y despachar todo el evento en un lote; retorna las sentencias ejecutadas."""
+    with count_queries() as statements:
+        OutboxService().enqueue_event_qrs(db, event_id)
+        asyncio.run(OutboxService().dispatch_once())
+    return statements
+
+
+def test_bulk_send_queries_do_not_grow_with_the_event(db, mail_pool):
+    staff_id = add_staff(db).id
+    small = seed_paid_event(db, 2, staff_id)
+    large = seed_paid_event(db, 12, staff_id)
+
+    small_statements = bulk_send_queries(db, small.id)
+    large_statements = bulk_send_queries(db, large.id)
+
+    assert len(mail_pool.sent) == 14
+    assert len(large_statements) == len(small_statements)
+
+
+def test_event_qrs_zip_queries_do_not_grow_with_the_event(db):
+    staff_id = add_staff(db).id
+    small = seed_paid_event(db, 2, staff_id).id
+    large = seed_paid_event(db, 12, staff_id).id
+    db.expunge_all()
+    counts = []
+
+    for event_id in (small, large):
+        with count_queries() as statements:
+            _, stream = QRBatchService().event_qrs_zip(db, event_id)
+            assert b"".join(stream)
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1] == 2
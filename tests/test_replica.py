@@ -0,0 +1,105 @@
+"""Réplica de lectura con dos bases locales: ruteo, vuelta al primario por atraso y lecturas forzadas."""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database, replica
+from app.core.database import Base
+from app.core.replica import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, check_replica_lag, replica_state
+from tests.conftest import TEST_DB
+from tests.factories import add_participant
+
+REPLICA_DB = TEST_DB.replace("test.db", "replica.db")
+NEW_PARTICIPANT = {
+    "document_id": "3003",
+    "document_type": "CC",
+    "first_name": "Luis",
+    "last_name": "Gómez",
+    "email": "luis@example.com",
+    "phone_number": "3000000000",
+    "career": "Sistemas",
+    "idnumber": "3003",
+}
+
+
+@pytest.fixture
+def replica_db(db, monkeypatch):
+    """Segunda base SQLite como réplica: el primario tiene 1001 y la réplica 2002."""
+    engine = create_engine(f"sqlite:///{REPLICA_DB}")
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{REPLICA_DB}")
+    monkeypatch.setattr(database, "replica_engine", engine)
+    monkeypatch.setattr(database, "ReplicaSessionLocal", sessionmaker(bind=engine))
+    monkeypatch.setattr(database, "async_replica_engine", async_engine)
+    monkeypatch.setattr(database, "AsyncReplicaSessionLocal", async_sessionmaker(bind=async_engine))
+    for attr in ("healthy", "lag_seconds", "checked_at", "error"):
+        monkeypatch.setattr(replica_state, attr, getattr(replica_state, attr))
+
+    add_participant(db, "1001")
+    session = sessionmaker(bind=engine)()
+    try:
+        add_participant(session, "2002")
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def listed(client, **kwargs):
+    response = client.get("/participants/", **kwargs)
+    assert response.status_code == 200
+    return [p["document_id"] for p in response.json()["items"]]
+
+
+def test_reads_go_to_a_healthy_replica(replica_db, client):
+    check_replica_lag()
+
+    assert replica_state.healthy
+    assert listed(client) == ["2002"]
+
+
+def test_read_primary_header_forces_the_primary(replica_db, client):
+    check_replica_lag()
+
+    assert listed(client, headers={READ_PRIMARY_HEADER: "1"}) == ["1001"]
+
+
+@pytest.mark.parametrize("lag, error", [(30, None), (None, "Replicación detenida")])
+def test_lagging_or_stopped_replica_falls_back_to_the_primary(replica_db, client, monkeypatch, lag, error):
+    monkeypatch.setattr(replica, "_replication_lag", lambda conn: lag)
+
+    check_replica_lag()
+
+    assert not replica_state.healthy
+    assert replica_state.error == error
+    assert listed(client) == ["1001"]
+
+
+def test_write_keeps_the_client_on_the_primary(replica_db, client):
+    check_replica_lag()
+
+    response = client.post("/participants/", json=NEW_PARTICIPANT)
+
+    assert response.status_code == 200
+    assert READ_PRIMARY_COOKIE in response.cookies
+    # La réplica aún no tiene 3003; con la cookie el cliente lee lo que acaba de escribir
+    assert listed(client) == ["1001", "3003"]
+    client.cookies.clear()
+    assert listed(client) == ["2002"]
+
+
+def test_failed_write_and_reads_set_no_cookie(replica_db, client):
+    check_replica_lag()
+
+    assert READ_PRIMARY_COOKIE not in client.get("/participants/").cookies
+    assert READ_PRIMARY_COOKIE not in client.post("/participants/", json={}).cookies
+
+
+def test_no_cookie_without_a_replica(client, db):
+
+    response = client.post("/participants/", json=NEW_PARTICIPANT)
+
+    assert response.status_code == 200
+    assert READ_PRIMARY_COOKIE not in response.cookies
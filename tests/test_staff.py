@@ -0,0 +1,72 @@
+"""Administración de staff: solo el rol de administración edita y ve las métricas de autenticación."""
+from app.models.staff import Staff
+from tests.factories import add_staff, auth_headers
+
+
+def test_update_staff_requires_authentication(client, db):
+    staff = add_staff(db)
+
+    response = client.patch(f"/staff/{staff.id}", json={"role": "admin"})
+
+    assert response.status_code == 401
+    db.refresh(staff)
+    assert staff.role is None
+
+
+def test_update_staff_requires_admin_role(client, db):
+    staff = add_staff(db)
+
+    response = client.patch(f"/staff/{staff.id}", json={"role": "admin"}, headers=auth_headers(client))
+
+    assert response.status_code == 403
+    db.refresh(staff)
+    assert staff.role is None
+
+
+def test_admin_updates_staff(client, db):
+    add_staff(db, "root", role="admin")
+    staff = add_staff(db)
+
+    response = client.patch(
+        f"/staff/{staff.id}", json={"full_name": "Nuevo Nombre"}, headers=auth_headers(client, "root")
+    )
+
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Nuevo Nombre"
+
+
+def test_update_staff_rejects_null_required_fields(client, db):
+    add_staff(db, "root", role="admin")
+    staff = add_staff(db)
+    headers = auth_headers(client, "root")
+
+    for field in ("full_name", "email", "is_active"):
+        response = client.patch(f"/staff/{staff.id}", json={field: None}, headers=headers)
+        assert response.status_code == 422, field
+
+    # role sí admite null: se quita el rol
+    assert client.patch(f"/staff/{staff.id}", json={"role": None}, headers=headers).status_code == 200
+    db.expire_all()
+    assert db.get(Staff, staff.id).email == "staff@example.com"
+
+
+def test_cache_stats_requires_admin_role(client, db):
+    add_staff(db)
+    add_staff(db, "root", role="admin")
+
+    assert client.get("/auth/cache-stats").status_code == 401
+    assert client.get("/auth/cache-stats", headers=auth_headers(client)).status_code == 403
+    response = client.get("/auth/cache-stats", headers=auth_headers(client, "root"))
+    assert response.status_code == 200
+    assert set(response.json()) == {"tokens", "staff", "devices"}
+
+
+def test_create_staff_hashes_the_password(client, db):
+    response = client.post(
+        "/staff/",
+        json={"username": "nuevo", "password": "secret", "full_name": "Nuevo", "email": "nuevo@example.com"},
+    )
+
+    assert response.status_code == 200
+    assert "password" not in response.json()
+    assert client.post("/auth/login", json={"username": "nuevo", "password": "secret"}).status_code == 200